@@ -8,7 +8,27 @@ st.set_page_config(
 
 import html
 from datetime import datetime
-from memlog.shared_vector_store import get_shared_vector_store
+from memlog.shared_vector_store import SEARCH_DEADLINE_SECONDS, get_shared_conversation_cache, get_shared_vector_store
+from memlog.export_index import get_conversation
+from memlog.diversify import MAX_CANDIDATES
+from memlog.ingest_jobs import IngestJobManager
+from load_conversations import prepare_conversation_cache
+
+MESSAGES_PER_PAGE = 20  # Messages rendered at once in the detail view
+MAX_MESSAGE_CHARS = 5000  # Longer messages are collapsed behind an expander
+JOB_REFRESH_SECONDS = 2  # How often the ingest progress panel updates itself
+SEARCH_RESULTS = 100  # Results of a plain search
+DIVERSE_PAGE_SIZE = 20  # Diverse results added per search call; picking them gets slower with every one
+
+@st.cache_resource
+def get_ingest_job_manager(_vector_store):
+    """Background ingest jobs, kept across reruns and sessions"""
+    return IngestJobManager(_vector_store, prepare_conversation_cache)
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
 
 def format_timestamp(ts):
     """Convert ISO timestamp to readable format"""
@@ -61,11 +81,84 @@ def display_conversation_list(conversations, search_term="", page_size=10, page_
                 st.markdown(f"**Preview:** {conv['text'][:200]}...")
                 if 'score' in conv:
                     st.markdown(f"**Relevance Score:** {conv['score']:.2f}")
+                if conv.get('duplicate_ids'):
+                    st.caption(f"+ {len(conv['duplicate_ids'])} near-duplicate conversations")
             
             with col2:
                 if st.button("View Details", key=f"view_{conv['id']}"):
                     st.session_state.selected_conversation = conv
                     st.session_state.view_mode = "detail"
+                    st.session_state.detail_query = search_term
+                    st.session_state.detail_page = None
+
+def display_message(message, highlighted=False):
+    """Render one message; very long messages are collapsed"""
+    role = html.escape(message['role'] or 'unknown')
+    marker = " 🔎" if highlighted else ""
+    text = message['text'] or ""
+    if len(text) <= MAX_MESSAGE_CHARS:
+        st.markdown(f"""
+        <div class="conversation-content">
+            <strong>#{message['ordinal'] + 1} {role}{marker}</strong><br>
+            {format_message_content(text)}
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown(f"""
+        <div class="conversation-content">
+            <strong>#{message['ordinal'] + 1} {role}{marker}</strong><br>
+            {format_message_content(text[:MAX_MESSAGE_CHARS])}…
+        </div>
+        """, unsafe_allow_html=True)
+        with st.expander(f"Show full message ({len(text):,} characters)"):
+            st.text(text)
+
+def display_message_pages(cache, conversation_id, message_count, redactor=None):
+    """
+    Show a conversation one page of messages at a time, read on demand from the cache
+
+    The cache holds the export's raw text, so with a redactor each page is
+    redacted before it is rendered, like the text the vector store keeps.
+    """
+    page_count = -(-message_count // MESSAGES_PER_PAGE)
+    query = st.session_state.get('detail_query') or ""
+    matches = cache.find_messages(conversation_id, query) if query else []
+
+    # Open on the first message matching the search, if any
+    if st.session_state.get('detail_page') is None:
+        st.session_state.detail_page = matches[0] // MESSAGES_PER_PAGE if matches else 0
+    page = min(st.session_state.detail_page, page_count - 1)
+
+    if matches:
+        st.caption(f"{len(matches)} messages match \"{query}\". Jump to:")
+        jump_cols = st.columns(min(len(matches), 10))
+        for col, ordinal in zip(jump_cols, matches[:10]):
+            if col.button(f"#{ordinal + 1}", key=f"jump_{ordinal}"):
+                st.session_state.detail_page = ordinal // MESSAGES_PER_PAGE
+                st.rerun()
+
+    nav_cols = st.columns([1, 2, 1])
+    with nav_cols[0]:
+        if page > 0 and st.button("← Earlier messages"):
+            st.session_state.detail_page = page - 1
+            st.rerun()
+    with nav_cols[1]:
+        st.markdown(
+            f"Messages {page * MESSAGES_PER_PAGE + 1}–{min((page + 1) * MESSAGES_PER_PAGE, message_count)} "
+            f"of {message_count} (page {page + 1}/{page_count})"
+        )
+    with nav_cols[2]:
+        if page < page_count - 1 and st.button("Later messages →"):
+            st.session_state.detail_page = page + 1
+            st.rerun()
+
+    matched = set(matches)
+    messages = cache.get_messages(conversation_id, page * MESSAGES_PER_PAGE, (page + 1) * MESSAGES_PER_PAGE)
+    if redactor is not None:
+        texts = redactor.redact_many([message['text'] or "" for message in messages])
+        messages = [{**message, 'text': text} for message, text in zip(messages, texts)]
+    for message in messages:
+        display_message(message, highlighted=message['ordinal'] in matched)
 
 def display_conversation_detail(conversation):
     """Display detailed view of a single conversation"""
@@ -76,42 +169,56 @@ def display_conversation_detail(conversation):
         st.rerun()
     
     st.markdown(f"## 🗣️ {conversation['title']}")
+    vector_store = get_shared_vector_store()
+    # Collections loaded with --redact must not show PII from the raw export either
+    redactor = vector_store.redactor if vector_store else None
     
     # Create tabs for different aspects of the conversation
     tab1, tab2 = st.tabs(["💬 Content", "ℹ️ Details"])
     
     with tab1:
-        st.markdown(f"""
-        <div class="conversation-content">
-            {format_message_content(conversation['text'])}
-        </div>
-        """, unsafe_allow_html=True)
+        cache = get_shared_conversation_cache()
+        message_count = cache.message_count(conversation['id']) if cache is not None else 0
+        if message_count:
+            display_message_pages(cache, conversation['id'], message_count, redactor)
+        else:
+            # Not in the conversation cache yet; fall back to the stored text
+            st.markdown(f"""
+            <div class="conversation-content">
+                {format_message_content(conversation['text'])}
+            </div>
+            """, unsafe_allow_html=True)
             
     with tab2:
         st.markdown("### Conversation Details")
         st.markdown(f"**Created:** {format_timestamp(conversation['create_time'])}")
         if 'id' in conversation:
             st.code(f"ID: {conversation['id']}")
+            with st.expander("Original export record"):
+                original = get_conversation(conversation['id'])
+                if original is not None:
+                    st.json(redactor.redact_record(original) if redactor else original, expanded=False)
+                else:
+                    st.info("This conversation is not in the export index.")
         
         # Show similar conversations
         st.markdown("### Similar Conversations")
-        vector_store = get_shared_vector_store()
         if vector_store:
-            similar = vector_store.search(
-                conversation['text'],
+            # The stored vectors are the query, so no embedding call is made
+            similar = vector_store.related_conversations(
+                [conversation['id']],
                 limit=3,
                 score_threshold=0.3
-            )
+            ).get(conversation['id'], [])
             for r in similar:
-                if str(r['id']) != str(conversation['id']):
-                    st.markdown(
-                        f"""<div class="similar-conversation">
-                            <h4>{r['title']}</h4>
-                            <p>Similarity Score: {r['score']:.2f}</p>
-                            <p>{r['text'][:200]}...</p>
-                        </div>""",
-                        unsafe_allow_html=True
-                    )
+                st.markdown(
+                    f"""<div class="similar-conversation">
+                        <h4>{r['title']}</h4>
+                        <p>Similarity Score: {r['score']:.2f}</p>
+                        <p>{r['text'][:200]}...</p>
+                    </div>""",
+                    unsafe_allow_html=True
+                )
 
 # Add custom CSS
 st.markdown("""
@@ -173,6 +280,9 @@ if 'page_number' not in st.session_state:
     st.session_state.page_number = 1
 if 'conversations' not in st.session_state:
     st.session_state.conversations = []
+if 'diverse_limit' not in st.session_state:
+    st.session_state.diverse_limit = DIVERSE_PAGE_SIZE
+    st.session_state.diverse_query = None
 
 # Main app
 st.title('🧠 MindSpring')
@@ -191,33 +301,66 @@ vector_store = get_shared_vector_store()
 # Sidebar controls
 st.sidebar.title("Search Controls")
 
-# Add Load Data button to sidebar
-if st.sidebar.button("🔄 Load All Conversations", use_container_width=True):
+# The embedding model is warmed up in the background; surface failures here
+if vector_store is not None and vector_store.ollama_ready.is_set() and vector_store.ollama_error:
+    st.sidebar.warning(f"⚠️ Ollama is not reachable: {vector_store.ollama_error}")
+
+def display_ingest_panel(manager):
+    """Start, pause and cancel the background ingest job and show its progress"""
+    job = manager.current
+    if job is None or job.finished:
+        if st.button("🔄 Load All Conversations", use_container_width=True):
+            try:
+                job = manager.start()
+            except RuntimeError as e:
+                st.error(f"❌ {str(e)}")
+    if job is None:
+        return
+
+    progress = job.progress()
+    state = progress['state']
+    total = progress['total']
+    st.progress(
+        min(progress['done'] / total, 1.0) if total else 0.0,
+        text=f"Ingest job {progress['job_id']}: {state} ({progress['done']:,}/{total:,})"
+    )
+    details = [f"{progress['stored']:,} stored"]
+    if progress['failed']:
+        details.append(f"{progress['failed']:,} failed")
+    if progress['rate']:
+        details.append(f"{progress['rate']:.1f} conv/s")
+    if progress['eta_seconds'] is not None:
+        details.append(f"ETA {format_duration(progress['eta_seconds'])}")
+    details.append(f"{format_duration(progress['elapsed'])} elapsed")
+    st.caption(" · ".join(details))
+
+    if not job.finished:
+        cols = st.columns(2)
+        with cols[0]:
+            if state == "paused":
+                if st.button("▶️ Resume", use_container_width=True):
+                    job.resume()
+            elif st.button("⏸️ Pause", use_container_width=True, disabled=state == "cancelling"):
+                job.pause()
+        with cols[1]:
+            if st.button("⏹️ Cancel", use_container_width=True, disabled=state == "cancelling"):
+                job.cancel()
+    if progress['errors']:
+        with st.expander(f"⚠️ {len(progress['errors'])} recent errors"):
+            for error in progress['errors']:
+                st.text(error)
+    # Without fragments (Streamlit < 1.37) the panel only updates on rerun
+    if not hasattr(st, "fragment") and not job.finished:
+        st.button("Refresh progress", use_container_width=True)
+
+# Conversations are ingested in the background; each stored batch is searchable right away
+if hasattr(st, "fragment"):
+    display_ingest_panel = st.fragment(run_every=JOB_REFRESH_SECONDS)(display_ingest_panel)
+with st.sidebar:
     if vector_store is None:
         st.error("❌ Vector store initialization failed. Please check if Ollama is running.")
     else:
-        with st.spinner("Loading conversations..."):
-            try:
-                # Get stats to check if we have conversations
-                stats = vector_store.get_collection_stats()
-                if stats.get('points_count', 0) > 0:
-                    st.success(f"✅ Found {stats['points_count']:,} conversations!")
-                    # Load first batch of conversations
-                    results = vector_store.search("", limit=100, score_threshold=0.0)
-                    st.session_state.conversations = [
-                        {
-                            'id': r['id'],
-                            'title': r['title'],
-                            'text': r['text'],
-                            'create_time': r['create_time']
-                        }
-                        for r in results
-                    ]
-                    st.rerun()
-                else:
-                    st.warning("No conversations found in the vector store.")
-            except Exception as e:
-                st.error(f"❌ Error loading conversations: {str(e)}")
+        display_ingest_panel(get_ingest_job_manager(vector_store))
 
 # Search interface
 st.markdown("### 🔍 Semantic Search")
@@ -243,21 +386,42 @@ with st.container():
             "Medium": 0.3,
             "High": 0.4
         }[threshold]
+        diversify = st.checkbox(
+            "Diverse results",
+            value=True,
+            help="Move conversations that are near copies of higher results further down"
+        )
 
 if search_term and vector_store:
     try:
-        results = vector_store.search(
-            search_term,
-            limit=100,
-            score_threshold=score_threshold
-        )
+        if diversify:
+            # Diverse results are fetched a page at a time; a new query starts over
+            if st.session_state.diverse_query != search_term:
+                st.session_state.diverse_query = search_term
+                st.session_state.diverse_limit = DIVERSE_PAGE_SIZE
+            results = vector_store.diversified_search(
+                search_term,
+                limit=st.session_state.diverse_limit,
+                score_threshold=score_threshold,
+                deadline=SEARCH_DEADLINE_SECONDS
+            )
+        else:
+            results = vector_store.search(
+                search_term,
+                limit=SEARCH_RESULTS,
+                score_threshold=score_threshold,
+                deadline=SEARCH_DEADLINE_SECONDS
+            )
+        if results.degraded:
+            st.info("⏱️ Partial results: " + "; ".join(results.degraded_stages.values()))
         st.session_state.conversations = [
             {
                 'id': r['id'],
                 'title': r['title'],
                 'text': r['text'],
                 'create_time': r['create_time'],
-                'score': r['score']
+                'score': r['score'],
+                'duplicate_ids': r['duplicate_ids']
             }
             for r in results
         ]
@@ -271,5 +435,10 @@ if st.session_state.view_mode == "list":
         search_term,
         page_number=st.session_state.page_number
     )
+    if (search_term and diversify and len(st.session_state.conversations) >= st.session_state.diverse_limit
+            and st.session_state.diverse_limit < MAX_CANDIDATES):
+        if st.button("More diverse results"):
+            st.session_state.diverse_limit += DIVERSE_PAGE_SIZE
+            st.rerun()
 else:
     display_conversation_detail(st.session_state.selected_conversation)
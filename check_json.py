@@ -1,61 +1,125 @@
 import json
-from collections import defaultdict
-from typing import Any, Dict, List, Set
 import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from memlog.conversation_format import detect_format, estimate_tokens, format_conversation_text, iter_messages
+from memlog.export_index import iter_items
+
+SAMPLE_SIZE = 3  # Elements kept as a sample
+KEY_SAMPLE_SIZE = 10  # Elements used to compute common keys
+MAX_TOP_LEVEL_KEYS = 50  # Keys listed for dict exports
+EMBED_TOKENS_PER_SECOND = 4000  # Rough local Ollama throughput, used for the ingest estimate
+
+def _bucket(value: int) -> str:
+    """Power-of-two histogram bucket label for a non-negative count"""
+    if value <= 0:
+        return "0"
+    low = 1 << (value.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+def _sorted_histogram(histogram: Counter) -> Dict[str, int]:
+    """Order histogram buckets by their lower bound"""
+    return dict(sorted(histogram.items(), key=lambda item: int(item[0].split('-')[0])))
 
 def analyze_json_structure(file_path: str) -> Dict[str, Any]:
     """
-    Analyzes the structure of a JSON file and returns detailed information about it.
-    
+    Profiles a conversation export in a single streaming pass.
+
+    Only one conversation is held in memory at a time, so memory use does not
+    grow with the size of the export.
+
     Args:
         file_path: Path to the JSON file to analyze
-        
+
     Returns:
         Dictionary containing structure information including:
         - type: The top-level type (list or dict)
         - size: File size in MB
-        - count: Number of top-level elements if list
-        - keys: Common keys if dictionary
+        - count: Number of top-level elements
+        - format: Detected export format (gpt, claude or mixed)
+        - histograms: Messages per conversation and bytes per conversation
+        - tokens: Estimated embedding token volume and ingest time
+        - keys: Common keys of the first elements
         - sample: Sample of first few elements
     """
+    start = time.time()
     try:
         # Get file size
         file_size = os.path.getsize(file_path) / (1024 * 1024)  # Convert to MB
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
+
+        with open(file_path, 'rb') as f:
+            first = f.read(1)
+            while first and first.isspace():
+                first = f.read(1)
+        top_level_type = {b'[': 'list', b'{': 'dict'}.get(first, 'unknown')
+
         structure = {
             'file_name': os.path.basename(file_path),
             'file_size_mb': round(file_size, 2),
-            'top_level_type': type(data).__name__
+            'top_level_type': top_level_type
         }
-        
-        # Analyze based on top-level type
-        if isinstance(data, list):
-            structure.update({
-                'element_count': len(data),
-                'first_element_type': type(data[0]).__name__ if data else None,
-                'sample': data[:3] if len(data) > 0 else [],
-            })
-            
-            # If elements are dicts, get common keys
-            if data and isinstance(data[0], dict):
-                common_keys = set(data[0].keys())
-                for item in data[1:10]:  # Check first 10 items
-                    if isinstance(item, dict):
-                        common_keys &= set(item.keys())
-                structure['common_keys'] = list(common_keys)
-                
-        elif isinstance(data, dict):
-            structure.update({
-                'top_level_keys': list(data.keys()),
-                'sample': {k: data[k] for k in list(data.keys())[:3]}
-            })
-            
+        if top_level_type == 'unknown':
+            structure['error'] = 'Top-level value is not a list or dictionary'
+            return structure
+
+        element_count = 0
+        first_element_type = None
+        common_keys = None
+        top_level_keys = []
+        sample = []
+        formats = Counter()
+        message_histogram = Counter()
+        size_histogram = Counter()
+        total_messages = 0
+        total_tokens = 0
+
+        for key, _, length, item in iter_items(file_path):
+            element_count += 1
+            if first_element_type is None:
+                first_element_type = type(item).__name__
+            if key is not None and len(top_level_keys) < MAX_TOP_LEVEL_KEYS:
+                top_level_keys.append(key)
+            if len(sample) < SAMPLE_SIZE:
+                sample.append(item)
+            size_histogram[_bucket(length)] += 1
+
+            if not isinstance(item, dict):
+                continue
+            if element_count <= KEY_SAMPLE_SIZE:
+                common_keys = set(item.keys()) if common_keys is None else common_keys & set(item.keys())
+
+            formats[detect_format(item)] += 1
+            messages = list(iter_messages(item))
+            message_histogram[_bucket(len(messages))] += 1
+            total_messages += len(messages)
+            total_tokens += estimate_tokens(
+                format_conversation_text(item.get("title", "Untitled Conversation"), messages)
+            )
+
+        structure.update({
+            'element_count': element_count,
+            'first_element_type': first_element_type,
+            'sample': sample,
+            'format': ('mixed' if len(formats) > 1 else next(iter(formats), None)),
+            'format_counts': dict(formats),
+            'message_count': total_messages,
+            'messages_per_conversation': _sorted_histogram(message_histogram),
+            'bytes_per_conversation': _sorted_histogram(size_histogram),
+            'estimated_tokens': total_tokens,
+            'estimated_embed_seconds': round(total_tokens / EMBED_TOKENS_PER_SECOND, 1),
+        })
+        if common_keys is not None:
+            structure['common_keys'] = sorted(common_keys)
+        if top_level_type == 'dict':
+            structure['top_level_keys'] = top_level_keys
+        structure['profile_seconds'] = round(time.time() - start, 2)
         return structure
-        
-    except json.JSONDecodeError as e:
+
+    except (json.JSONDecodeError, ValueError) as e:
         return {
             'file_name': os.path.basename(file_path),
             'error': f'Invalid JSON: {str(e)}'
@@ -66,42 +130,78 @@ def analyze_json_structure(file_path: str) -> Dict[str, Any]:
             'error': f'Analysis failed: {str(e)}'
         }
 
+def profile_files(file_paths: List[str], max_workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Profiles several exports in parallel, one process per file.
+
+    Args:
+        file_paths: Paths to the JSON files to analyze
+        max_workers: Number of worker processes (defaults to one per file, capped by CPU count)
+
+    Returns:
+        Structure information for each file, in the order given
+    """
+    if len(file_paths) <= 1:
+        return [analyze_json_structure(path) for path in file_paths]
+    workers = max_workers or min(len(file_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze_json_structure, file_paths))
+
 def pretty_print_structure(structure: Dict[str, Any]) -> None:
     """
     Prints the JSON structure analysis in a readable format.
     """
     print(f"\n=== {structure['file_name']} Analysis ===")
-    print(f"File Size: {structure['file_size_mb']} MB")
-    print(f"Top-level Type: {structure['top_level_type']}")
-    
     if 'error' in structure:
         print(f"Error: {structure['error']}")
         return
-        
-    if structure['top_level_type'] == 'list':
-        print(f"Number of Elements: {structure['element_count']}")
-        print(f"First Element Type: {structure['first_element_type']}")
-        if 'common_keys' in structure:
-            print("\nCommon Keys in Dictionary Elements:")
-            for key in structure['common_keys']:
-                print(f"  - {key}")
-    else:
+
+    print(f"File Size: {structure['file_size_mb']} MB")
+    print(f"Top-level Type: {structure['top_level_type']}")
+    print(f"Number of Elements: {structure['element_count']}")
+    print(f"First Element Type: {structure['first_element_type']}")
+    print(f"Detected Format: {structure['format']} {structure['format_counts']}")
+    print(f"Messages: {structure['message_count']:,}")
+    print(f"Estimated Embedding Tokens: {structure['estimated_tokens']:,}")
+    print(f"Estimated Embedding Time: {structure['estimated_embed_seconds']:,} s "
+          f"(at {EMBED_TOKENS_PER_SECOND} tokens/s)")
+    print(f"Profiled In: {structure['profile_seconds']} s")
+
+    print("\nMessages per Conversation:")
+    for bucket, count in structure['messages_per_conversation'].items():
+        print(f"  {bucket:>12}: {count}")
+    print("\nBytes per Conversation:")
+    for bucket, count in structure['bytes_per_conversation'].items():
+        print(f"  {bucket:>12}: {count}")
+
+    if 'common_keys' in structure:
+        print("\nCommon Keys in Dictionary Elements:")
+        for key in structure['common_keys']:
+            print(f"  - {key}")
+    if 'top_level_keys' in structure:
         print("\nTop-level Keys:")
         for key in structure['top_level_keys']:
             print(f"  - {key}")
-    
+
     print("\nSample Data:")
     print(json.dumps(structure['sample'], indent=2)[:500] + "...")
 
 def main():
-    files = [os.path.abspath('./conversations.json'), os.path.abspath('./claude_conversations.json')]
-    
+    import sys
+
+    files = [os.path.abspath(path) for path in sys.argv[1:]] or [
+        os.path.abspath('./conversations.json'),
+        os.path.abspath('./claude_conversations.json')
+    ]
+
+    existing = []
     for file_path in files:
         if not os.path.exists(file_path):
             print(f"\nError: File not found: {file_path}")
             continue
-            
-        structure = analyze_json_structure(file_path)
+        existing.append(file_path)
+
+    for structure in profile_files(existing):
         pretty_print_structure(structure)
 
 if __name__ == "__main__":
@@ -1,33 +1,36 @@
 import json
 import os
-import pandas as pd
-import streamlit as st
-import spacy
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import time
 from datetime import datetime
-import threading
-import queue
 import ijson
 import psutil
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import math
+from contextlib import nullcontext
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from split_json import split_large_json, should_split_file, ITEMS_PER_CHUNK
+from split_json import split_large_jsonl, should_split_file, ITEMS_PER_CHUNK
 from memlog.conversation_vector_store import ConversationVectorStore
-
-nlp = spacy.load("en_core_web_sm")
-analyzer = SentimentIntensityAnalyzer()
+from memlog.conversation_cache import ConversationCache, build_conversation_cache, is_cache_current
+from memlog.export_index import build_export_index
+from memlog.enrichment import ConversationEnricher
+from memlog.ingest_queue import run_distributed
+from memlog.redaction import PII_TERMS_FILE, PIIRedactor
 
 # Constants
 MAX_RETRIES = 3
 BASE_BATCH_SIZE = 100  # Aligned with vector store batch size
+ENRICH_BATCH_SIZE = 2000  # Conversations per enrichment pass
+BULK_BATCH_SIZE = 1000  # Conversations per upload in bulk-load mode
 MAX_MEMORY_PERCENT = 75
 CHECKPOINT_FILE = "conversation_checkpoint.json"
 DB_TIMEOUT = 30  # SQLite timeout in seconds
 WATCH_DIRECTORIES = ["."]  # Directories to watch for new JSON files
+CHUNKS_DIRS = ["conversations_chunks", "claude_conversations_chunks", "model_comparisons_chunks"]
+CACHE_DIR = "conversation_cache"  # Normalized columnar store read by all downstream steps
+CHUNK_SUFFIXES = (".json", ".jsonl", ".jsonl.gz")
+OLLAMA_URL = "http://localhost:11434/api/embed"
 
 class ConversationFileHandler(FileSystemEventHandler):
     """Handle new conversation JSON files"""
@@ -37,7 +40,7 @@ class ConversationFileHandler(FileSystemEventHandler):
             print(f"New file detected: {event.src_path}")
             if should_split_file(event.src_path):
                 print(f"Large file detected, splitting: {event.src_path}")
-                split_large_json(event.src_path)
+                split_large_jsonl(event.src_path)
 
 def start_file_watcher():
     """Start watching directories for new JSON files"""
@@ -50,8 +53,40 @@ def start_file_watcher():
     observer.start()
     return observer
 
-def load_chunks():
-    """Load conversation chunks with improved batch processing"""
+def load_chunks(
+    enrich: bool = False,
+    nlp_processes: int = 1,
+    topics: int = 0,
+    layout: str = None,
+    dedup: str = None,
+    rebuild_rollups: bool = False,
+    ollama_urls: list = None,
+    workers: int = 0,
+    redact: bool = False,
+    redact_terms_file: str = PII_TERMS_FILE,
+    bulk: bool = False,
+    backend: str = None,
+    title_vectors: bool = False
+):
+    """
+    Load conversation chunks with improved batch processing
+
+    Args:
+        enrich: Run entity extraction and sentiment analysis before storing
+        nlp_processes: Worker processes for the enrichment stage
+        topics: Recluster all stored conversations into this many topics afterwards (0 to skip)
+        layout: Rebuild the 2D topic map with this method ('pca', 'random' or 'umap') afterwards
+        dedup: Skip embedding near duplicates ('link' or 'reuse', see process_conversations)
+        rebuild_rollups: Recompute the usage statistics rollups from the whole cache afterwards
+        ollama_urls: Ollama embed URLs to spread embedding requests across
+        workers: Embed in this many worker processes fed from a resumable shard queue (0 for in-process)
+        redact: Replace emails, phone numbers, keys, IPs and custom terms before embedding and storing
+        redact_terms_file: Custom terms to redact, one per line
+        bulk: Use bulk-load mode (deferred indexing, parallel uploads); always used
+            when the collection is still empty
+        backend: Vector backend, 'qdrant' or 'numpy' (defaults to the one the collection was created with)
+        title_vectors: Also embed titles into a 'title' vector of each point (new collections only)
+    """
     free_gb = check_disk_space()
     if free_gb < 1:
         error_msg = f"⚠️ Low disk space ({free_gb:.2f}GB). Please free up at least 1GB before proceeding."
@@ -59,57 +94,123 @@ def load_chunks():
         return 0
 
     # Initialize vector store
+    redactor = PIIRedactor(n_process=nlp_processes, terms_file=redact_terms_file) if redact else None
     try:
         vector_store = ConversationVectorStore(
             model_name="mxbai-embed-large",
             qdrant_path="./qdrant_db",
             collection_name="conversations",
             dimension=1024,
-            ollama_url="http://localhost:11434/api/embed"
+            ollama_url=ollama_urls or OLLAMA_URL,
+            redactor=redactor,
+            backend=backend,
+            title_vectors=title_vectors
         )
     except Exception as e:
         print(f"Failed to initialize vector store: {e}")
         return 0
 
-    # Check for large JSON files and split them
+    total_conversations_loaded = 0
+    cache = prepare_conversation_cache()
+    if cache is None:
+        return 0
+    enricher = ConversationEnricher(n_process=nlp_processes) if enrich else None
+
+    print(f"\nProcessing {len(cache)} conversations from {CACHE_DIR}...")
+    # A first import writes everything at once, so index once at the end
+    bulk = bulk or vector_store.client.count(vector_store.collection_name).count == 0
+    if bulk:
+        print("Using bulk-load mode: indexing is deferred until all conversations are uploaded")
+    with vector_store.bulk_load() if bulk else nullcontext():
+        if workers:
+            total_conversations_loaded = run_distributed(
+                vector_store, CACHE_DIR, processes=workers, enricher=enricher, dedup=dedup
+            )
+        else:
+            # Enrichment runs spaCy/VADER over everything passed in one call, and
+            # bulk uploads are split into parallel requests, so hand over larger
+            # batches when either is enabled
+            upload_batch_size = BULK_BATCH_SIZE if bulk else BASE_BATCH_SIZE
+            read_batch_size = max(ENRICH_BATCH_SIZE if enrich else BASE_BATCH_SIZE, upload_batch_size)
+            for batch in cache.iter_conversations(read_batch_size):
+                try:
+                    vector_store.process_conversations(
+                        batch, batch_size=upload_batch_size, enricher=enricher, dedup=dedup
+                    )
+                    total_conversations_loaded += len(batch)
+                except Exception as e:
+                    print(f"Error processing batch: {e}")
+                    continue
+
+    if redactor is not None:
+        print(f"\nRedacted PII: {redactor.summary() or 'nothing found'}")
+
+    if len(vector_store.embedding_pool) > 1:
+        print("\nEmbedding endpoints:")
+        for endpoint in vector_store.get_embedding_status():
+            latency = f"{endpoint['ms_per_item']:.1f} ms/text" if endpoint['ms_per_item'] is not None else "unmeasured"
+            print(f"  {endpoint['url']}: {endpoint['items']} texts in {endpoint['requests']} requests, "
+                  f"{latency}, {endpoint['failures']} recent failures")
+
+    if rebuild_rollups:
+        print("\nRebuilding usage statistics rollups...")
+        vector_store.usage_rollups.rebuild(cache.iter_conversations(ENRICH_BATCH_SIZE))
+
+    if topics:
+        print(f"\nClustering stored conversations into {topics} topics...")
+        for topic in vector_store.build_topic_clusters(n_clusters=topics):
+            print(f"  {topic['size']:>6}  {topic['label']}")
+
+    if layout:
+        print(f"\nBuilding {layout} topic map layout...")
+        placed = vector_store.build_topic_layout(method=layout)
+        print(f"Placed {placed} conversations on the map")
+
+    return total_conversations_loaded
+
+def prepare_conversation_cache():
+    """
+    Split large exports and bring the conversation cache up to date
+
+    All chunk files are normalized once into the columnar cache; unchanged
+    sources are not re-parsed on later runs.
+
+    Returns:
+        The conversation cache, or None if there are no conversation chunks
+    """
     for file in os.listdir():
         if file.endswith('.json') and not file.startswith('chunk_'):
             file_path = os.path.join(os.getcwd(), file)
-            if should_split_file(file_path):
+            if should_split_file(file_path) and not chunks_up_to_date(file_path):
                 print(f"Large file detected, splitting: {file}")
-                split_large_json(file_path)
+                split_large_jsonl(file_path)
 
-    chunks_dirs = ["conversations_chunks", "claude_conversations_chunks", "model_comparisons_chunks"]
-    total_conversations_loaded = 0
-    
-    # Process each chunks directory
-    for chunks_dir in chunks_dirs:
+    sources = find_chunk_sources()
+    if not sources:
+        print("No conversation chunks found")
+        return None
+    if not is_cache_current(sources, CACHE_DIR):
+        build_conversation_cache(sources, CACHE_DIR)
+        build_export_index([path for paths in sources.values() for path in paths])
+    return ConversationCache(CACHE_DIR)
+
+def chunks_up_to_date(file_path):
+    """Check whether a file was already split after its last modification"""
+    chunk_dir = f"{file_path.split('.')[0]}_chunks"
+    return os.path.isdir(chunk_dir) and os.path.getmtime(chunk_dir) >= os.path.getmtime(file_path)
+
+def find_chunk_sources():
+    """Map each source name to the chunk files in its chunks directory"""
+    sources = {}
+    for chunks_dir in CHUNKS_DIRS:
         if not os.path.exists(chunks_dir):
             continue
-
-        print(f"\nProcessing chunks in {chunks_dir}...")
-        chunk_files = [f for f in os.listdir(chunks_dir) if f.endswith('.json')]
-        
-        for chunk_file in chunk_files:
-            try:
-                file_path = os.path.join(chunks_dir, chunk_file)
-                print(f"Loading {chunk_file}...")
-                
-                # Load and process chunk
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    conversations = json.load(f)
-                    if isinstance(conversations, list):
-                        vector_store.process_conversations(conversations)
-                        total_conversations_loaded += len(conversations)
-                        print(f"Processed {len(conversations)} conversations from {chunk_file}")
-                    else:
-                        print(f"Warning: {chunk_file} does not contain a list of conversations")
-                        
-            except Exception as e:
-                print(f"Error processing {chunk_file}: {e}")
-                continue
-    
-    return total_conversations_loaded
+        chunk_files = sorted(
+            os.path.join(chunks_dir, f) for f in os.listdir(chunks_dir) if f.endswith(CHUNK_SUFFIXES)
+        )
+        if chunk_files:
+            sources[chunks_dir[:-len("_chunks")]] = chunk_files
+    return sources
 
 def check_disk_space():
     """Check available disk space and return space in GB"""
@@ -128,15 +229,81 @@ def check_disk_space():
         print(f"Error checking disk space: {e}")
         return 0
 
-def load_all_conversations():
+def load_all_conversations(
+    enrich: bool = False,
+    nlp_processes: int = 1,
+    topics: int = 0,
+    layout: str = None,
+    dedup: str = None,
+    rebuild_rollups: bool = False,
+    ollama_urls: list = None,
+    workers: int = 0,
+    redact: bool = False,
+    redact_terms_file: str = PII_TERMS_FILE,
+    bulk: bool = False,
+    backend: str = None,
+    title_vectors: bool = False
+):
     # Start file watcher
     observer = start_file_watcher()
     try:
-        return load_chunks()
+        return load_chunks(
+            enrich=enrich,
+            nlp_processes=nlp_processes,
+            topics=topics,
+            layout=layout,
+            dedup=dedup,
+            rebuild_rollups=rebuild_rollups,
+            ollama_urls=ollama_urls,
+            workers=workers,
+            redact=redact,
+            redact_terms_file=redact_terms_file,
+            bulk=bulk,
+            backend=backend,
+            title_vectors=title_vectors
+        )
     finally:
         # Stop file watcher
         observer.stop()
         observer.join()
 
 if __name__ == "__main__":
-    load_all_conversations()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load conversation exports into the vector store")
+    parser.add_argument("--enrich", action="store_true", help="Extract entities and sentiment as payload facets")
+    parser.add_argument("--nlp-processes", type=int, default=1, help="Worker processes for enrichment")
+    parser.add_argument("--topics", type=int, default=0, help="Recluster all conversations into N topics after loading")
+    parser.add_argument("--layout", choices=["pca", "random", "umap"], help="Rebuild the 2D topic map after loading")
+    parser.add_argument("--dedup", choices=["link", "reuse"], help="Detect near duplicates and skip embedding them")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="Recompute usage statistics from all conversations")
+    parser.add_argument("--ollama-url", action="append", dest="ollama_urls",
+                        help=f"Ollama embed URL; repeat to load-balance across servers (default {OLLAMA_URL})")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Embed with N worker processes via a resumable shard queue (see memlog/ingest_queue.py)")
+    parser.add_argument("--redact", action="store_true",
+                        help="Redact emails, phone numbers, keys/tokens, IPs and custom terms before embedding")
+    parser.add_argument("--redact-terms", default=PII_TERMS_FILE,
+                        help="File of custom terms to redact, one per line")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Bulk-load mode: defer indexing and upload in parallel (automatic for an empty store)")
+    parser.add_argument("--backend", choices=["qdrant", "numpy"],
+                        help="Vector backend for a new collection: embedded Qdrant or memory-mapped NumPy exact search")
+    parser.add_argument("--title-vectors", action="store_true",
+                        help="Embed titles into a separate 'title' vector of a new collection")
+    args = parser.parse_args()
+    load_all_conversations(
+        enrich=args.enrich,
+        nlp_processes=args.nlp_processes,
+        topics=args.topics,
+        layout=args.layout,
+        dedup=args.dedup,
+        rebuild_rollups=args.rebuild_rollups,
+        ollama_urls=args.ollama_urls,
+        workers=args.workers,
+        redact=args.redact,
+        redact_terms_file=args.redact_terms,
+        bulk=args.bulk,
+        backend=args.backend,
+        title_vectors=args.title_vectors
+    )
@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from memlog.conversation_format import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_TOKEN_BUDGET = 16_384  # Estimated tokens per embedding request
+DEFAULT_MAX_BATCH_ITEMS = 256  # Texts per embedding request, however short
+DEFAULT_MAX_ITEM_TOKENS = 512  # Estimated tokens per text: mxbai-embed-large's context window
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Split a text into pieces of at most max_tokens estimated tokens
+
+    Pieces end at a line break or space near the limit where possible.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = max(text.rfind("\n", start + max_chars // 2, end), text.rfind(" ", start + max_chars // 2, end))
+        if cut <= start:
+            cut = end
+        pieces.append(text[start:cut])
+        start = cut
+    pieces.append(text[start:])
+    return pieces
+
+
+def pack_batches(token_counts: List[int], token_budget: int, max_items: int) -> List[List[int]]:
+    """
+    Group items into requests of at most token_budget estimated tokens
+
+    Items are sorted by length first, so each request holds texts of similar
+    length and little padding is wasted.
+
+    Args:
+        token_counts: Estimated tokens of each item (none may exceed the budget)
+        token_budget: Token limit per request
+        max_items: Item limit per request
+
+    Returns:
+        Lists of item indices, one per request
+    """
+    batches, current, used = [], [], 0
+    for index in sorted(range(len(token_counts)), key=lambda i: token_counts[i]):
+        tokens = token_counts[index]
+        if current and (used + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def plan_requests(
+    texts: List[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_item_tokens: int = DEFAULT_MAX_ITEM_TOKENS
+) -> Tuple[List[str], List[int], List[List[int]]]:
+    """
+    Split oversize texts and pack everything into requests
+
+    The request budget only sets how much goes into one request; each text
+    must also fit the model's context, or the server truncates it.
+
+    Args:
+        texts: Texts to embed
+        token_budget: Estimated tokens per request
+        max_items: Pieces per request
+        max_item_tokens: Estimated tokens per piece (the model's context window)
+
+    Returns:
+        Pieces to embed, the index of the text each piece belongs to, and the
+        requests as lists of piece indices
+    """
+    item_limit = min(max_item_tokens, token_budget)
+    pieces, owners = [], []
+    for index, text in enumerate(texts):
+        parts = split_text(text, item_limit) if estimate_tokens(text) > item_limit else [text]
+        pieces.extend(parts)
+        owners.extend([index] * len(parts))
+    batches = pack_batches([estimate_tokens(piece) for piece in pieces], token_budget, max_items)
+    return pieces, owners, batches
+
+
+def embed_packed(
+    texts: List[str],
+    embed: Callable[[List[str]], np.ndarray],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_workers: int = 1,
+    max_item_tokens: int = DEFAULT_MAX_ITEM_TOKENS
+) -> np.ndarray:
+    """
+    Embed texts with token-budgeted requests, in the original order
+
+    Texts split into several pieces get the token-weighted mean of their
+    normalized piece embeddings, normalized again.
+
+    Args:
+        texts: Texts to embed
+        embed: Function embedding one request worth of texts
+        token_budget: Estimated tokens per request
+        max_items: Texts per request
+        max_workers: Requests sent concurrently (e.g. one per embedding server)
+        max_item_tokens: Estimated tokens per piece; longer texts are split
+
+    Returns:
+        One embedding per input text
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    pieces, owners, batches = plan_requests(texts, token_budget, max_items, max_item_tokens)
+    piece_vectors = [None] * len(pieces)
+    request_texts = ([pieces[i] for i in batch] for batch in batches)
+    if max_workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = list(executor.map(embed, request_texts))
+    else:
+        results = map(embed, request_texts)
+    for batch, embeddings in zip(batches, results):
+        for index, vector in zip(batch, embeddings):
+            piece_vectors[index] = np.asarray(vector, dtype=np.float32)
+
+    if len(pieces) == len(texts):
+        return np.stack(piece_vectors)
+
+    vectors = np.zeros((len(texts), len(piece_vectors[0])), dtype=np.float32)
+    split = np.bincount(owners, minlength=len(texts)) > 1
+    for piece, owner, vector in zip(pieces, owners, piece_vectors):
+        if split[owner]:
+            vectors[owner] += estimate_tokens(piece) * vector / max(np.linalg.norm(vector), 1e-12)
+        else:
+            vectors[owner] = vector
+    vectors[split] /= np.maximum(np.linalg.norm(vectors[split], axis=1, keepdims=True), 1e-12)
+    return vectors
@@ -0,0 +1,350 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Generator, Iterator, List, Optional
+
+import ijson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from memlog.conversation_format import (
+    conversation_id,
+    conversation_model,
+    detect_format,
+    format_conversation_text,
+    iter_messages,
+    to_timestamp,
+)
+from memlog.export_index import is_jsonl, iter_jsonl_records
+
+# Normalized store layout. Both tables are uncompressed Arrow IPC (Feather v2)
+# files so they can be memory-mapped and read with pandas.read_feather.
+CACHE_DIR = "conversation_cache"
+CONVERSATIONS_FILE = "conversations.arrow"
+MESSAGES_FILE = "messages.arrow"
+MANIFEST_FILE = "manifest.json"
+WRITE_BATCH_SIZE = 1000  # Conversations buffered before a record batch is written
+
+CONVERSATION_SCHEMA = pa.schema([
+    ("conversation_id", pa.string()),
+    ("title", pa.string()),
+    ("source", pa.string()),
+    ("format", pa.string()),
+    ("model", pa.string()),
+    ("create_time", pa.float64()),
+    ("update_time", pa.float64()),
+    ("message_offset", pa.int64()),
+    ("message_count", pa.int32()),
+    ("text_chars", pa.int64()),
+])
+
+MESSAGE_SCHEMA = pa.schema([
+    ("conversation_id", pa.string()),
+    ("ordinal", pa.int32()),
+    ("role", pa.string()),
+    ("timestamp", pa.float64()),
+    ("text", pa.string()),
+])
+
+
+def iter_export(file_path: str) -> Iterator[dict]:
+    """
+    Stream conversations from a JSON export without loading the whole file
+
+    Args:
+        file_path: Path to a JSON export (list or dict of conversations) or JSONL chunk
+
+    Yields:
+        Conversation dictionaries
+    """
+    if is_jsonl(file_path):
+        for _, _, conv in iter_jsonl_records(file_path):
+            if isinstance(conv, dict):
+                yield conv
+        return
+
+    with open(file_path, 'rb') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == b'[':
+            yield from ijson.items(f, 'item', use_float=True)
+        elif first == b'{':
+            for _, value in ijson.kvitems(f, '', use_float=True):
+                if isinstance(value, dict):
+                    yield value
+
+
+def _source_fingerprint(paths: List[str]) -> Dict[str, List[float]]:
+    """Size and mtime of every source file, used to detect stale caches"""
+    fingerprint = {}
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint[os.path.abspath(path)] = [stat.st_size, stat.st_mtime]
+    return fingerprint
+
+
+def build_conversation_cache(
+    sources: Dict[str, List[str]],
+    cache_dir: str = CACHE_DIR
+) -> Dict:
+    """
+    Normalize JSON exports into the columnar conversation cache
+
+    Args:
+        sources: Mapping of source name (e.g. 'conversations') to export file paths
+        cache_dir: Directory to write the cache to
+
+    Returns:
+        Manifest describing the written cache
+    """
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    conversations_tmp = cache_path / (CONVERSATIONS_FILE + ".tmp")
+    messages_tmp = cache_path / (MESSAGES_FILE + ".tmp")
+
+    seen_ids = set()
+    conversation_rows = {name: [] for name in CONVERSATION_SCHEMA.names}
+    message_rows = {name: [] for name in MESSAGE_SCHEMA.names}
+    message_offset = 0
+    buffered = 0
+
+    def flush(conv_writer, msg_writer):
+        conv_writer.write_batch(pa.RecordBatch.from_pydict(conversation_rows, schema=CONVERSATION_SCHEMA))
+        msg_writer.write_batch(pa.RecordBatch.from_pydict(message_rows, schema=MESSAGE_SCHEMA))
+        for rows in (conversation_rows, message_rows):
+            for column in rows.values():
+                column.clear()
+
+    with pa.OSFile(str(conversations_tmp), 'wb') as conv_sink, \
+            pa.OSFile(str(messages_tmp), 'wb') as msg_sink, \
+            pa.ipc.new_file(conv_sink, CONVERSATION_SCHEMA) as conv_writer, \
+            pa.ipc.new_file(msg_sink, MESSAGE_SCHEMA) as msg_writer:
+        for source, paths in sources.items():
+            for path in paths:
+                try:
+                    for conv in iter_export(path):
+                        conv_id = str(conversation_id(conv))
+                        if conv_id in seen_ids:
+                            continue
+                        seen_ids.add(conv_id)
+
+                        messages = list(iter_messages(conv))
+                        title = conv.get("title", "Untitled Conversation")
+                        conversation_rows["conversation_id"].append(conv_id)
+                        conversation_rows["title"].append(title)
+                        conversation_rows["source"].append(source)
+                        conversation_rows["format"].append(detect_format(conv))
+                        conversation_rows["model"].append(conversation_model(conv))
+                        conversation_rows["create_time"].append(to_timestamp(conv.get("create_time", conv.get("created_at"))))
+                        conversation_rows["update_time"].append(to_timestamp(conv.get("update_time", conv.get("updated_at"))))
+                        conversation_rows["message_offset"].append(message_offset)
+                        conversation_rows["message_count"].append(len(messages))
+                        conversation_rows["text_chars"].append(sum(len(m["text"]) for m in messages))
+
+                        for ordinal, message in enumerate(messages):
+                            message_rows["conversation_id"].append(conv_id)
+                            message_rows["ordinal"].append(ordinal)
+                            message_rows["role"].append(message["role"])
+                            message_rows["timestamp"].append(message["timestamp"])
+                            message_rows["text"].append(message["text"])
+                        message_offset += len(messages)
+
+                        buffered += 1
+                        if buffered >= WRITE_BATCH_SIZE:
+                            flush(conv_writer, msg_writer)
+                            buffered = 0
+                except (ijson.JSONError, ValueError, OSError) as e:
+                    print(f"Error normalizing {path}: {e}")
+                    continue
+        if buffered:
+            flush(conv_writer, msg_writer)
+
+    os.replace(conversations_tmp, cache_path / CONVERSATIONS_FILE)
+    os.replace(messages_tmp, cache_path / MESSAGES_FILE)
+
+    manifest = {
+        "sources": {name: _source_fingerprint(paths) for name, paths in sources.items()},
+        "conversation_count": len(seen_ids),
+        "message_count": message_offset
+    }
+    (cache_path / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    print(f"Normalized {len(seen_ids)} conversations ({message_offset} messages) into {cache_dir}")
+    return manifest
+
+
+def is_cache_current(sources: Dict[str, List[str]], cache_dir: str = CACHE_DIR) -> bool:
+    """Check whether the cache was built from exactly these source files"""
+    cache_path = Path(cache_dir)
+    manifest_path = cache_path / MANIFEST_FILE
+    if not manifest_path.exists() or not (cache_path / MESSAGES_FILE).exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        current = {name: _source_fingerprint(paths) for name, paths in sources.items()}
+    except (OSError, json.JSONDecodeError):
+        return False
+    return manifest.get("sources") == current
+
+
+def ensure_conversation_cache(sources: Dict[str, List[str]], cache_dir: str = CACHE_DIR) -> "ConversationCache":
+    """Rebuild the cache only if its source files changed, then open it"""
+    if not is_cache_current(sources, cache_dir):
+        build_conversation_cache(sources, cache_dir)
+    return ConversationCache(cache_dir)
+
+
+class ConversationCache:
+    """
+    Read access to the normalized conversation cache
+
+    Tables are memory-mapped, so opening the cache is cheap and column scans
+    only touch the pages they need.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        if not (self.cache_dir / CONVERSATIONS_FILE).exists():
+            raise FileNotFoundError(f"No conversation cache found in {cache_dir}")
+        self.conversations = feather.read_table(str(self.cache_dir / CONVERSATIONS_FILE), memory_map=True)
+        self.messages = feather.read_table(str(self.cache_dir / MESSAGES_FILE), memory_map=True)
+        self._row_by_id = None
+
+    def __len__(self) -> int:
+        return self.conversations.num_rows
+
+    def conversations_frame(self, columns: Optional[List[str]] = None):
+        """Conversation table as a pandas DataFrame"""
+        return self.conversations.select(columns or CONVERSATION_SCHEMA.names).to_pandas()
+
+    def messages_frame(self, columns: Optional[List[str]] = None):
+        """Message table as a pandas DataFrame"""
+        return self.messages.select(columns or MESSAGE_SCHEMA.names).to_pandas()
+
+    def _row(self, conv_id: str) -> Optional[int]:
+        if self._row_by_id is None:
+            ids = self.conversations.column("conversation_id").to_pylist()
+            self._row_by_id = {cid: row for row, cid in enumerate(ids)}
+        return self._row_by_id.get(str(conv_id))
+
+    def get_messages(self, conv_id: str, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """
+        Get a window of messages for one conversation
+
+        Args:
+            conv_id: Conversation id
+            start: First message ordinal to return
+            stop: Ordinal to stop before (None for the end of the conversation)
+
+        Returns:
+            List of message dictionaries (ordinal, role, timestamp, text)
+        """
+        row = self._row(conv_id)
+        if row is None:
+            return []
+        offset = self.conversations.column("message_offset")[row].as_py()
+        count = self.conversations.column("message_count")[row].as_py()
+        stop = count if stop is None else min(stop, count)
+        start = max(0, min(start, stop))
+        window = self.messages.slice(offset + start, stop - start)
+        return window.select(["ordinal", "role", "timestamp", "text"]).to_pylist()
+
+    def message_count(self, conv_id: str) -> int:
+        """Number of messages in a conversation (0 if it is not cached)"""
+        row = self._row(conv_id)
+        return 0 if row is None else self.conversations.column("message_count")[row].as_py()
+
+    def find_messages(self, conv_id: str, query: str, limit: int = 50) -> List[int]:
+        """
+        Ordinals of the messages that contain any word of a query
+
+        Only the conversation's own slice of the message table is scanned.
+
+        Args:
+            conv_id: Conversation id
+            query: Search text; words shorter than three characters are ignored
+            limit: Maximum ordinals returned
+
+        Returns:
+            Matching message ordinals in conversation order
+        """
+        row = self._row(conv_id)
+        terms = [term for term in query.lower().split() if len(term) > 2]
+        if row is None or not terms:
+            return []
+        offset = self.conversations.column("message_offset")[row].as_py()
+        count = self.conversations.column("message_count")[row].as_py()
+        texts = self.messages.column("text").slice(offset, count)
+        mask = None
+        for term in terms:
+            hits = pc.match_substring(texts, term, ignore_case=True)
+            mask = hits if mask is None else pc.or_(mask, hits)
+        matches = pc.indices_nonzero(pc.fill_null(mask, False)).to_pylist()
+        return matches[:limit]
+
+    def iter_conversations(
+        self,
+        batch_size: int = 100,
+        start_row: int = 0,
+        stop_row: Optional[int] = None
+    ) -> Generator[List[dict], None, None]:
+        """
+        Yield normalized conversations in batches, ready for process_conversations
+
+        Conversations are returned in the Claude-style `messages` layout, which
+        yields the same searchable text as the original export.
+
+        Args:
+            batch_size: Conversations per batch
+            start_row: First conversation row to read
+            stop_row: Row to stop before (None for the end of the cache)
+        """
+        stop_row = self.conversations.num_rows if stop_row is None else min(stop_row, self.conversations.num_rows)
+        for start in range(start_row, stop_row, batch_size):
+            rows = self.conversations.slice(start, min(batch_size, stop_row - start)).to_pylist()
+            first = rows[0]["message_offset"]
+            last = rows[-1]["message_offset"] + rows[-1]["message_count"]
+            texts = self.messages.column("text").slice(first, last - first).to_pylist()
+            roles = self.messages.column("role").slice(first, last - first).to_pylist()
+            timestamps = self.messages.column("timestamp").slice(first, last - first).to_pylist()
+
+            batch = []
+            for row in rows:
+                begin = row["message_offset"] - first
+                end = begin + row["message_count"]
+                conv = {
+                    "id": row["conversation_id"],
+                    "title": row["title"],
+                    "source": row["source"],
+                    "format": row["format"],
+                    "model": row["model"],
+                    "messages": [
+                        {"role": role, "content": text, "create_time": ts}
+                        for role, text, ts in zip(roles[begin:end], texts[begin:end], timestamps[begin:end])
+                    ]
+                }
+                if row["create_time"] is not None:
+                    conv["create_time"] = row["create_time"]
+                if row["update_time"] is not None:
+                    conv["update_time"] = row["update_time"]
+                batch.append(conv)
+            yield batch
+
+    def conversation_text(self, conv_id: str) -> Optional[str]:
+        """Searchable text for one conversation, read from the cache"""
+        row = self._row(conv_id)
+        if row is None:
+            return None
+        title = self.conversations.column("title")[row].as_py()
+        return format_conversation_text(title, self.get_messages(conv_id))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        build_conversation_cache({Path(p).stem: [p] for p in sys.argv[1:]})
+    else:
+        print("Usage: python -m memlog.conversation_cache <export.json> [...]")
@@ -0,0 +1,103 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+GPT_FORMAT = "gpt"
+CLAUDE_FORMAT = "claude"
+CHARS_PER_TOKEN = 4  # Rough average for English text with BPE/WordPiece tokenizers
+
+
+def detect_format(conversation: dict) -> str:
+    """
+    Detect which export format a conversation comes from
+
+    Args:
+        conversation: Dictionary containing conversation data
+
+    Returns:
+        GPT_FORMAT for ChatGPT `mapping` exports, CLAUDE_FORMAT otherwise
+    """
+    return GPT_FORMAT if "mapping" in conversation else CLAUDE_FORMAT
+
+
+def to_timestamp(value) -> Optional[float]:
+    """Convert an epoch number or ISO timestamp string to epoch seconds"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def conversation_id(conversation: dict) -> str:
+    """Stable conversation id, matching the id stored in the vector store payload"""
+    return conversation.get("id", hashlib.md5(str(conversation).encode()).hexdigest())
+
+
+def conversation_model(conversation: dict) -> Optional[str]:
+    """Model slug recorded in the export, if any"""
+    return conversation.get("default_model_slug") or conversation.get("model")
+
+
+def iter_messages(conversation: dict) -> Iterator[Dict]:
+    """
+    Yield the messages of a conversation in export order
+
+    Args:
+        conversation: Dictionary containing conversation data (GPT or Claude format)
+
+    Yields:
+        Dictionaries with role, timestamp (epoch seconds or None) and text
+    """
+    if detect_format(conversation) == GPT_FORMAT:
+        for node in conversation.get("mapping", {}).values():
+            message = node.get("message")
+            if not message or not message.get("content"):
+                continue
+            parts = message["content"].get("parts", [])
+            if parts and isinstance(parts[0], str) and parts[0]:
+                yield {
+                    "role": (message.get("author") or {}).get("role", "unknown"),
+                    "timestamp": to_timestamp(message.get("create_time")),
+                    "text": parts[0]
+                }
+    else:
+        for message in conversation.get("messages", []):
+            if not isinstance(message, dict):
+                continue
+            content = message.get("content", "")
+            if content:
+                yield {
+                    "role": message.get("role", "unknown"),
+                    "timestamp": to_timestamp(message.get("create_time", message.get("created_at"))),
+                    "text": content if isinstance(content, str) else str(content)
+                }
+
+
+def format_conversation_text(title: str, messages: List[Dict]) -> str:
+    """
+    Render messages as the searchable text used for embeddings
+
+    Args:
+        title: Conversation title
+        messages: Message dictionaries as produced by iter_messages
+
+    Returns:
+        Concatenated string of conversation content
+    """
+    lines = [f"{message['role']}: {message['text']}" for message in messages]
+    return f"Title: {title}\n\n" + "\n".join(lines)
+
+
+def conversation_text(conversation: dict) -> str:
+    """Extract searchable text from a conversation in any supported format"""
+    title = conversation.get("title", "Untitled Conversation")
+    return format_conversation_text(title, list(iter_messages(conversation)))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, without loading a tokenizer"""
+    return -(-len(text) // CHARS_PER_TOKEN)
@@ -1,13 +1,20 @@
 import json
+from collections import OrderedDict
+from contextlib import closing, contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Generator
+from typing import List, Dict, Optional, Generator, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
 from pathlib import Path
 import hashlib
 import psutil
 import time
+import uuid
 import threading
 import os
 import platform
+import random
+import re
+import sqlite3
 import requests
 import numpy as np
 
@@ -15,6 +22,62 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams
 
+from memlog.batch_packing import DEFAULT_MAX_BATCH_ITEMS, DEFAULT_MAX_ITEM_TOKENS, DEFAULT_TOKEN_BUDGET, embed_packed
+from memlog.conversation_format import conversation_id, conversation_text, to_timestamp
+from memlog.dedup import DEDUP_MODES, NearDuplicateIndex
+from memlog.diversify import CANDIDATES_PER_RESULT, DEFAULT_DIVERSITY, MAX_CANDIDATES, mmr_order
+from memlog.embedding_pool import EmbeddingEndpointPool
+from memlog.lexical_index import LexicalIndex, words
+from memlog.numpy_backend import NumpyVectorClient
+from memlog.enrichment import FACET_SCHEMA, ConversationEnricher
+from memlog.redaction import PIIRedactor
+from memlog.snapshot import iter_snapshot, read_manifest, write_snapshot
+from memlog.topic_clusters import DEFAULT_CLUSTERS, TopicClusterer, normalize_rows
+from memlog.topic_layout import TopicLayout
+from memlog.time_partitions import PARTITION_SCHEMES, overlapping_partitions, partition_key
+from memlog.usage_analytics import UsageRollups
+
+COLLECTIONS_REGISTRY = "collections.json"  # Active collection and model per alias, inside qdrant_path
+FULL_VECTOR = "full"  # Named vectors of the two-stage (Matryoshka) layout
+MINI_VECTOR = "mini"
+TITLE_VECTOR = "title"  # Embedded conversation title, next to the full vector
+DEFAULT_OVERSAMPLING = 4  # First-stage candidates per requested result
+PARTITION_PAYLOAD_FIELDS = ["id", "title", "create_time"]  # Full payloads stay in the main collection
+MAX_PARTITION_WORKERS = 8
+BULK_UPLOAD_BATCH_SIZE = 256  # Points per request in bulk-load mode
+BULK_UPLOAD_PARALLEL = 4  # Concurrent upload requests in bulk-load mode (server mode only)
+BULK_CHECKPOINT_SECONDS = 60  # How often bulk-load mode saves the processed ids
+DEFAULT_INDEXING_THRESHOLD = 20000  # Qdrant's default, restored if a collection reported none
+BACKENDS = ("qdrant", "numpy")  # Embedded Qdrant local mode, or memory-mapped exact search
+NUMPY_BACKEND_DIR = "numpy"  # NumPy backend collections, inside qdrant_path
+STORE_LOCK_FILE = ".memlog.lock"  # Not Qdrant's own '.lock', which the local client locks itself
+LOCAL_STORAGE_FILE = "storage.sqlite"  # Points of a local-mode collection, in qdrant_path/collection/<name>
+QUERY_CACHE_SIZE = 1024  # Query embeddings kept for repeated searches and the deadline fallback
+EMBED_BUDGET_SHARE = 0.6  # Share of a search deadline the query embedding may take
+QUERY_EMBED_TIMEOUT = 60  # Seconds a query embedding may keep running after its search moved on
+QUERY_EMBED_WORKERS = 2
+LEXICAL_BATCH_SIZE = 200  # Points read per client_lock hold while the lexical fallback index is built
+LEXICAL_BATCH_PAUSE = 0.005  # Seconds the lexical index build leaves client_lock free between batches
+
+
+class SearchResults(list):
+    """
+    Search hits, best first, and the stages that missed their time budget
+
+    `degraded_stages` maps a stage ('embed', 'retrieve' or 'lexical') to what
+    happened instead, e.g. the query embedding timed out and conversations
+    were matched by their words. It is empty when the search ran normally.
+    """
+
+    def __init__(self, results=(), degraded_stages: Optional[Dict[str, str]] = None):
+        super().__init__(results)
+        self.degraded_stages: Dict[str, str] = dict(degraded_stages or {})
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+
 class ConversationVectorStore:
     _instance = None
     _lock = threading.Lock()
@@ -31,18 +94,53 @@ class ConversationVectorStore:
         qdrant_path: str = "./qdrant_db",
         collection_name: str = "conversations",
         dimension: int = 1024,  # Correct dimension for mxbai-embed-large
-        ollama_url: str = "http://localhost:11434/api/embed"
+        ollama_url: Union[str, List[str]] = "http://localhost:11434/api/embed",
+        keep_alive: str = "30m",
+        mini_dimension: Optional[int] = None,
+        oversampling: int = DEFAULT_OVERSAMPLING,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_item_tokens: int = DEFAULT_MAX_ITEM_TOKENS,
+        redactor: Optional[PIIRedactor] = None,
+        backend: Optional[str] = None,
+        vector_dtype: str = "float32",
+        search_deadline: Optional[float] = None,
+        title_vectors: bool = False
     ):
         """
         Initialize local vector store with Ollama and Qdrant
         Uses singleton pattern to ensure only one instance exists
 
+        The Ollama connection is checked in the background while the model is
+        loaded (warmed up), so construction does not block on the model server.
+
         Args:
             model_name: Ollama model to use for embeddings
             qdrant_path: Path to store Qdrant database
             collection_name: Name of the collection in Qdrant
             dimension: Embedding dimension (1024 for mxbai-embed-large)
-            ollama_url: Base URL for Ollama API
+            ollama_url: Ollama embed URL, or a list of URLs to load-balance across
+            keep_alive: How long Ollama keeps the model loaded after a request
+            mini_dimension: Create new collections with a truncated 'mini' vector of this
+                size for first-stage search, reranked with the 'full' vector (e.g. 256 or
+                512 for mxbai-embed-large). Existing collections keep their layout.
+            oversampling: First-stage candidates fetched per result in two-stage search
+            token_budget: Estimated tokens per embedding request
+            max_batch_items: Texts per embedding request
+            max_item_tokens: Estimated tokens per embedded text, the model's context
+                window; longer texts are split and their piece embeddings mean-pooled
+            redactor: Scrubs PII from conversation text and titles before they are
+                embedded or stored. Remembered per collection: later stores opened
+                without one redact with the same terms file
+            backend: 'qdrant' (embedded local mode) or 'numpy' (memory-mapped exact
+                search, see memlog/numpy_backend.py); defaults to the backend the
+                collection was created with
+            vector_dtype: Storage type of new NumPy backend collections, 'float32' or 'float16'
+            search_deadline: Default time budget in seconds of search and filter_search
+                (None waits for Ollama and the vector store as long as it takes)
+            title_vectors: Create new collections with a 'title' vector holding the
+                embedded conversation title, for title-level search and related
+                conversations. Existing collections keep their layout.
         """
         # Only initialize once
         if hasattr(self, 'initialized'):
@@ -51,20 +149,40 @@ class ConversationVectorStore:
 
         # Initialize Ollama API parameters
         self.model_name = model_name
-        self.ollama_url = ollama_url
+        self.dimension = dimension
+        self.ollama_urls = [ollama_url] if isinstance(ollama_url, str) else list(ollama_url)
+        self.ollama_url = self.ollama_urls[0]
         self.ollama_headers = {'Content-Type': 'application/json'}
+        self.embedding_pool = EmbeddingEndpointPool(self.ollama_urls, self.ollama_headers)
+        self.keep_alive = keep_alive
+        self.oversampling = oversampling
+        self.token_budget = token_budget
+        self.max_batch_items = max_batch_items
+        self.max_item_tokens = max_item_tokens
+        self.redactor = redactor
+        self.bulk_loading = False
+        self._deferred_indexing: Dict[str, Optional[int]] = {}
+        self._last_checkpoint = 0.0
 
-        # Test Ollama connection
-        try:
-            self._test_ollama_connection()
-        except Exception as e:
-            raise RuntimeError(f"Failed to connect to Ollama API: {str(e)}")
+        self.ollama_ready = threading.Event()
+        self.ollama_error = None
+        # Embedded local mode is not safe for searches while points are written
+        self.client_lock = threading.RLock()
+        self._lock_purpose: Optional[str] = None  # Set while a read holds client_lock
+
+        # Query embeddings by (model, query), and the lexical index searches fall back to
+        self.search_deadline = search_deadline
+        self._query_vectors: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._query_lock = threading.Lock()
+        self._query_executor = ThreadPoolExecutor(max_workers=QUERY_EMBED_WORKERS, thread_name_prefix="query-embed")
+        self.lexical_index: Optional[LexicalIndex] = None
 
         # Ensure qdrant directory exists
         os.makedirs(qdrant_path, exist_ok=True)
 
         # Create lock file path
-        self.lock_file = Path(qdrant_path) / ".lock"
+        self.qdrant_path = Path(qdrant_path)
+        self.lock_file = self.qdrant_path / STORE_LOCK_FILE
 
         try:
             # Cross-platform file locking
@@ -84,51 +202,129 @@ class ConversationVectorStore:
                 self.lock_fd = os.open(str(self.lock_file), os.O_RDWR | os.O_CREAT)
                 fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
 
-            # Setup Qdrant
-            self.client = QdrantClient(path=qdrant_path)
             self.collection_name = collection_name
+            self.migration_status: Dict = {"state": "idle"}
+            self.registry_file = Path(qdrant_path) / COLLECTIONS_REGISTRY
+            registry = self._load_registry()
+            active = registry.get(collection_name, {})
+
+            # Setup the vector backend; the choice is remembered per collection
+            self.backend = backend or active.get("backend", "qdrant")
+            if self.backend not in BACKENDS:
+                raise ValueError(f"Unknown vector backend: {self.backend}")
+            if self.backend == "numpy":
+                self.client = NumpyVectorClient(str(Path(qdrant_path) / NUMPY_BACKEND_DIR), vector_dtype=vector_dtype)
+            else:
+                self.client = QdrantClient(path=qdrant_path)
+            if active.get("backend", "qdrant") != self.backend:
+                registry.setdefault(collection_name, {})["backend"] = self.backend
+                self._save_registry(registry)
+
+            # Redaction is remembered per collection too, so every later writer
+            # (the UI's ingest jobs included) scrubs the same PII
+            if redactor is None and "redact" in active:
+                self.redactor = PIIRedactor(terms_file=active["redact"].get("terms_file"))
+            elif redactor is not None and active.get("redact") != {"terms_file": redactor.terms_file}:
+                registry.setdefault(collection_name, {})["redact"] = {"terms_file": redactor.terms_file}
+                self._save_registry(registry)
+
+            # A completed model migration overrides the configured model
+            self.partition_by = active.get("partition_by")
+            if "model_name" in active and (active["model_name"], active["dimension"]) != (model_name, dimension):
+                print(f"Using migrated model {active['model_name']} ({active['dimension']}d) for {collection_name}")
+                self.model_name = active["model_name"]
+                self.dimension = active["dimension"]
 
             # Create collection if it doesn't exist
-            self._create_collection(dimension)
+            self.target_mini_dimension = mini_dimension
+            self.target_title_vectors = title_vectors
+            self._create_collection(self.dimension, mini_dimension=mini_dimension, title_vectors=title_vectors)
+            self.mini_dimension, self.title_vectors = self._read_layout(self.collection_name)
+            if mini_dimension and self.mini_dimension != mini_dimension:
+                print(f"{collection_name} has no {mini_dimension}d mini vector; migrate the collection to add one")
+            if title_vectors and not self.title_vectors:
+                print(f"{collection_name} has no title vectors; migrate the collection to add them")
 
             # Track processed conversations
             self.processed_file = Path("processed_conversations.json")
             self.processed_ids = self._load_processed_ids()
 
+            # Persisted topic centroids and 2D map, updated incrementally on ingest
+            self.topic_clusters = TopicClusterer()
+            self.topic_layout = TopicLayout()
+            self.dedup_index = NearDuplicateIndex()
+            self.usage_rollups = UsageRollups()
+
             # Performance monitoring
             self.performance_log = Path("vector_store_performance.log")
             self._init_performance_log()
 
+            # Check the connection and load the model without blocking startup
+            threading.Thread(target=self._warm_up_model, daemon=True).start()
+            if search_deadline is not None:
+                # Deadline searches fall back to the word index; have it ready before the first one
+                self._ensure_lexical_index()
+
         except Exception as e:
             # Release lock and close file if initialization fails
             self._release_lock()
             raise RuntimeError(f"Error initializing vector store: {str(e)}")
 
     def _test_ollama_connection(self):
-        """Test connection to Ollama API"""
+        """Test connection to every Ollama endpoint; fail only if none responds"""
+        errors = self.embedding_pool.check_health(self.model_name, self.keep_alive)
+        for url, error in errors.items():
+            if error is not None and len(errors) > 1:
+                print(f"Warning: embedding endpoint {url} is unavailable: {error}")
+        if all(error is not None for error in errors.values()):
+            raise RuntimeError(f"Failed to connect to Ollama API: {next(iter(errors.values()))}")
         try:
-            # Simple test embedding
-            test_payload = {
-                "model": self.model_name,
-                "input": ["test"]
-            }
-            response = requests.post(self.ollama_url, headers=self.ollama_headers, json=test_payload, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            if "embeddings" not in data or not data["embeddings"]:
-                raise RuntimeError("Invalid response from Ollama API")
-            if len(data["embeddings"][0]) != 1024:
-                raise RuntimeError(f"Unexpected embedding dimension: {len(data['embeddings'][0])}")
+            data = self.embedding_pool.post(
+                {"model": self.model_name, "input": ["test"], "keep_alive": self.keep_alive}, timeout=5
+            )
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to connect to Ollama API: {str(e)}")
+        if "embeddings" not in data or not data["embeddings"]:
+            raise RuntimeError("Invalid response from Ollama API")
+        if len(data["embeddings"][0]) != self.dimension:
+            raise RuntimeError(f"Unexpected embedding dimension: {len(data['embeddings'][0])}")
+
+    def _warm_up_model(self):
+        """Test the Ollama connection and load the model in the background"""
+        start_time = time.time()
+        try:
+            self._test_ollama_connection()
+            self.ollama_error = None
+            self._log_performance("ollama_warmup", time.time() - start_time)
+        except Exception as e:
+            self.ollama_error = str(e)
+            print(f"Ollama warm-up failed: {e}")
+        finally:
+            self.ollama_ready.set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the background Ollama warm-up to finish
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if Ollama responded successfully
+        """
+        return self.ollama_ready.wait(timeout) and self.ollama_error is None
 
     def _release_lock(self):
-        """Release file lock in a cross-platform way"""
+        """Release file lock in a cross-platform way; later calls do nothing"""
+        # __del__ calls this again, when the descriptor may already belong to another file
+        lock_fd, self.lock_fd = getattr(self, "lock_fd", None), None
+        if lock_fd is None:
+            return
         try:
             if platform.system() != 'Windows':
                 import fcntl
-                fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
-            os.close(self.lock_fd)
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
             if self.lock_file.exists():
                 os.unlink(str(self.lock_file))
         except:
@@ -152,14 +348,287 @@ class ConversationVectorStore:
         with open(self.performance_log, 'a') as f:
             f.write(log_entry)
 
-    def _create_collection(self, dimension: int):
-        """Create Qdrant collection if it doesn't exist"""
-        collections = self.client.get_collections().collections
-        if not any(c.name == self.collection_name for c in collections):
-            self.client.create_collection(
+    def _create_collection(
+        self,
+        dimension: int,
+        collection_name: Optional[str] = None,
+        mini_dimension: Optional[int] = None,
+        title_vectors: bool = False
+    ):
+        """Create Qdrant collection if it doesn't exist (an alias counts as existing)"""
+        collection_name = collection_name or self.collection_name
+        if not self.client.collection_exists(collection_name):
+            if mini_dimension:
+                # Only the mini vectors get an HNSW graph and stay in memory; full
+                # vectors are read from disk for reranking the candidates
+                vectors_config = {
+                    FULL_VECTOR: VectorParams(
+                        size=dimension,
+                        distance=Distance.COSINE,
+                        on_disk=True,
+                        hnsw_config=models.HnswConfigDiff(m=0)
+                    ),
+                    MINI_VECTOR: VectorParams(size=mini_dimension, distance=Distance.COSINE)
+                }
+            elif title_vectors:
+                vectors_config = {FULL_VECTOR: VectorParams(size=dimension, distance=Distance.COSINE)}
+            else:
+                vectors_config = VectorParams(size=dimension, distance=Distance.COSINE)
+            if title_vectors:
+                vectors_config[TITLE_VECTOR] = VectorParams(size=dimension, distance=Distance.COSINE)
+            self.client.create_collection(collection_name=collection_name, vectors_config=vectors_config)
+
+    def _read_layout(self, collection_name: str) -> tuple:
+        """
+        Vector layout of a collection
+
+        Returns:
+            (size of the mini vector or None, whether points have a title vector)
+        """
+        vectors = self.client.get_collection(collection_name).config.params.vectors
+        if not isinstance(vectors, dict):
+            return None, False
+        mini = vectors.get(MINI_VECTOR)
+        return (mini.size if mini else None), TITLE_VECTOR in vectors
+
+    def _layout_of(self, collection_name: str) -> tuple:
+        """Cached _read_layout for collections other than the active one"""
+        layouts = self.__dict__.setdefault("_layouts", {})
+        if collection_name not in layouts:
+            with self.client_lock:
+                layouts[collection_name] = self._read_layout(collection_name)
+        return layouts[collection_name]
+
+    @staticmethod
+    def _layout_vectors(
+        embeddings: np.ndarray,
+        mini_dimension: Optional[int],
+        title_embeddings: Optional[np.ndarray] = None
+    ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Vectors of a collection layout: the embeddings, or an array per named vector
+
+        With a mini vector, the first mini_dimension components of the embedding
+        are re-normalized (Matryoshka truncation) and stored next to the full vector.
+        Title embeddings are stored as the title vector.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not mini_dimension and title_embeddings is None:
+            return embeddings
+        vectors = {FULL_VECTOR: embeddings}
+        if mini_dimension:
+            vectors[MINI_VECTOR] = normalize_rows(embeddings[:, :mini_dimension])
+        if title_embeddings is not None:
+            vectors[TITLE_VECTOR] = np.asarray(title_embeddings, dtype=np.float32)
+        return vectors
+
+    @classmethod
+    def _point_vectors(
+        cls,
+        embeddings: np.ndarray,
+        mini_dimension: Optional[int],
+        title_embeddings: Optional[np.ndarray] = None
+    ) -> List:
+        """Per-point vector structs for a collection layout (see _layout_vectors)"""
+        vectors = cls._layout_vectors(embeddings, mini_dimension, title_embeddings)
+        if not isinstance(vectors, dict):
+            return vectors.tolist()
+        return [
+            {name: matrix[i].tolist() for name, matrix in vectors.items()}
+            for i in range(len(embeddings))
+        ]
+
+    @contextmanager
+    def _locked_client(self, timeout: Optional[float] = None, purpose: str = "another search"):
+        """
+        Hold client_lock for a read
+
+        Args:
+            timeout: Seconds to wait for the lock (None waits as long as it takes)
+            purpose: What the lock is held for, reported to reads that time out meanwhile
+
+        Raises:
+            TimeoutError: If the client stayed busy for longer than timeout seconds
+        """
+        if not self.client_lock.acquire(timeout=-1 if timeout is None else max(timeout, 0)):
+            # Holders that take client_lock directly are writes and maintenance
+            raise TimeoutError(f"vector store was busy with {self._lock_purpose or 'writes'} for {timeout:.1f} s")
+        outer_purpose, self._lock_purpose = self._lock_purpose, purpose
+        try:
+            yield self.client
+        finally:
+            self._lock_purpose = outer_purpose
+            self.client_lock.release()
+
+    def _vector_search(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        query_filter: Optional[models.Filter] = None,
+        score_threshold: Optional[float] = None,
+        collection_name: Optional[str] = None,
+        oversampling: Optional[int] = None,
+        timeout: Optional[float] = None,
+        title_weight: float = 0.0,
+        title_query: Optional[np.ndarray] = None,
+        with_payload=True,
+        with_vectors: bool = False
+    ) -> List:
+        """
+        Nearest points for a query vector, two-stage when the collection has a mini vector
+
+        The first stage searches the truncated vectors for limit * oversampling
+        candidates; they are reranked by exact cosine similarity of the full vectors.
+
+        With a title_weight between 0 and 1, the nearest titles and the nearest
+        bodies (limit * oversampling each) are candidates, ranked by
+        (1 - title_weight) * body similarity + title_weight * title similarity
+        computed from their stored vectors.
+
+        Args:
+            timeout: Seconds to wait for the client if a write holds it (None waits)
+            title_weight: Share of the score from title similarity (needs title vectors)
+            title_query: Vector compared with the titles (defaults to query_vector)
+            with_payload: Payload to return, as for QdrantClient.search
+            with_vectors: Keep each result's full vector (a list) in point.vector
+
+        Returns:
+            Scored points, best first (scores are full-vector cosine similarities,
+            weighted with title similarities)
+
+        Raises:
+            TimeoutError: If the client stayed busy for longer than timeout
+        """
+        if collection_name is None:
+            collection_name, mini_dimension, titled = self.collection_name, self.mini_dimension, self.title_vectors
+        else:
+            mini_dimension, titled = self._layout_of(collection_name)
+        if title_weight and not titled:
+            raise RuntimeError(f"{collection_name} has no title vectors")
+
+        if title_weight >= 1 or (not mini_dimension and not title_weight):
+            if title_weight >= 1:
+                query = models.NamedVector(
+                    name=TITLE_VECTOR,
+                    vector=np.asarray(query_vector if title_query is None else title_query, dtype=np.float32).tolist()
+                )
+            elif titled:
+                query = models.NamedVector(name=FULL_VECTOR, vector=np.asarray(query_vector, dtype=np.float32).tolist())
+            else:
+                query = query_vector
+            with self._locked_client(timeout) as client:
+                points = client.search(
+                    collection_name=collection_name,
+                    query_vector=query,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    query_filter=query_filter,
+                    with_payload=with_payload,
+                    with_vectors=([FULL_VECTOR] if titled else True) if with_vectors else False
+                )
+            if with_vectors and titled:
+                for point in points:
+                    point.vector = point.vector[FULL_VECTOR]
+            return points
+
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+        if mini_dimension:
+            mini_query = query_vector[:mini_dimension] / max(np.linalg.norm(query_vector[:mini_dimension]), 1e-12)
+            first_stage = [models.NamedVector(name=MINI_VECTOR, vector=mini_query.tolist())]
+        else:
+            first_stage = [models.NamedVector(name=FULL_VECTOR, vector=query_vector.tolist())]
+        if title_weight:
+            title_query = np.asarray(query_vector if title_query is None else title_query, dtype=np.float32)
+            title_query = title_query / max(np.linalg.norm(title_query), 1e-12)
+            first_stage.append(models.NamedVector(name=TITLE_VECTOR, vector=title_query.tolist()))
+
+        candidates = {}
+        with self._locked_client(timeout) as client:
+            for named_query in first_stage:
+                for point in client.search(
+                    collection_name=collection_name,
+                    query_vector=named_query,
+                    limit=limit * (oversampling or self.oversampling),
+                    query_filter=query_filter,
+                    with_payload=with_payload,
+                    with_vectors=[FULL_VECTOR, TITLE_VECTOR] if title_weight else [FULL_VECTOR]
+                ):
+                    candidates.setdefault(str(point.id), point)
+        candidates = list(candidates.values())
+        if not candidates:
+            return []
+        scores = normalize_rows([point.vector[FULL_VECTOR] for point in candidates]) @ query_vector
+        if title_weight:
+            title_scores = normalize_rows([point.vector[TITLE_VECTOR] for point in candidates]) @ title_query
+            scores = (1 - title_weight) * scores + title_weight * title_scores
+        ranked = []
+        for index in np.argsort(-scores)[:limit]:
+            if score_threshold is not None and scores[index] < score_threshold:
+                break
+            point = candidates[index]
+            point.score = float(scores[index])
+            point.vector = point.vector[FULL_VECTOR] if with_vectors else None
+            ranked.append(point)
+        return ranked
+
+    def _load_registry(self) -> Dict:
+        """Active physical collection and model for each alias"""
+        if self.registry_file.exists():
+            return json.loads(self.registry_file.read_text())
+        return {}
+
+    def _save_registry(self, registry: Dict):
+        tmp_file = self.registry_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(registry, indent=2))
+        os.replace(tmp_file, self.registry_file)
+
+    def _physical_collection(self) -> str:
+        """Collection currently behind the store's alias (or the collection itself)"""
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return self.collection_name
+
+    @staticmethod
+    def _point_id(conv_id) -> str:
+        """
+        Point id derived from a conversation id: the MD5 hex digest
+
+        Local Qdrant keeps ids exactly as given, so this must stay the format
+        existing stores were written with.
+        """
+        return hashlib.md5(str(conv_id).encode()).hexdigest()
+
+    @classmethod
+    def _is_point_of(cls, point_id, conv_id) -> bool:
+        """
+        Whether a stored point id belongs to a conversation
+
+        Accepts the hex digest in either UUID spelling, since a point id read
+        back may be hyphenated even where it was written as plain hex.
+        """
+        expected = cls._point_id(conv_id)
+        try:
+            return uuid.UUID(str(point_id)).hex == expected
+        except ValueError:
+            return False
+
+    def _create_facet_indexes(self):
+        """Index the enrichment facets so they can be used as search filters"""
+        if getattr(self, "_facet_indexes_created", False):
+            return
+        schema_types = {
+            "keyword": models.PayloadSchemaType.KEYWORD,
+            "float": models.PayloadSchemaType.FLOAT,
+        }
+        for field, schema in FACET_SCHEMA.items():
+            self.client.create_payload_index(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(size=dimension, distance=Distance.COSINE)
+                field_name=field,
+                field_schema=schema_types[schema]
             )
+        self._facet_indexes_created = True
 
     def _load_processed_ids(self) -> set:
         """Load set of processed conversation IDs"""
@@ -179,37 +648,42 @@ class ConversationVectorStore:
             conversation: Dictionary containing conversation data
             
         Returns:
-            Concatenated string of conversation content
+            Concatenated string of conversation content, with PII redacted if a
+            redactor is set
         """
-        messages = []
-        
-        # Handle different conversation formats (GPT vs Claude)
-        if "mapping" in conversation:  # GPT format
-            for node in conversation.get("mapping", {}).values():
-                if node.get("message") and node["message"].get("content"):
-                    content = node["message"]["content"].get("parts", [])
-                    if content and isinstance(content[0], str):
-                        role = node["message"]["author"].get("role", "unknown")
-                        messages.append(f"{role}: {content[0]}")
-        else:  # Claude format
-            for message in conversation.get("messages", []):
-                if isinstance(message, dict):
-                    role = message.get("role", "unknown")
-                    content = message.get("content", "")
-                    if content:
-                        messages.append(f"{role}: {content}")
-        
-        title = conversation.get("title", "Untitled Conversation")
-        return f"Title: {title}\n\n" + "\n".join(messages)
+        return self._extract_texts([conversation])[0]
+
+    def _extract_texts(self, conversations: List[dict]) -> List[str]:
+        """Searchable text of several conversations, redacted in one batch"""
+        texts = [conversation_text(conv) for conv in conversations]
+        return self.redactor.redact_many(texts) if self.redactor else texts
 
-    def process_conversations(self, conversations: List[dict], batch_size: int = 100):
+    def _redact_title(self, title: str) -> str:
+        return self.redactor.redact(title) if self.redactor else title
+
+    def process_conversations(
+        self,
+        conversations: List[dict],
+        batch_size: int = 100,
+        enricher: Optional[ConversationEnricher] = None,
+        dedup: Optional[str] = None,
+        precomputed: Optional[Dict[str, np.ndarray]] = None
+    ):
         """
         Process and store conversations in batches with performance monitoring
 
         Args:
             conversations: List of conversation dictionaries
             batch_size: Number of conversations to process at once
+            enricher: Optional enrichment stage adding entity and sentiment facets
+            dedup: Near-duplicate handling before embedding: None embeds everything,
+                'link' records duplicates on their canonical point only, 'reuse' also
+                stores them as points sharing the canonical vector
+            precomputed: Embeddings already made with this store's model, by
+                conversation id (e.g. by ingest workers); only the rest are embedded
         """
+        if dedup is not None and dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {dedup}")
         start_time = time.time()
 
         new_conversations = [
@@ -221,54 +695,109 @@ class ConversationVectorStore:
             print("No new conversations to process")
             return
 
+        # Text is extracted (and redacted) once for dedup, enrichment and embedding
+        redact_start = time.time()
+        redacted_before = self.redactor.counts.copy() if self.redactor else None
+        new_texts = self._extract_texts(new_conversations)
+        if self.redactor:
+            self._log_performance("redact", time.time() - redact_start, len(new_conversations))
+
+        # Near duplicates are set aside and never embedded
+        duplicates = []
+        if dedup is not None:
+            dedup_start = time.time()
+            unique, unique_texts = [], []
+            for conv, text in zip(new_conversations, new_texts):
+                canonical = self.dedup_index.add(conversation_id(conv), text)
+                if canonical is None:
+                    unique.append(conv)
+                    unique_texts.append(text)
+                else:
+                    duplicates.append((conv, canonical, text))
+            new_conversations, new_texts = unique, unique_texts
+            self._log_performance("dedup", time.time() - dedup_start, len(unique) + len(duplicates))
+            if duplicates:
+                print(f"Skipping embedding for {len(duplicates)} near-duplicate conversations")
+
         total = len(new_conversations)
         print(f"Processing {total} new conversations")
 
+        # Entity and sentiment facets are computed for all new conversations
+        # at once so spaCy and VADER work on large batches (cached by content hash)
+        facets = None
+        if enricher is not None:
+            self._create_facet_indexes()
+            enrich_start = time.time()
+            facets = enricher.enrich(new_conversations, new_texts)
+            self._log_performance("enrich", time.time() - enrich_start, total)
+
         # Process in batches
         for i in range(0, total, batch_size):
             batch_start = time.time()
             batch = new_conversations[i:i + batch_size]
 
             # Prepare texts and metadata
-            texts = [self._extract_conversation_text(conv) for conv in batch]
+            texts = new_texts[i:i + batch_size]
             metadata = [
                 {
                     "id": conv.get("id", hashlib.md5(str(conv).encode()).hexdigest()),
-                    "title": conv.get("title", "Untitled"),
+                    "title": self._redact_title(conv.get("title", "Untitled")),
                     "create_time": conv.get("create_time", datetime.now().timestamp()),
                     "update_time": conv.get("update_time", datetime.now().timestamp())
                 }
                 for conv in batch
             ]
 
-            # Generate embeddings using Ollama API
+            if facets is not None:
+                for meta, conv_facets in zip(metadata, facets[i:i + batch_size]):
+                    meta.update(conv_facets)
+
+            # Generate embeddings using Ollama API; titles are packed into the
+            # same requests as the bodies
+            vectors = [(precomputed or {}).get(meta["id"]) for meta in metadata]
+            missing = [j for j, vector in enumerate(vectors) if vector is None]
+            titles = [meta["title"] for meta in metadata] if self.title_vectors else []
+            title_embeddings = None
             try:
-                embeddings = self._get_ollama_embeddings(texts)
+                if missing or titles:
+                    embedded = self._embed_texts([texts[j] for j in missing] + titles)
+                    for j, vector in zip(missing, embedded):
+                        vectors[j] = vector
+                    if titles:
+                        title_embeddings = embedded[len(missing):]
             except requests.exceptions.RequestException as e:
                 self._log_performance("ollama_api_error", time.time() - batch_start, len(batch))
                 print(f"Error calling Ollama API: {e}")
                 continue # Skip this batch and move to the next
+            embeddings = np.stack(vectors).astype(np.float32)
+
+            # Assign new conversations to existing topics without reclustering
+            if self.topic_clusters.fitted:
+                for meta, cluster_id in zip(metadata, self.topic_clusters.assign(embeddings)):
+                    meta["cluster_id"] = int(cluster_id)
 
             # Upload to Qdrant
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    models.PointStruct(
-                        id=hashlib.md5(str(meta["id"]).encode()).hexdigest(),
-                        vector=embedding.tolist(),
-                        payload={
-                            "text": text,
-                            **meta
-                        }
-                    )
-                    for embedding, text, meta
-                    in zip(embeddings, texts, metadata)
-                ]
+            upload_start = time.time()
+            point_ids = [self._point_id(meta["id"]) for meta in metadata]
+            payloads = [{"text": text, **meta} for text, meta in zip(texts, metadata)]
+            self._upload_points(
+                self.collection_name, point_ids, embeddings, payloads, self.mini_dimension, title_embeddings
             )
 
-            # Update processed IDs
+            if self.partition_by:
+                self._write_partitions(point_ids, embeddings, metadata)
+            self._log_performance("qdrant_upload", time.time() - upload_start, len(batch))
+            self._index_lexical(point_ids, payloads)
+
+            if self.topic_layout.fitted:
+                self.topic_layout.add_points(
+                    point_ids, embeddings, [meta.get("cluster_id", -1) for meta in metadata]
+                )
+
+            # Update processed IDs and the usage rollups
             self.processed_ids.update(meta["id"] for meta in metadata)
-            self._save_processed_ids()
+            self._checkpoint_processed_ids()
+            self.usage_rollups.add(batch, texts)
 
             batch_duration = time.time() - batch_start
             self._log_performance("batch_process", batch_duration, len(batch))
@@ -276,129 +805,1390 @@ class ConversationVectorStore:
             progress = min(100, (i + batch_size) * 100 / total)
             print(f"Progress: {progress:.1f}% ({i + len(batch)}/{total})")
 
+        if duplicates:
+            self._link_duplicates(duplicates, reuse_vectors=dedup == "reuse")
+        if not self.bulk_loading:
+            self._save_ingest_state(dedup_used=dedup is not None)
+
+        if self.redactor:
+            redacted = self.redactor.counts - redacted_before
+            if redacted:
+                print("Redacted PII: " + ", ".join(f"{category}: {count}" for category, count in sorted(redacted.items())))
+
         total_duration = time.time() - start_time
         self._log_performance("total_process", total_duration, total)
         print(f"Processing completed in {total_duration:.2f} seconds")
 
-    def _get_ollama_embeddings(self, texts: List[str]) -> np.ndarray:
+    def _upload_points(
+        self,
+        collection_name: str,
+        point_ids: List[str],
+        embeddings: np.ndarray,
+        payloads: List[Dict],
+        mini_dimension: Optional[int],
+        title_embeddings: Optional[np.ndarray] = None
+    ):
+        """
+        Write points to a collection
+
+        In bulk-load mode vectors go to upload_collection as NumPy arrays, in
+        parallel batches without waiting for each write to be applied, and the
+        collection's indexing is deferred until the load ends.
+        """
+        if not self.bulk_loading:
+            with self.client_lock:
+                self.client.upsert(
+                    collection_name=collection_name,
+                    points=[
+                        models.PointStruct(id=point_id, vector=vector, payload=payload)
+                        for point_id, vector, payload
+                        in zip(point_ids, self._point_vectors(embeddings, mini_dimension, title_embeddings), payloads)
+                    ]
+                )
+            return
+
+        self._defer_indexing(collection_name)
+        vectors = self._layout_vectors(embeddings, mini_dimension, title_embeddings)
+        with self.client_lock:
+            self.client.upload_collection(
+                collection_name=collection_name,
+                vectors=vectors,
+                payload=payloads,
+                ids=point_ids,
+                batch_size=BULK_UPLOAD_BATCH_SIZE,
+                # Worker processes only pay off for several requests' worth of points
+                parallel=max(1, min(BULK_UPLOAD_PARALLEL, len(point_ids) // BULK_UPLOAD_BATCH_SIZE)),
+                wait=False
+            )
+
+    def _defer_indexing(self, collection_name: str):
+        """Stop HNSW indexing of a collection until the bulk load ends"""
+        if collection_name in self._deferred_indexing:
+            return
+        config = self.client.get_collection(collection_name).config.optimizer_config
+        self._deferred_indexing[collection_name] = config.indexing_threshold
+        self.client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+
+    def _checkpoint_processed_ids(self):
+        """Save processed ids; in bulk-load mode at most every BULK_CHECKPOINT_SECONDS"""
+        if self.bulk_loading and time.time() - self._last_checkpoint < BULK_CHECKPOINT_SECONDS:
+            return
+        self._save_processed_ids()
+        self._last_checkpoint = time.time()
+
+    def _save_ingest_state(self, dedup_used: bool = True):
+        """Persist processed ids, dedup signatures, usage rollups and topic files"""
+        self._save_processed_ids()
+        if dedup_used:
+            self.dedup_index.save()
+        self.usage_rollups.save()
+        if self.topic_clusters.fitted:
+            self.topic_clusters.save()
+        if self.topic_layout.fitted:
+            self.topic_layout.save()
+
+    @contextmanager
+    def bulk_load(self, wait_for_index: bool = True):
+        """
+        Bulk-load mode for large imports
+
+        Inside the block, process_conversations uploads NumPy vectors with
+        parallel non-blocking requests and HNSW indexing is switched off
+        (indexing_threshold=0) for every collection written to. Processed ids
+        are checkpointed periodically, and the dedup index, usage rollups and
+        topic files are saved once at the end instead of after every call.
+        On exit the indexing thresholds are restored, so Qdrant builds each
+        index once, and the block waits until the collections are optimized.
+
+        The embedded local database has no HNSW index and applies uploads
+        synchronously, so there only the deferred bookkeeping takes effect.
+
+        Usage:
+            with vector_store.bulk_load():
+                for batch in batches:
+                    vector_store.process_conversations(batch)
+        """
+        if self.bulk_loading:
+            yield self
+            return
+        self.bulk_loading = True
+        start_time = time.time()
+        try:
+            yield self
+        finally:
+            self.bulk_loading = False
+            self._save_ingest_state()
+            deferred, self._deferred_indexing = self._deferred_indexing, {}
+            for collection_name, threshold in deferred.items():
+                self.client.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=models.OptimizersConfigDiff(
+                        indexing_threshold=threshold or DEFAULT_INDEXING_THRESHOLD
+                    )
+                )
+            if wait_for_index:
+                self._wait_until_optimized(list(deferred))
+            self._log_performance("bulk_load", time.time() - start_time)
+
+    def _wait_until_optimized(self, collection_names: List[str], poll_seconds: float = 2.0):
+        """Block until Qdrant reports the collections green (index built, optimizations done)"""
+        start_time = time.time()
+        pending = list(collection_names)
+        while pending:
+            pending = [
+                name for name in pending
+                if self.client.get_collection(name).status != models.CollectionStatus.GREEN
+            ]
+            if pending:
+                print(f"Waiting for Qdrant to index {', '.join(pending)} ({time.time() - start_time:.0f}s)")
+                time.sleep(poll_seconds)
+        if collection_names:
+            self._log_performance("index_build", time.time() - start_time)
+
+    def _link_duplicates(self, duplicates: List[tuple], reuse_vectors: bool = False):
+        """
+        Record near duplicates on their canonical points
+
+        Args:
+            duplicates: (conversation, canonical conversation id, conversation text) triples
+            reuse_vectors: Also store each duplicate as a point with the canonical
+                vector, marked with duplicate_of so searches can collapse it
+        """
+        groups: Dict[str, List[dict]] = {}
+        texts: Dict[str, str] = {}
+        for conv, canonical, text in duplicates:
+            groups.setdefault(canonical, []).append(conv)
+            texts[conversation_id(conv)] = text
+
+        canonical_ids = list(groups)
+        records = {}
+        for i in range(0, len(canonical_ids), 256):
+            chunk = canonical_ids[i:i + 256]
+            for record in self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[self._point_id(conv_id) for conv_id in chunk],
+                with_payload=["id", "duplicate_ids"],
+                with_vectors=reuse_vectors
+            ):
+                records[record.payload["id"]] = record
+
+        linked = []
+        for canonical, convs in groups.items():
+            record = records.get(canonical)
+            if record is None:
+                # Canonical point was never stored (e.g. its embedding failed);
+                # leave these unprocessed so the next run embeds them
+                for conv in convs:
+                    self.dedup_index.discard(conversation_id(conv))
+                continue
+            conv_ids = [conversation_id(conv) for conv in convs]
+            existing = record.payload.get("duplicate_ids", [])
+            with self.client_lock:
+                self.client.set_payload(
+                    collection_name=self.collection_name,
+                    payload={"duplicate_ids": existing + [cid for cid in conv_ids if cid not in existing]},
+                    points=[record.id]
+                )
+                if reuse_vectors:
+                    self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=[
+                            models.PointStruct(
+                                id=self._point_id(conv_id),
+                                vector=record.vector,
+                                payload={
+                                    "text": texts[conv_id],
+                                    "id": conv_id,
+                                    "title": self._redact_title(conv.get("title", "Untitled")),
+                                    "create_time": conv.get("create_time", datetime.now().timestamp()),
+                                    "update_time": conv.get("update_time", datetime.now().timestamp()),
+                                    "duplicate_of": canonical
+                                }
+                            )
+                            for conv_id, conv in zip(conv_ids, convs)
+                        ]
+                    )
+            linked.extend(conv_ids)
+            self.usage_rollups.add(convs)
+
+        self.processed_ids.update(linked)
+        self._checkpoint_processed_ids()
+        print(f"Linked {len(linked)} near duplicates to {len(groups)} canonical conversations")
+
+    def get_duplicate_groups(self) -> Dict[str, List[str]]:
+        """
+        Near-duplicate groups found at ingest time
+
+        Returns:
+            Mapping of canonical conversation id to the ids of its duplicates
+        """
+        return self.dedup_index.groups()
+
+    @staticmethod
+    def _time_conditions(start_time: Optional[float], end_time: Optional[float]) -> List:
+        """Filter conditions on create_time for a time range"""
+        conditions = []
+        if start_time is not None:
+            conditions.append(
+                models.FieldCondition(
+                    key="create_time",
+                    range=models.Range(gte=start_time)
+                )
+            )
+        if end_time is not None:
+            conditions.append(
+                models.FieldCondition(
+                    key="create_time",
+                    range=models.Range(lte=end_time)
+                )
+            )
+        return conditions
+
+    @staticmethod
+    def _canonical_filter(conditions: Optional[List] = None) -> models.Filter:
+        """Search filter that leaves out points stored as duplicates of another"""
+        return models.Filter(
+            must=[
+                models.IsEmptyCondition(is_empty=models.PayloadField(key="duplicate_of")),
+                *(conditions or [])
+            ]
+        )
+
+    def _embed_texts(self, texts: List[str], model_name: Optional[str] = None) -> np.ndarray:
+        """
+        Embed document texts in token-budgeted requests
+
+        Texts are sorted by length and packed up to token_budget estimated
+        tokens per request, so request cost stays even regardless of how
+        long the conversations in a batch are. With several Ollama endpoints,
+        one request per available endpoint is in flight at a time.
+        """
+        def embed(request_texts):
+            start_time = time.time()
+            embeddings = self._get_ollama_embeddings(request_texts, model_name=model_name)
+            self._log_performance("embed_request", time.time() - start_time, len(request_texts))
+            return embeddings
+
+        return embed_packed(
+            texts, embed, self.token_budget, self.max_batch_items,
+            max_workers=max(self.embedding_pool.healthy_count(), 1),
+            max_item_tokens=self.max_item_tokens
+        )
+
+    def get_embedding_status(self) -> List[Dict]:
+        """Health, in-flight requests and latency of each Ollama endpoint"""
+        return self.embedding_pool.status()
+
+    def _get_ollama_embeddings(self, texts: List[str], model_name: Optional[str] = None) -> np.ndarray:
         """Generate embeddings using the Ollama API"""
-        payload = {
-            "model": self.model_name,
-            "input": texts
-        }
-        response = requests.post(self.ollama_url, headers=self.ollama_headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        if "embeddings" not in data:
-            raise RuntimeError("Invalid response from Ollama API")
-        return np.array(data["embeddings"])
+        return self.embedding_pool.embed(texts, model_name or self.model_name, self.keep_alive)
+
+    def _cache_query_vector(self, key: tuple, vector: np.ndarray) -> np.ndarray:
+        with self._query_lock:
+            self._query_vectors[key] = vector
+            self._query_vectors.move_to_end(key)
+            while len(self._query_vectors) > QUERY_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    def _similar_query_vector(self, query: str) -> Optional[np.ndarray]:
+        """Cached embedding of a query with the same words, ignoring case, order and punctuation"""
+        query_words = words(query)
+        with self._query_lock:
+            for (model_name, cached_query), vector in reversed(self._query_vectors.items()):
+                if model_name == self.model_name and words(cached_query) == query_words:
+                    return vector
+        return None
+
+    def _query_vector(self, query: str, budget: Optional[float]) -> tuple:
+        """
+        Embedding of a search query, from the cache or Ollama
+
+        With a budget the request runs in a worker thread and is abandoned
+        when the budget runs out; it keeps running so its embedding is cached
+        for the next search. A cached embedding of a query with the same words
+        is used instead if there is one.
+
+        Args:
+            query: Search query
+            budget: Seconds allowed for the embedding (None waits)
+
+        Returns:
+            (query vector or None, why the embed stage was degraded or None)
+        """
+        key = (self.model_name, query)
+        with self._query_lock:
+            if key in self._query_vectors:
+                self._query_vectors.move_to_end(key)
+                return self._query_vectors[key], None
+        if budget is None:
+            return self._cache_query_vector(key, self._get_ollama_embeddings([query])[0]), None
+
+        def embed():
+            vector = self.embedding_pool.embed([query], self.model_name, self.keep_alive, timeout=QUERY_EMBED_TIMEOUT)[0]
+            return self._cache_query_vector(key, vector)
+
+        future = self._query_executor.submit(embed)
+        try:
+            return future.result(timeout=max(budget, 0)), None
+        except FuturesTimeout:
+            # Not started yet: the embedding workers are busy with earlier queries
+            future.cancel()
+            reason = f"query embedding took longer than {budget:.1f} s"
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            reason = f"query embedding failed: {e}"
+        vector = self._similar_query_vector(query)
+        if vector is not None:
+            return vector, f"{reason}; used the cached embedding of a similar query"
+        return None, reason
+
+    @staticmethod
+    def _remaining(ends_at: Optional[float]) -> Optional[float]:
+        return None if ends_at is None else max(ends_at - time.time(), 0.0)
+
+    def _ensure_lexical_index(self):
+        """Build the lexical fallback index in the background, once"""
+        with self._query_lock:
+            if self.lexical_index is not None:
+                return
+            self.lexical_index = LexicalIndex()
+        threading.Thread(target=self._build_lexical_index, name="lexical-index", daemon=True).start()
+
+    def _build_lexical_index(self):
+        """Add every canonical point of the collection to the lexical index"""
+        start_time = time.time()
+        offset = None
+        try:
+            while True:
+                # The lock is only held to read one small page, and released
+                # before its words are indexed, so ingest and deadline searches
+                # wait for at most one page instead of the whole build
+                with self._locked_client(purpose="building the word index") as client:
+                    points, offset = client.scroll(
+                        collection_name=self.collection_name,
+                        limit=LEXICAL_BATCH_SIZE,
+                        offset=offset,
+                        with_payload=["title", "text", "create_time", "duplicate_of"],
+                        with_vectors=False
+                    )
+                self._index_lexical(
+                    [point.id for point in points], [point.payload or {} for point in points]
+                )
+                if offset is None:
+                    break
+                # Let threads waiting for the lock go first; it is not fair by itself
+                time.sleep(LEXICAL_BATCH_PAUSE)
+        except Exception as e:
+            print(f"Error building the lexical search index: {e}")
+            return
+        self.lexical_index.ready.set()
+        self._log_performance("build_lexical_index", time.time() - start_time, len(self.lexical_index))
+
+    def _index_lexical(self, point_ids: List, payloads: List[Dict]):
+        """Add stored points to the lexical index, if it is in use"""
+        if self.lexical_index is None:
+            return
+        keep = [i for i, payload in enumerate(payloads) if "duplicate_of" not in payload]
+        self.lexical_index.add(
+            [point_ids[i] for i in keep],
+            [payloads[i].get("title", "") for i in keep],
+            [payloads[i].get("text", "") for i in keep],
+            [to_timestamp(payloads[i].get("create_time")) for i in keep]
+        )
+
+    def _lexical_search(
+        self,
+        query: str,
+        limit: int,
+        ends_at: Optional[float],
+        degraded: Dict[str, str],
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> List:
+        """Conversations matching the words of the query, for when it has no embedding"""
+        self._ensure_lexical_index()
+        if not self.lexical_index.ready.is_set():
+            degraded["lexical"] = f"word index is still being built ({len(self.lexical_index)} conversations so far); no results"
+            return []
+        hits = self.lexical_index.search(query, limit, start_time, end_time)
+        degraded["lexical"] = "conversations matched by their words; scores are word overlap, not similarity"
+        if not hits:
+            return []
+        try:
+            with self._locked_client(self._remaining(ends_at)) as client:
+                records = {
+                    str(record.id): record for record in client.retrieve(
+                        collection_name=self.collection_name, ids=[point_id for point_id, _ in hits], with_payload=True
+                    )
+                }
+        except TimeoutError as e:
+            degraded["retrieve"] = str(e)
+            return []
+        # Points deleted since they were indexed are left out
+        return [
+            models.ScoredPoint(id=point_id, version=0, score=score, payload=records[point_id].payload)
+            for point_id, score in hits if point_id in records
+        ]
+
+    def _search_results(self, points: List, degraded: Dict[str, str]) -> SearchResults:
+        return SearchResults(
+            [
+                {
+                    "id": point.payload["id"],
+                    "title": point.payload["title"],
+                    "text": point.payload.get("text", ""),
+                    "create_time": point.payload["create_time"],
+                    "score": point.score,
+                    "duplicate_ids": point.payload.get("duplicate_ids", [])
+                }
+                for point in points
+            ],
+            degraded
+        )
 
     def search(
         self, 
         query: str, 
         limit: int = 5,
-        score_threshold: float = 0.7
-    ) -> List[Dict]:
+        score_threshold: float = 0.7,
+        deadline: Optional[float] = None,
+        title_weight: float = 0.0
+    ) -> SearchResults:
         """
         Search conversations by semantic similarity
+
+        With a deadline, embedding the query may take EMBED_BUDGET_SHARE of it
+        and the vector search the rest. A query that cannot be embedded in time
+        is answered from the word index instead, and a vector store kept busy
+        by writes past the deadline yields no results; either way the stage
+        is reported in `degraded_stages` of the results.
         
         Args:
             query: Search query
             limit: Number of results to return
             score_threshold: Minimum similarity score (0-1)
+            deadline: Time budget in seconds (defaults to search_deadline)
+            title_weight: Share of the score from similarity to conversation titles:
+                0 compares the query with bodies only, 1 with titles only (needs
+                title vectors)
             
         Returns:
             List of matching conversations with scores
         """
         start_time = time.time()
-        
+        deadline = self.search_deadline if deadline is None else deadline
+        ends_at = None if deadline is None else start_time + deadline
+        degraded: Dict[str, str] = {}
+        if deadline is not None:
+            self._ensure_lexical_index()
+
         # Generate query embedding using Ollama API
-        query_vector = self._get_ollama_embeddings([query])[0]
-        
-        # Search in Qdrant
-        results = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            score_threshold=score_threshold
-        )
+        query_vector, reason = self._query_vector(query, None if deadline is None else deadline * EMBED_BUDGET_SHARE)
+        if reason:
+            degraded["embed"] = reason
+
+        if query_vector is None:
+            results = self._lexical_search(query, limit, ends_at, degraded)
+        else:
+            # Search in Qdrant
+            try:
+                results = self._vector_search(
+                    query_vector,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    query_filter=self._canonical_filter(),
+                    timeout=self._remaining(ends_at),
+                    title_weight=title_weight
+                )
+            except TimeoutError as e:
+                degraded["retrieve"] = str(e)
+                results = []
         
         duration = time.time() - start_time
-        self._log_performance("search", duration)
+        self._log_performance("search_degraded" if degraded else "search", duration)
         
-        return [
-            {
-                "id": point.payload["id"],
-                "title": point.payload["title"],
-                "text": point.payload["text"],
-                "create_time": point.payload["create_time"],
-                "score": point.score
-            }
-            for point in results
-        ]
+        return self._search_results(results, degraded)
 
     def filter_search(
         self,
         query: str,
         start_time: Optional[float] = None,
         end_time: Optional[float] = None,
-        limit: int = 5
-    ) -> List[Dict]:
+        limit: int = 5,
+        deadline: Optional[float] = None,
+        title_weight: float = 0.0
+    ) -> SearchResults:
         """
         Search conversations with time filters
+
+        The deadline is split like in search; with time partitions, partitions
+        not searched in time are left out of the results.
         
         Args:
             query: Search query
             start_time: Start timestamp
             end_time: End timestamp
             limit: Number of results
+            deadline: Time budget in seconds (defaults to search_deadline)
+            title_weight: Share of the score from title similarity (see search);
+                time partitions have no title vectors, so they are not used
             
         Returns:
             Filtered and ranked conversations
         """
         search_start = time.time()
+        deadline = self.search_deadline if deadline is None else deadline
+        ends_at = None if deadline is None else search_start + deadline
+        degraded: Dict[str, str] = {}
+        if deadline is not None:
+            self._ensure_lexical_index()
+
+        query_vector, reason = self._query_vector(query, None if deadline is None else deadline * EMBED_BUDGET_SHARE)
+        if reason:
+            degraded["embed"] = reason
+        if query_vector is None:
+            results = self._lexical_search(query, limit, ends_at, degraded, start_time, end_time)
+            self._log_performance("filter_search_degraded", time.time() - search_start)
+            return self._search_results(results, degraded)
         
-        query_vector = self._get_ollama_embeddings([query])[0]
-        
-        # Build filter conditions
-        filter_conditions = []
-        if start_time is not None:
-            filter_conditions.append(
-                models.FieldCondition(
-                    key="create_time",
-                    range=models.Range(gte=start_time)
+        filter_conditions = self._time_conditions(start_time, end_time)
+        query_filter = self._canonical_filter(filter_conditions)
+        try:
+            if self.partition_by and filter_conditions and not title_weight:
+                results = self._partitioned_search(
+                    query_vector, limit, query_filter, start_time, end_time, ends_at, degraded
+                )
+            else:
+                results = self._vector_search(
+                    query_vector, limit=limit, query_filter=query_filter, timeout=self._remaining(ends_at),
+                    title_weight=title_weight
                 )
+        except TimeoutError as e:
+            degraded["retrieve"] = str(e)
+            results = []
+        
+        duration = time.time() - search_start
+        self._log_performance("filter_search_degraded" if degraded else "filter_search", duration)
+        
+        return self._search_results(results, degraded)
+
+    def diversified_search(
+        self,
+        query: str,
+        limit: int = 10,
+        diversity: float = DEFAULT_DIVERSITY,
+        candidates: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        deadline: Optional[float] = None,
+        title_weight: float = 0.0
+    ) -> SearchResults:
+        """
+        Search for relevant conversations that are not near copies of each other
+
+        Candidates are fetched with their vectors but without payloads, maximal
+        marginal relevance (memlog/diversify.py) picks the results among them,
+        and only the picked conversations' payloads are fetched. Scores stay
+        similarities to the query; results are in pick order.
+
+        Args:
+            query: Search query
+            limit: Number of results
+            diversity: 0 keeps the similarity order, higher values push results
+                similar to ones already picked further down
+            candidates: Candidates to pick from (defaults to limit * CANDIDATES_PER_RESULT);
+                at most MAX_CANDIDATES unless limit itself is larger
+            score_threshold: Minimum similarity score of a candidate (0-1)
+            start_time: Only conversations created at or after this timestamp
+            end_time: Only conversations created at or before this timestamp
+            deadline: Time budget in seconds, split like in search (defaults to search_deadline)
+            title_weight: Share of the score from title similarity (see search)
+
+        Returns:
+            Diverse matching conversations with scores
+        """
+        search_start = time.time()
+        deadline = self.search_deadline if deadline is None else deadline
+        ends_at = None if deadline is None else search_start + deadline
+        degraded: Dict[str, str] = {}
+        if deadline is not None:
+            self._ensure_lexical_index()
+
+        query_vector, reason = self._query_vector(query, None if deadline is None else deadline * EMBED_BUDGET_SHARE)
+        if reason:
+            degraded["embed"] = reason
+        if query_vector is None:
+            results = self._lexical_search(query, limit, ends_at, degraded, start_time, end_time)
+            self._log_performance("diversified_search_degraded", time.time() - search_start)
+            return self._search_results(results, degraded)
+
+        results = []
+        try:
+            pool = self._vector_search(
+                query_vector,
+                limit=max(min(candidates or limit * CANDIDATES_PER_RESULT, MAX_CANDIDATES), limit),
+                query_filter=self._canonical_filter(self._time_conditions(start_time, end_time)),
+                score_threshold=score_threshold,
+                timeout=self._remaining(ends_at),
+                title_weight=title_weight,
+                with_payload=False,
+                with_vectors=True
             )
-        if end_time is not None:
-            filter_conditions.append(
-                models.FieldCondition(
-                    key="create_time",
-                    range=models.Range(lte=end_time)
+            if pool:
+                picked = [
+                    pool[index] for index in
+                    mmr_order([point.score for point in pool], [point.vector for point in pool], limit, diversity)
+                ]
+                with self._locked_client(self._remaining(ends_at)) as client:
+                    records = {
+                        str(record.id): record for record in client.retrieve(
+                            collection_name=self.collection_name, ids=[point.id for point in picked], with_payload=True
+                        )
+                    }
+                for point in picked:
+                    record = records.get(str(point.id))
+                    if record is not None:
+                        point.payload = record.payload
+                        point.vector = None
+                        results.append(point)
+        except TimeoutError as e:
+            degraded["retrieve"] = str(e)
+
+        duration = time.time() - search_start
+        self._log_performance("diversified_search_degraded" if degraded else "diversified_search", duration, len(results))
+        return self._search_results(results, degraded)
+
+    def related_conversations(
+        self,
+        conv_ids: List[str],
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        title_weight: float = 0.0
+    ) -> Dict[str, List[Dict]]:
+        """
+        Most similar conversations to stored conversations, without embedding calls
+
+        The stored vectors of each conversation are the query: its body vector
+        is compared with bodies and its title vector with titles, weighted by
+        title_weight like in search.
+
+        Args:
+            conv_ids: Conversation ids
+            limit: Related conversations per conversation
+            score_threshold: Minimum similarity score (0-1)
+            title_weight: Share of the score from title similarity (needs title vectors)
+
+        Returns:
+            Related conversations (result dictionaries as returned by search) by
+            conversation id; ids that are not stored are left out
+        """
+        if title_weight and not self.title_vectors:
+            raise RuntimeError(f"{self.collection_name} has no title vectors")
+        start_time = time.time()
+        named = bool(self.mini_dimension or self.title_vectors)
+        with self.client_lock:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[self._point_id(conv_id) for conv_id in conv_ids],
+                with_payload=["id"],
+                with_vectors=([FULL_VECTOR, TITLE_VECTOR] if title_weight else [FULL_VECTOR]) if named else True
+            )
+
+        related = {}
+        for record in records:
+            conv_id = record.payload["id"]
+            vectors = record.vector if named else {FULL_VECTOR: record.vector}
+            points = self._vector_search(
+                np.asarray(vectors[FULL_VECTOR], dtype=np.float32),
+                limit + 1,
+                query_filter=self._canonical_filter(),
+                score_threshold=score_threshold,
+                title_weight=title_weight,
+                title_query=vectors.get(TITLE_VECTOR)
+            )
+            related[conv_id] = [result for result in self._search_results(points, {}) if result["id"] != conv_id][:limit]
+        self._log_performance("related_conversations", time.time() - start_time, len(records))
+        return related
+
+    def _partition_collection(self, key: str) -> str:
+        return f"{self.collection_name}__{key}"
+
+    def _partition_keys(self) -> List[str]:
+        """Keys of the existing time partitions"""
+        prefix = f"{self.collection_name}__"
+        return sorted(
+            c.name[len(prefix):] for c in self.client.get_collections().collections
+            if c.name.startswith(prefix) and c.name[len(prefix):][:4].isdigit()
+        )
+
+    def _write_partitions(
+        self,
+        point_ids: List[str],
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        scheme: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Copy points into the time partitions their creation time falls into
+
+        Returns:
+            Number of points written to each partition
+        """
+        groups: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadata):
+            created = to_timestamp(meta.get("create_time")) or time.time()
+            groups.setdefault(partition_key(created, scheme or self.partition_by), []).append(i)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        for key, rows in groups.items():
+            collection_name = self._partition_collection(key)
+            self._create_collection(self.dimension, collection_name, mini_dimension=self.mini_dimension)
+            self._upload_points(
+                collection_name,
+                [point_ids[i] for i in rows],
+                embeddings[rows],
+                [{field: metadata[i].get(field) for field in PARTITION_PAYLOAD_FIELDS} for i in rows],
+                self.mini_dimension
+            )
+        return {key: len(rows) for key, rows in groups.items()}
+
+    def build_partitions(self, scheme: Optional[str], batch_size: int = 1000) -> Dict[str, int]:
+        """
+        (Re)build the time-partitioned copies used to prune filter_search
+
+        Every point of the main collection is copied, vector and a small payload,
+        into one collection per period. The main collection still serves unfiltered
+        search, clustering and snapshots. No embeddings are recomputed.
+
+        Args:
+            scheme: 'year', 'quarter' or 'month', or None to remove partitioning
+            batch_size: Points copied per request
+
+        Returns:
+            Number of conversations in each partition
+        """
+        if scheme is not None and scheme not in PARTITION_SCHEMES:
+            raise ValueError(f"Unknown partition scheme: {scheme}")
+        start_time = time.time()
+
+        # Searches fall back to the main collection while partitions are rebuilt
+        self.partition_by = None
+        for key in self._partition_keys():
+            self.client.delete_collection(self._partition_collection(key))
+        self._layouts = {}
+
+        sizes: Dict[str, int] = {}
+        if scheme is not None:
+            fields = PARTITION_PAYLOAD_FIELDS + ["duplicate_of"]
+            for ids, vectors, payloads in self.scroll_vectors(batch_size, payload_fields=fields):
+                # Points reusing a canonical vector are never returned by searches
+                keep = [i for i, payload in enumerate(payloads) if "duplicate_of" not in payload]
+                if not keep:
+                    continue
+                written = self._write_partitions(
+                    [str(ids[i]) for i in keep], vectors[keep], [payloads[i] for i in keep], scheme
                 )
+                for key, count in written.items():
+                    sizes[key] = sizes.get(key, 0) + count
+            self.partition_by = scheme
+
+        registry = self._load_registry()
+        registry.setdefault(self.collection_name, {})["partition_by"] = scheme
+        self._save_registry(registry)
+        self._log_performance("build_partitions", time.time() - start_time, sum(sizes.values()))
+        return dict(sorted(sizes.items()))
+
+    def _partitioned_search(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        query_filter: models.Filter,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        ends_at: Optional[float] = None,
+        degraded: Optional[Dict[str, str]] = None
+    ) -> List:
+        """
+        Search only the partitions overlapping the time range, in parallel, and merge by score
+
+        Args:
+            ends_at: Time by which results are due; partitions not searched by then
+                are left out and reported in degraded
+            degraded: Degraded stages of the search, updated in place
+        """
+        keys = overlapping_partitions(self._partition_keys(), start_time, end_time)
+        if not keys:
+            return []
+
+        def search_partition(key):
+            return self._vector_search(
+                query_vector, limit, query_filter=query_filter, collection_name=self._partition_collection(key),
+                timeout=self._remaining(ends_at)
             )
 
-        results = self.client.search(
+        executor = ThreadPoolExecutor(max_workers=min(len(keys), MAX_PARTITION_WORKERS))
+        futures = [executor.submit(search_partition, key) for key in keys]
+        done, pending = wait(futures, timeout=self._remaining(ends_at))
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        hits, missed = [], len(pending)
+        for future in done:
+            if future.exception() is None:
+                hits.extend(future.result())
+            elif isinstance(future.exception(), TimeoutError):
+                missed += 1
+            else:
+                raise future.exception()
+        if missed and degraded is not None:
+            degraded["retrieve"] = f"{missed} of {len(keys)} time partitions were not searched in time"
+        hits = sorted(hits, key=lambda point: point.score, reverse=True)[:limit]
+        if not hits:
+            return []
+
+        # Partitions only carry a small payload; fetch the full ones for the winners
+        try:
+            with self._locked_client(self._remaining(ends_at)) as client:
+                records = {
+                    str(record.id): record for record in client.retrieve(
+                        collection_name=self.collection_name, ids=[point.id for point in hits], with_payload=True
+                    )
+                }
+        except TimeoutError as e:
+            if degraded is None:
+                raise
+            degraded["retrieve"] = f"{e}; results lack their text"
+            return hits
+        results = []
+        for point in hits:
+            record = records.get(str(point.id))
+            if record is not None:
+                point.payload = record.payload
+                results.append(point)
+        return results
+
+    def benchmark_two_stage(
+        self,
+        queries: Optional[List[str]] = None,
+        sample_size: int = 50,
+        k: int = 10,
+        oversampling_factors: tuple = (1, 2, 4, 8)
+    ) -> List[Dict]:
+        """
+        Compare two-stage search against exact full-dimension search
+
+        Args:
+            queries: Query texts (defaults to titles of sample_size stored conversations)
+            sample_size: Sampled queries when none are given
+            k: Results per query; recall@k is measured against exact search
+            oversampling_factors: First-stage oversampling factors to try
+
+        Returns:
+            One row per method with recall and mean latency in milliseconds
+        """
+        if not self.mini_dimension:
+            raise RuntimeError(f"{self.collection_name} has no mini vector to benchmark")
+        queries = queries or [title for title, _ in self._sample_recall_queries(sample_size)]
+        if not queries:
+            raise RuntimeError("No queries to benchmark")
+        vectors = self._get_ollama_embeddings(queries)
+
+        def run(search):
+            results, start = [], time.time()
+            for vector in vectors:
+                results.append({str(point.id) for point in search(vector)})
+            return results, (time.time() - start) * 1000 / len(vectors)
+
+        exact, exact_ms = run(lambda vector: self.client.search(
+            collection_name=self.collection_name,
+            query_vector=models.NamedVector(name=FULL_VECTOR, vector=vector.tolist()),
+            limit=k,
+            search_params=models.SearchParams(exact=True)
+        ))
+        rows = [{"method": f"exact {self.dimension}d", "recall": 1.0, "mean_ms": exact_ms}]
+        for factor in oversampling_factors:
+            found, mean_ms = run(lambda vector: self._vector_search(vector, k, oversampling=factor))
+            recall = float(np.mean([len(f & e) / max(len(e), 1) for f, e in zip(found, exact)]))
+            rows.append({
+                "method": f"{self.mini_dimension}d x{factor} + rerank",
+                "recall": recall,
+                "mean_ms": mean_ms
+            })
+        self._log_performance("benchmark_two_stage", sum(row["mean_ms"] for row in rows) / 1000, len(queries))
+        return rows
+
+    def scroll_vectors(
+        self,
+        batch_size: int = 1000,
+        payload_fields=None,
+        with_titles: bool = False
+    ) -> Generator[tuple, None, None]:
+        """
+        Stream all stored vectors in batches
+
+        Args:
+            batch_size: Points fetched per request
+            payload_fields: Payload fields to include (defaults to id and title,
+                True for the whole payload)
+            with_titles: Also yield the title vectors (needs title vectors)
+
+        Yields:
+            Tuples of (point ids, vectors as a float32 array, payloads), with
+            {TITLE_VECTOR: title vectors} as a fourth element if with_titles
+        """
+        if with_titles and not self.title_vectors:
+            raise RuntimeError(f"{self.collection_name} has no title vectors")
+        named = bool(self.mini_dimension or self.title_vectors)
+        offset = None
+        while True:
+            # Held per page, not while the caller works through it
+            with self.client_lock:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=payload_fields or ["id", "title"],
+                    with_vectors=([FULL_VECTOR, TITLE_VECTOR] if with_titles else [FULL_VECTOR]) if named else True
+                )
+            if points:
+                batch = (
+                    [point.id for point in points],
+                    np.asarray([
+                        point.vector[FULL_VECTOR] if named else point.vector
+                        for point in points
+                    ], dtype=np.float32),
+                    [point.payload or {} for point in points]
+                )
+                if with_titles:
+                    titles = np.asarray([point.vector[TITLE_VECTOR] for point in points], dtype=np.float32)
+                    batch += ({TITLE_VECTOR: titles},)
+                yield batch
+            if offset is None:
+                break
+
+    def build_topic_clusters(self, n_clusters: int = DEFAULT_CLUSTERS, batch_size: int = 1000) -> List[Dict]:
+        """
+        Cluster every stored conversation into topics and record each point's cluster
+
+        Args:
+            n_clusters: Number of topics
+            batch_size: Vectors streamed from Qdrant per batch
+
+        Returns:
+            Topic overview (see get_topic_overview)
+        """
+        start_time = time.time()
+
+        def assign(ids, labels):
+            self.topic_layout.set_clusters(ids, labels)
+            for cluster_id in np.unique(labels):
+                self.client.set_payload(
+                    collection_name=self.collection_name,
+                    payload={"cluster_id": int(cluster_id)},
+                    points=[pid for pid, label in zip(ids, labels) if label == cluster_id]
+                )
+
+        self.client.create_payload_index(
             collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            query_filter=models.Filter(
-                must=filter_conditions
-            ) if filter_conditions else None
+            field_name="cluster_id",
+            field_schema=models.PayloadSchemaType.INTEGER
         )
-        
-        duration = time.time() - search_start
-        self._log_performance("filter_search", duration)
-        
-        return [
-            {
-                "id": point.payload["id"],
-                "title": point.payload["title"],
-                "text": point.payload["text"],
-                "create_time": point.payload["create_time"],
-                "score": point.score
-            }
-            for point in results
-        ]
+        self.topic_clusters.fit(
+            lambda: self.scroll_vectors(batch_size),
+            assign=assign,
+            n_clusters=n_clusters
+        )
+        if self.topic_layout.fitted:
+            self.topic_layout.save()
+        self._log_performance("build_topic_clusters", time.time() - start_time, int(self.topic_clusters.sizes.sum()))
+        return self.get_topic_overview()
+
+    def build_topic_layout(self, method: str = "pca", batch_size: int = 1000) -> int:
+        """
+        Compute the cached 2D map of all stored conversations
+
+        Args:
+            method: 'pca', 'random' or 'umap' (requires umap-learn)
+            batch_size: Vectors streamed from Qdrant per batch
+
+        Returns:
+            Number of conversations placed on the map
+        """
+        start_time = time.time()
+        self.topic_layout.fit(
+            lambda: self.scroll_vectors(batch_size, payload_fields=["cluster_id"]),
+            method=method
+        )
+        self._log_performance("build_topic_layout", time.time() - start_time, len(self.topic_layout))
+        return len(self.topic_layout)
+
+    def get_points(self, point_ids: List[str], payload_fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Fetch payloads for specific points without a search
+
+        Args:
+            point_ids: Qdrant point ids
+            payload_fields: Payload fields to return (defaults to id, title and create_time)
+
+        Returns:
+            List of payload dictionaries with the point id under 'point_id'
+        """
+        with self.client_lock:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(point_ids),
+                with_payload=payload_fields or ["id", "title", "create_time"]
+            )
+        return [{"point_id": str(record.id), **(record.payload or {})} for record in records]
+
+    def export_snapshot(self, snapshot_dir: str, batch_size: int = 1000) -> Dict:
+        """
+        Write all vectors and payloads to a portable snapshot
+
+        Vectors are stored as float16 (half the size of the collection's
+        float32 vectors), so a restore never needs to call Ollama. Title
+        vectors, if the collection has them, go to their own file.
+
+        Args:
+            snapshot_dir: Output directory (vectors.npy, vectors.title.npy, payloads.jsonl, manifest.json)
+            batch_size: Points read from Qdrant per request
+
+        Returns:
+            The snapshot manifest
+        """
+        start_time = time.time()
+        info = self.client.get_collection(self.collection_name)
+        payload_indexes = {
+            field: str(getattr(schema.data_type, "value", schema.data_type))
+            for field, schema in (info.payload_schema or {}).items()
+        }
+        count = self.client.count(collection_name=self.collection_name, exact=True).count
+        manifest = write_snapshot(
+            snapshot_dir,
+            self.scroll_vectors(batch_size, payload_fields=True, with_titles=self.title_vectors),
+            count=count,
+            dimension=self.dimension,
+            info={
+                "model_name": self.model_name,
+                "collection_name": self.collection_name,
+                "payload_indexes": payload_indexes
+            },
+            extra_vectors=(TITLE_VECTOR,) if self.title_vectors else ()
+        )
+        self._log_performance("export_snapshot", time.time() - start_time, manifest["count"])
+        return manifest
+
+    def import_snapshot(self, snapshot_dir: str, batch_size: int = 1000, verify: bool = True) -> int:
+        """
+        Replace the collection with the contents of a snapshot
+
+        Args:
+            snapshot_dir: Directory written by export_snapshot
+            batch_size: Points uploaded per request
+            verify: Check file checksums before loading
+
+        Returns:
+            Number of points restored
+        """
+        start_time = time.time()
+        manifest = read_manifest(snapshot_dir, verify=verify)
+        if manifest["model_name"] != self.model_name or manifest["dimension"] != self.dimension:
+            raise RuntimeError(
+                f"Snapshot was built with {manifest['model_name']} ({manifest['dimension']}d), "
+                f"but this store uses {self.model_name} ({self.dimension}d)"
+            )
+
+        # Recreate the physical collection so an alias keeps pointing at it. The
+        # snapshot decides about title vectors; older snapshots hold body vectors only
+        has_titles = TITLE_VECTOR in manifest.get("extra_vectors", [])
+        if self.title_vectors and not has_titles:
+            print(f"{self.collection_name} is restored without title vectors; migrate the collection to add them")
+        physical = self._physical_collection()
+        self.client.delete_collection(physical)
+        self._create_collection(self.dimension, physical, mini_dimension=self.mini_dimension, title_vectors=has_titles)
+        self.title_vectors = has_titles
+        if physical != self.collection_name:
+            # Deleting a collection also removes its aliases
+            self.client.update_collection_aliases(change_aliases_operations=[
+                models.CreateAliasOperation(
+                    create_alias=models.CreateAlias(collection_name=physical, alias_name=self.collection_name)
+                )
+            ])
+        self._facet_indexes_created = False
+
+        restored = 0
+        for ids, vectors, payloads, extras in iter_snapshot(snapshot_dir, batch_size, manifest):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    models.PointStruct(id=point_id, vector=vector, payload=payload)
+                    for point_id, vector, payload
+                    in zip(ids, self._point_vectors(vectors, self.mini_dimension, extras.get(TITLE_VECTOR)), payloads)
+                ],
+                wait=False
+            )
+            self.processed_ids.update(payload["id"] for payload in payloads if "id" in payload)
+            restored += len(ids)
+
+        for field, schema in manifest.get("payload_indexes", {}).items():
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=models.PayloadSchemaType(schema)
+            )
+
+        self._save_processed_ids()
+        if self.partition_by:
+            self.build_partitions(self.partition_by, batch_size)
+        self._log_performance("import_snapshot", time.time() - start_time, restored)
+        return restored
+
+    def _sample_recall_queries(self, sample_size: int, seed: int = 0) -> List[tuple]:
+        """(title, point id) pairs of stored conversations, used as known-answer queries"""
+        candidates = []
+        for ids, _, payloads in self.scroll_vectors(payload_fields=["title"]):
+            candidates.extend(
+                (payload["title"], str(point_id)) for point_id, payload in zip(ids, payloads)
+                if payload.get("title") and not payload["title"].startswith("Untitled")
+            )
+        random.Random(seed).shuffle(candidates)
+        return candidates[:sample_size]
+
+    def _recall_at_k(self, collection_name: str, model_name: str, queries: List[tuple], k: int) -> float:
+        """Fraction of queries whose expected point is in the top k results"""
+        if not queries:
+            return 0.0
+        hits = 0
+        for i in range(0, len(queries), 32):
+            batch = queries[i:i + 32]
+            vectors = self._get_ollama_embeddings([query for query, _ in batch], model_name=model_name)
+            for (_, expected), vector in zip(batch, vectors):
+                results = self._vector_search(vector, k, collection_name=collection_name)
+                hits += any(str(point.id) == expected for point in results)
+        return hits / len(queries)
+
+    def _copy_to_shadow(
+        self,
+        shadow: str,
+        model_name: str,
+        dimension: int,
+        mini_dimension: Optional[int],
+        batch_size: int,
+        max_texts_per_second: Optional[float],
+        title_vectors: bool = False
+    ) -> int:
+        """Re-embed every point missing from the shadow collection; returns points copied"""
+        copied = 0
+        offset = None
+        while True:
+            # The lock is held per page and released while the page is embedded,
+            # so searches and ingest keep running during the migration
+            with self._locked_client(purpose="the model migration") as client:
+                points, offset = client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False
+                )
+                existing = {
+                    str(record.id) for record in client.retrieve(
+                        collection_name=shadow, ids=[point.id for point in points], with_payload=False
+                    )
+                } if points else set()
+            missing = [point for point in points if str(point.id) not in existing]
+            if missing:
+                batch_start = time.time()
+                texts = [point.payload.get("text", "") for point in missing]
+                titles = [point.payload.get("title", "") for point in missing] if title_vectors else []
+                embeddings = self._embed_texts(texts + titles, model_name=model_name)
+                if embeddings.shape[1] != dimension:
+                    raise RuntimeError(f"{model_name} returned {embeddings.shape[1]}d vectors, expected {dimension}d")
+                title_embeddings = embeddings[len(texts):] if title_vectors else None
+                with self.client_lock:
+                    self.client.upsert(
+                        collection_name=shadow,
+                        points=[
+                            models.PointStruct(id=point.id, vector=vector, payload=point.payload)
+                            for point, vector in zip(
+                                missing, self._point_vectors(embeddings[:len(texts)], mini_dimension, title_embeddings)
+                            )
+                        ]
+                    )
+                copied += len(missing)
+                self.migration_status["copied"] = self.migration_status.get("copied", 0) + len(missing)
+                # Throttle so Ollama keeps capacity for live queries
+                if max_texts_per_second:
+                    time.sleep(max(0.0, len(missing) / max_texts_per_second - (time.time() - batch_start)))
+            if offset is None:
+                return copied
+
+    def migrate_model(
+        self,
+        model_name: str,
+        dimension: int,
+        queries: Optional[List[tuple]] = None,
+        sample_size: int = 50,
+        k: int = 10,
+        max_recall_drop: float = 0.05,
+        batch_size: int = 32,
+        max_texts_per_second: Optional[float] = 20.0,
+        drop_old: bool = False,
+        mini_dimension: Optional[int] = None,
+        title_vectors: Optional[bool] = None
+    ) -> Dict:
+        """
+        Re-embed the collection with another model and switch to it without downtime
+
+        A shadow collection is filled while the current one keeps serving
+        searches and ingest (new points are picked up by a catch-up pass).
+        Recall is then measured on both collections with known-answer queries;
+        only if the new model is not worse by more than max_recall_drop is the
+        store's alias switched to the shadow in one atomic alias update.
+
+        Stores created before aliases were used have a real collection under
+        the alias name; it has to be dropped right before the first swap.
+
+        Args:
+            model_name: Ollama embedding model to migrate to
+            dimension: Embedding dimension of that model
+            queries: (query text, expected conversation point id) pairs; defaults
+                to titles of sample_size stored conversations
+            sample_size: Sampled queries when none are given
+            k: Cutoff for recall@k
+            max_recall_drop: Largest acceptable recall loss versus the current model
+            batch_size: Conversations re-embedded per request
+            max_texts_per_second: Embedding rate limit for the migration (None for no limit)
+            drop_old: Delete the previous collection after the swap
+            mini_dimension: Mini vector size of the new collection (defaults to the
+                store's mini_dimension setting, then to the current layout)
+            title_vectors: Give the new collection title vectors (defaults to the
+                store's title_vectors setting, then to the current layout)
+
+        Returns:
+            Migration status with recall figures and whether the alias was swapped
+        """
+        start_time = time.time()
+        mini_dimension = mini_dimension or self.target_mini_dimension or self.mini_dimension
+        if title_vectors is None:
+            title_vectors = self.target_title_vectors or self.title_vectors
+        shadow = f"{self.collection_name}__{re.sub(r'[^a-zA-Z0-9]+', '_', model_name).strip('_')}"
+        if mini_dimension:
+            shadow += f"_mini{mini_dimension}"
+        if title_vectors:
+            shadow += "_titles"
+        with self.client_lock:
+            old_collection = self._physical_collection()
+        if shadow == old_collection:
+            raise RuntimeError(f"{self.collection_name} already uses {model_name} with this layout")
+        self.migration_status = {"state": "copying", "model_name": model_name, "shadow": shadow, "copied": 0}
+
+        try:
+            with self.client_lock:
+                self._create_collection(dimension, shadow, mini_dimension=mini_dimension, title_vectors=title_vectors)
+            # Catch up on conversations ingested while the first pass ran
+            while self._copy_to_shadow(
+                shadow, model_name, dimension, mini_dimension, batch_size, max_texts_per_second, title_vectors
+            ):
+                pass
+
+            self.migration_status["state"] = "validating"
+            queries = queries or self._sample_recall_queries(sample_size)
+            old_recall = self._recall_at_k(old_collection, self.model_name, queries, k)
+            new_recall = self._recall_at_k(shadow, model_name, queries, k)
+            self.migration_status.update({"old_recall": old_recall, "new_recall": new_recall, "queries": len(queries)})
+            if new_recall < old_recall - max_recall_drop:
+                self.migration_status["state"] = "rejected"
+                print(f"Migration rejected: recall@{k} {new_recall:.2f} vs {old_recall:.2f} for {self.model_name}")
+                return self.migration_status
+
+            # Final catch-up, then swap the alias in a single operation
+            self._copy_to_shadow(shadow, model_name, dimension, mini_dimension, batch_size, None, title_vectors)
+            # Searches wait for the swap, so none sees the gap between dropping
+            # a legacy collection and creating the alias
+            with self.client_lock:
+                if old_collection == self.collection_name:
+                    # Legacy store: a real collection holds the alias name
+                    self.client.delete_collection(old_collection)
+                    operations = []
+                else:
+                    operations = [
+                        models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=self.collection_name))
+                    ]
+                operations.append(models.CreateAliasOperation(
+                    create_alias=models.CreateAlias(collection_name=shadow, alias_name=self.collection_name)
+                ))
+                self.client.update_collection_aliases(change_aliases_operations=operations)
+
+                previous_model = self.model_name
+                self.model_name = model_name
+                self.dimension = dimension
+                self.mini_dimension = mini_dimension
+                self.title_vectors = title_vectors
+                self._facet_indexes_created = False
+            registry = self._load_registry()
+            registry.setdefault(self.collection_name, {}).update({
+                "collection": shadow,
+                "model_name": model_name,
+                "dimension": dimension,
+                "mini_dimension": mini_dimension,
+                "title_vectors": title_vectors,
+                "previous_collection": old_collection if old_collection != self.collection_name else None,
+                "previous_model": previous_model,
+                "migrated_at": time.time()
+            })
+            self._save_registry(registry)
+            if drop_old and old_collection != self.collection_name:
+                with self.client_lock:
+                    self.client.delete_collection(old_collection)
+
+            # Topic centroids and the map live in the old embedding space
+            for stale in (self.topic_clusters.clusters_file, self.topic_clusters.labels_file, self.topic_layout.layout_file):
+                if stale.exists():
+                    stale.unlink()
+            self.topic_clusters = TopicClusterer()
+            self.topic_layout = TopicLayout()
+            if self.partition_by:
+                self.build_partitions(self.partition_by)
+
+            self.migration_status["state"] = "completed"
+            print(f"Switched {self.collection_name} to {model_name}; rebuild topics and the map to match")
+            return self.migration_status
+        except Exception as e:
+            self.migration_status.update({"state": "failed", "error": str(e)})
+            raise RuntimeError(f"Model migration failed: {str(e)}")
+        finally:
+            self._log_performance("migrate_model", time.time() - start_time, self.migration_status.get("copied", 0))
+
+    def start_model_migration(self, model_name: str, dimension: int, **kwargs) -> threading.Thread:
+        """
+        Run migrate_model in a background thread; progress is in migration_status
+
+        Returns:
+            The started thread
+        """
+        def run():
+            try:
+                self.migrate_model(model_name, dimension, **kwargs)
+            except RuntimeError as e:
+                print(e)
+
+        self.migration_status = {"state": "starting", "model_name": model_name}
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def get_topic_overview(self) -> List[Dict]:
+        """
+        Precomputed topics, largest first
+
+        Returns:
+            List of dictionaries with cluster_id, label, size and terms
+        """
+        return self.topic_clusters.overview()
 
     def get_collection_stats(self) -> Dict:
         """Get statistics about the vector store collection"""
@@ -414,3 +2204,164 @@ class ConversationVectorStore:
         except Exception as e:
             print(f"Error getting collection stats: {e}")
             return {}
+
+    def storage_stats(self) -> Dict[str, Dict]:
+        """
+        Points, bytes on disk and reclaimable bytes of every collection in the store
+
+        For local-mode Qdrant the reclaimable bytes are free SQLite pages left
+        by deleted or rewritten points; for the NumPy backend they are deleted
+        rows and superseded payloads.
+        """
+        stats = {}
+        for description in self.client.get_collections().collections:
+            name = description.name
+            with self.client_lock:
+                points = self.client.count(collection_name=name, exact=True).count
+                if self.backend == "numpy":
+                    numpy_stats = self.client.storage_stats(name)
+                    stats[name] = {
+                        "points": points,
+                        "bytes": numpy_stats["bytes"],
+                        "reclaimable_bytes": numpy_stats["reclaimable_bytes"]
+                    }
+                    continue
+            storage = self.qdrant_path / "collection" / name / LOCAL_STORAGE_FILE
+            size = reclaimable = 0
+            if storage.exists():
+                size = storage.stat().st_size
+                with closing(sqlite3.connect(f"file:{storage.as_posix()}?mode=ro", uri=True)) as con:
+                    page_size = con.execute("PRAGMA page_size").fetchone()[0]
+                    reclaimable = page_size * con.execute("PRAGMA freelist_count").fetchone()[0]
+            stats[name] = {"points": points, "bytes": size, "reclaimable_bytes": reclaimable}
+        return stats
+
+    def reconcile(self, repair: bool = True, batch_size: int = 1000) -> Dict:
+        """
+        Compare the processed-ids ledger with the stored points and fix the drift
+
+        Stored conversation ids are the ids of the points plus the duplicate ids
+        linked to them. Conversations in the ledger that are not stored are
+        removed from it, so the next load embeds them again. Points missing
+        from the ledger (a batch that failed after its upload) are added to it.
+        Orphaned points are deleted: points without a conversation id, whose
+        point id does not match their conversation id, or that reuse the vector
+        of a canonical conversation that is gone. Partition collections are
+        checked against the main collection and rebuilt if they differ.
+
+        Args:
+            repair: Apply the fixes; False only reports them
+            batch_size: Points read per request
+
+        Returns:
+            Counts of points, ledger entries, requeued and recorded conversations,
+            orphans and partition mismatches
+        """
+        start_time = time.time()
+        stored_ids, point_ids, orphans = set(), set(), []
+        reused: Dict[str, List] = {}
+        offset = None
+        while True:
+            with self.client_lock:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=["id", "duplicate_of", "duplicate_ids"],
+                    with_vectors=False
+                )
+            for point in points:
+                payload = point.payload or {}
+                conv_id = payload.get("id")
+                if conv_id is None or not self._is_point_of(point.id, conv_id):
+                    orphans.append(point.id)
+                    continue
+                point_ids.add(str(point.id))
+                if payload.get("duplicate_of"):
+                    reused.setdefault(str(payload["duplicate_of"]), []).append((point.id, conv_id))
+                    continue
+                stored_ids.add(conv_id)
+                stored_ids.update(payload.get("duplicate_ids") or [])
+            if offset is None:
+                break
+        # Points sharing a canonical vector are only valid while the canonical point exists
+        for canonical, members in reused.items():
+            for point_id, conv_id in members:
+                if canonical in stored_ids:
+                    stored_ids.add(conv_id)
+                else:
+                    orphans.append(point_id)
+                    point_ids.discard(str(point_id))
+
+        requeued = self.processed_ids - stored_ids
+        unrecorded = stored_ids - self.processed_ids
+        partition_orphans, partition_missing = 0, 0
+        if self.partition_by:
+            partitioned = set()
+            for key in self._partition_keys():
+                offset = None
+                while True:
+                    with self.client_lock:
+                        points, offset = self.client.scroll(
+                            collection_name=self._partition_collection(key),
+                            limit=batch_size,
+                            offset=offset,
+                            with_payload=False,
+                            with_vectors=False
+                        )
+                    partitioned.update(str(point.id) for point in points)
+                    if offset is None:
+                        break
+            canonical_points = point_ids - {str(point_id) for members in reused.values() for point_id, _ in members}
+            partition_orphans = len(partitioned - canonical_points)
+            partition_missing = len(canonical_points - partitioned)
+
+        report = {
+            "points": len(point_ids) + len(orphans),
+            "ledger": len(self.processed_ids),
+            "requeued": len(requeued),
+            "recorded": len(unrecorded),
+            "orphans": len(orphans),
+            "partition_orphans": partition_orphans,
+            "partition_missing": partition_missing,
+            "repaired": repair
+        }
+        if repair:
+            for i in range(0, len(orphans), batch_size):
+                with self.client_lock:
+                    self.client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=models.PointIdsList(points=orphans[i:i + batch_size])
+                    )
+            self.processed_ids -= requeued
+            self.processed_ids |= unrecorded
+            self._save_processed_ids()
+            if partition_orphans or partition_missing:
+                self.build_partitions(self.partition_by, batch_size)
+        self._log_performance("reconcile", time.time() - start_time, report["points"])
+        return report
+
+    def vacuum(self) -> Dict[str, Dict]:
+        """
+        Reclaim the disk space of deleted and rewritten points in every collection
+
+        Local-mode Qdrant keeps points in one SQLite file per collection, which
+        is rebuilt with VACUUM; the NumPy backend rewrites the collection
+        without tombstones (see NumpyVectorClient.compact). Writes and searches
+        wait while a collection is vacuumed.
+
+        Returns:
+            Storage stats after vacuuming (see storage_stats)
+        """
+        start_time = time.time()
+        for description in self.client.get_collections().collections:
+            with self.client_lock:
+                if self.backend == "numpy":
+                    self.client.compact(description.name)
+                    continue
+                storage = self.qdrant_path / "collection" / description.name / LOCAL_STORAGE_FILE
+                if storage.exists():
+                    with closing(sqlite3.connect(str(storage), timeout=30)) as con:
+                        con.execute("VACUUM")
+        self._log_performance("vacuum", time.time() - start_time)
+        return self.storage_stats()
@@ -0,0 +1,169 @@
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEDUP_INDEX_FILE = "dedup_index.npz"
+NUM_PERM = 128  # MinHash permutations per signature
+BANDS = 32  # LSH bands (NUM_PERM / BANDS rows each)
+SHINGLE_WORDS = 5  # Words per shingle
+THRESHOLD = 0.8  # Estimated Jaccard similarity for a near duplicate
+DEDUP_MODES = ("link", "reuse")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> np.ndarray:
+    """CRC32 hashes of the word n-grams of a text, lowercased"""
+    words = _WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with LSH banding for near-duplicate conversations
+
+    Only canonical conversations are indexed; a later conversation whose
+    estimated Jaccard similarity to an indexed one reaches the threshold is
+    reported as its duplicate. The index is persisted so duplicates are also
+    found across ingest runs.
+    """
+
+    def __init__(
+        self,
+        index_file: str = DEDUP_INDEX_FILE,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        threshold: float = THRESHOLD,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.index_file = Path(index_file)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        # Universal hashing (a * x + b) mod p; a, b < 2^31 keep a * x + b within uint64
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+        self.keys: List[str] = []
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.duplicate_of: Dict[str, str] = {}
+        self._pending: List[np.ndarray] = []
+        self._rows_by_key: Dict[str, int] = {}
+        self._buckets: Dict[tuple, List[int]] = {}
+
+        if self.index_file.exists():
+            data = np.load(self.index_file)
+            self.keys = [str(key) for key in data["keys"]]
+            self.signatures = data["signatures"]
+            self.duplicate_of = dict(zip(
+                (str(key) for key in data["duplicate_keys"]),
+                (str(key) for key in data["canonical_keys"])
+            ))
+            for row, signature in enumerate(self.signatures):
+                self._index_row(row, self.keys[row], signature)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text, or None if it has no words"""
+        hashes = shingles(text)
+        if not len(hashes):
+            return None
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _index_row(self, row: int, key: str, signature: np.ndarray):
+        self._rows_by_key[key] = row
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(row)
+
+    def _signature_at(self, row: int) -> np.ndarray:
+        stored = len(self.signatures)
+        return self.signatures[row] if row < stored else self._pending[row - stored]
+
+    def query(self, signature: np.ndarray) -> Optional[str]:
+        """Most similar indexed conversation at or above the threshold, if any"""
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        best_key, best_score = None, self.threshold
+        for row in candidates:
+            score = float(np.mean(self._signature_at(row) == signature))
+            if score >= best_score:
+                best_key, best_score = self.keys[row], score
+        return best_key
+
+    def add(self, key: str, text: str) -> Optional[str]:
+        """
+        Check a conversation against the index and record it
+
+        Args:
+            key: Conversation id
+            text: Searchable conversation text
+
+        Returns:
+            Id of the canonical conversation it duplicates, or None if it is
+            new (and now indexed as a canonical conversation)
+        """
+        key = str(key)
+        if key in self._rows_by_key:
+            return None
+        if key in self.duplicate_of:
+            return self.duplicate_of[key]
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        canonical = self.query(signature)
+        if canonical is not None:
+            self.duplicate_of[key] = canonical
+            return canonical
+        row = len(self.keys)
+        self.keys.append(key)
+        self._pending.append(signature)
+        self._index_row(row, key, signature)
+        return None
+
+    def discard(self, key: str):
+        """Forget a duplicate link, e.g. when its canonical point was never stored"""
+        self.duplicate_of.pop(str(key), None)
+
+    def save(self):
+        """Persist signatures and duplicate links"""
+        if self._pending:
+            self.signatures = np.concatenate([self.signatures, np.stack(self._pending)])
+            self._pending = []
+        np.savez(
+            self.index_file,
+            keys=np.array(self.keys, dtype=str),
+            signatures=self.signatures,
+            duplicate_keys=np.array(list(self.duplicate_of.keys()), dtype=str),
+            canonical_keys=np.array(list(self.duplicate_of.values()), dtype=str)
+        )
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Duplicate ids grouped by their canonical conversation"""
+        groups: Dict[str, List[str]] = {}
+        for duplicate, canonical in self.duplicate_of.items():
+            groups.setdefault(canonical, []).append(duplicate)
+        return groups
@@ -0,0 +1,48 @@
+import numpy as np
+
+from memlog.topic_clusters import normalize_rows
+
+DEFAULT_DIVERSITY = 0.3  # Weight of redundancy against relevance in maximal marginal relevance
+CANDIDATES_PER_RESULT = 10  # Candidates fetched per diversified result
+MAX_CANDIDATES = 200  # Cap on candidates; picking costs grow with the square of their number
+
+
+def mmr_order(relevance: np.ndarray, vectors: np.ndarray, limit: int, diversity: float = DEFAULT_DIVERSITY) -> np.ndarray:
+    """
+    Pick a relevant but non-redundant subset of candidates (maximal marginal relevance)
+
+    Each step takes the candidate maximizing
+    (1 - diversity) * relevance - diversity * (highest similarity to a picked candidate).
+    Pairwise similarities come from one matrix product, so a step is a
+    vectorized update over all candidates.
+
+    Args:
+        relevance: Similarity of each candidate to the query
+        vectors: Candidate vectors, one row each
+        limit: Number of candidates to pick
+        diversity: 0 keeps the relevance order, 1 only avoids redundancy
+
+    Returns:
+        Indices of the picked candidates, in pick order
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    count = min(limit, len(relevance))
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+    vectors = normalize_rows(vectors)
+    similarity = vectors @ vectors.T
+
+    picked = np.empty(count, dtype=np.int64)
+    redundancy = np.full(len(relevance), -np.inf, dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    for step in range(count):
+        if step == 0:
+            gain = relevance.copy()
+        else:
+            gain = (1 - diversity) * relevance - diversity * redundancy
+        gain[~available] = -np.inf
+        index = int(np.argmax(gain))
+        picked[step] = index
+        available[index] = False
+        np.maximum(redundancy, similarity[index], out=redundancy)
+    return picked
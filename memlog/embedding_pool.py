@@ -0,0 +1,195 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+
+EWMA_ALPHA = 0.3  # Weight of the newest latency sample
+FAILURE_THRESHOLD = 3  # Consecutive failures that open an endpoint's circuit
+COOLDOWN_SECONDS = 30.0  # How long an open circuit stays open before a retry
+REQUEST_TIMEOUT = 300  # Seconds allowed for one embedding request
+
+
+class EmbeddingEndpoint:
+    """One Ollama embed URL with latency and failure tracking"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.seconds_per_item: Optional[float] = None  # EWMA of request latency per text
+        self.in_flight = 0
+        self.failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.items = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        """Closed circuit, or open circuit whose cooldown has passed (half-open)"""
+        return time.time() >= self.open_until
+
+    def expected_wait(self, items: int) -> float:
+        """Estimated seconds until a request of this size would finish here"""
+        per_item = self.seconds_per_item if self.seconds_per_item is not None else 0.0
+        return per_item * (self.in_flight + 1) * max(items, 1)
+
+    def status(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.available and self.failures < FAILURE_THRESHOLD,
+            "in_flight": self.in_flight,
+            "ms_per_item": None if self.seconds_per_item is None else self.seconds_per_item * 1000,
+            "requests": self.requests,
+            "items": self.items,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class EmbeddingEndpointPool:
+    """
+    Dispatch embedding requests across several Ollama servers
+
+    Each request goes to the available endpoint with the lowest expected wait
+    (latency per text times queued requests). Endpoints that fail repeatedly
+    are skipped for a cooldown period (circuit breaker), and a failed request
+    is retried on the next best endpoint.
+    """
+
+    def __init__(self, urls: List[str], headers: Optional[Dict] = None, timeout: float = REQUEST_TIMEOUT):
+        if not urls:
+            raise ValueError("At least one embedding endpoint is required")
+        self.endpoints = [EmbeddingEndpoint(url) for url in urls]
+        self.headers = headers or {'Content-Type': 'application/json'}
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def healthy_count(self) -> int:
+        return sum(1 for endpoint in self.endpoints if endpoint.available)
+
+    def _acquire(self, items: int, exclude: set) -> Optional[EmbeddingEndpoint]:
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.available and e.url not in exclude]
+            if not candidates:
+                return None
+            # Unmeasured endpoints go first so every endpoint gets a latency sample
+            endpoint = min(candidates, key=lambda e: (e.seconds_per_item is not None, e.expected_wait(items)))
+            endpoint.in_flight += 1
+            return endpoint
+
+    def _release(self, endpoint: EmbeddingEndpoint, items: int, duration: Optional[float], error: Optional[str]):
+        with self._lock:
+            endpoint.in_flight -= 1
+            if error is None:
+                sample = duration / max(items, 1)
+                endpoint.seconds_per_item = sample if endpoint.seconds_per_item is None else (
+                    EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * endpoint.seconds_per_item
+                )
+                endpoint.failures = 0
+                endpoint.open_until = 0.0
+                endpoint.requests += 1
+                endpoint.items += items
+            else:
+                endpoint.failures += 1
+                endpoint.last_error = error
+                if endpoint.failures >= FAILURE_THRESHOLD:
+                    endpoint.open_until = time.time() + COOLDOWN_SECONDS
+
+    def post(self, payload: Dict, timeout: Optional[float] = None) -> Dict:
+        """
+        Send an /api/embed payload to the best endpoint, failing over on errors
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            requests.exceptions.RequestException: If every available endpoint failed
+        """
+        items = len(payload.get("input", [])) if isinstance(payload.get("input"), list) else 1
+        tried = set()
+        last_error: Optional[Exception] = None
+        while True:
+            endpoint = self._acquire(items, tried)
+            if endpoint is None:
+                break
+            tried.add(endpoint.url)
+            start_time = time.time()
+            try:
+                response = requests.post(
+                    endpoint.url, headers=self.headers, json=payload, timeout=timeout or self.timeout
+                )
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._release(endpoint, items, None, str(e))
+                last_error = e
+                continue
+            self._release(endpoint, items, time.time() - start_time, None)
+            return data
+
+        if isinstance(last_error, requests.exceptions.RequestException):
+            raise last_error
+        raise requests.exceptions.ConnectionError(
+            f"No healthy embedding endpoint available: {last_error or 'all circuits open'}"
+        )
+
+    def embed(
+        self, texts: List[str], model_name: str, keep_alive: Optional[str] = None, timeout: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Embed one request worth of texts with /api/embed
+
+        Args:
+            timeout: Seconds allowed per attempt (defaults to the pool's timeout)
+
+        Raises:
+            requests.exceptions.RequestException: If every available endpoint failed
+            RuntimeError: If the response holds no embeddings
+        """
+        payload = {"model": model_name, "input": texts}
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        data = self.post(payload, timeout=timeout)
+        if "embeddings" not in data:
+            raise RuntimeError("Invalid response from Ollama API")
+        return np.array(data["embeddings"])
+
+    def check_health(self, model_name: str, keep_alive: Optional[str] = None, timeout: float = 5) -> Dict[str, Optional[str]]:
+        """
+        Send a tiny embedding request to every endpoint (this also loads the model)
+
+        Returns:
+            Error message per endpoint URL, None for healthy endpoints
+        """
+        results = {}
+        payload = {"model": model_name, "input": ["test"]}
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        for endpoint in self.endpoints:
+            try:
+                response = requests.post(endpoint.url, headers=self.headers, json=payload, timeout=timeout)
+                response.raise_for_status()
+                if not response.json().get("embeddings"):
+                    raise ValueError("Invalid response from Ollama API")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                with self._lock:
+                    endpoint.failures = FAILURE_THRESHOLD
+                    endpoint.open_until = time.time() + COOLDOWN_SECONDS
+                    endpoint.last_error = str(e)
+                results[endpoint.url] = str(e)
+                continue
+            # Latency is not recorded: the first request includes loading the model
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.open_until = 0.0
+            results[endpoint.url] = None
+        return results
+
+    def status(self) -> List[Dict]:
+        """Per-endpoint health, load and latency"""
+        with self._lock:
+            return [endpoint.status() for endpoint in self.endpoints]
@@ -0,0 +1,173 @@
+import hashlib
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from memlog.conversation_format import iter_messages
+
+SPACY_MODEL = "en_core_web_sm"
+# Only tokenization and NER are needed; everything else just costs time
+SPACY_EXCLUDE = ["parser", "lemmatizer", "attribute_ruler", "tagger", "senter", "morphologizer"]
+ENTITY_LABELS = {"PERSON", "ORG", "GPE", "LOC", "PRODUCT", "EVENT", "WORK_OF_ART", "LAW", "LANGUAGE", "NORP", "FAC"}
+MAX_ENTITIES = 20  # Most frequent entities stored per conversation
+MAX_NER_CHARS = 100_000  # Text passed to spaCy per conversation
+MAX_SENTIMENT_CHARS = 2_000  # Text scored by VADER per message
+ENRICHMENT_CACHE_FILE = "enrichment_cache.jsonl"
+
+# Payload facets written by the enrichment stage and their index types
+FACET_SCHEMA = {
+    "entities": "keyword",
+    "entity_labels": "keyword",
+    "sentiment": "float",
+    "sentiment_label": "keyword",
+}
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """Load the trimmed spaCy pipeline on first use"""
+    import spacy
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer():
+    """Create the VADER sentiment analyzer on first use"""
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+        return SentimentIntensityAnalyzer()
+
+
+def score_messages(message_texts: List[List[str]]) -> List[List[float]]:
+    """
+    VADER compound score for every message of several conversations
+
+    Module-level so it can run in worker processes.
+    """
+    analyzer = get_sentiment_analyzer()
+    return [
+        [round(analyzer.polarity_scores(text[:MAX_SENTIMENT_CHARS])["compound"], 4) for text in texts]
+        for texts in message_texts
+    ]
+
+
+def sentiment_label(score: float) -> str:
+    """Standard VADER thresholds for a compound score"""
+    if score >= 0.05:
+        return "positive"
+    if score <= -0.05:
+        return "negative"
+    return "neutral"
+
+
+class ConversationEnricher:
+    """
+    Batched entity extraction and sentiment scoring for the ingest pipeline
+
+    Results are cached by a hash of the conversation text, so conversations
+    that have not changed are never analysed again.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = ENRICHMENT_CACHE_FILE,
+        n_process: int = 1,
+        batch_size: int = 64
+    ):
+        """
+        Args:
+            cache_file: JSONL file holding facets keyed by content hash
+            n_process: Worker processes for spaCy and VADER
+            batch_size: Documents per spaCy batch
+        """
+        self.cache_file = Path(cache_file)
+        self.n_process = n_process
+        self.batch_size = batch_size
+        self.cache: Dict[str, Dict] = {}
+        self._executor = None
+        if self.cache_file.exists():
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.cache[entry["hash"]] = entry["facets"]
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _extract_entities(self, texts: List[str]) -> List[Dict]:
+        nlp = get_nlp()
+        results = []
+        docs = nlp.pipe(
+            (text[:MAX_NER_CHARS] for text in texts),
+            batch_size=self.batch_size,
+            n_process=self.n_process
+        )
+        for doc in docs:
+            counts = Counter(
+                (ent.text.strip(), ent.label_) for ent in doc.ents
+                if ent.label_ in ENTITY_LABELS and ent.text.strip()
+            )
+            top = counts.most_common(MAX_ENTITIES)
+            results.append({
+                "entities": [text for (text, _), _ in top],
+                "entity_labels": sorted({label for (_, label), _ in top})
+            })
+        return results
+
+    def _score_sentiment(self, message_texts: List[List[str]]) -> List[List[float]]:
+        if self.n_process <= 1 or len(message_texts) < self.n_process:
+            return score_messages(message_texts)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_process)
+        size = -(-len(message_texts) // self.n_process)
+        parts = [message_texts[i:i + size] for i in range(0, len(message_texts), size)]
+        return [scores for part in self._executor.map(score_messages, parts) for scores in part]
+
+    def enrich(self, conversations: List[dict], texts: List[str]) -> List[Dict]:
+        """
+        Compute payload facets for a batch of conversations
+
+        Args:
+            conversations: Conversation dictionaries
+            texts: Searchable text of each conversation (same order)
+
+        Returns:
+            Facet dictionaries aligned with the input
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        missing = [i for i, h in enumerate(hashes) if h not in self.cache]
+
+        if missing:
+            entities = self._extract_entities([texts[i] for i in missing])
+            message_scores = self._score_sentiment([
+                [message["text"] for message in iter_messages(conversations[i])]
+                for i in missing
+            ])
+            with open(self.cache_file, 'a', encoding='utf-8') as f:
+                for i, ents, scores in zip(missing, entities, message_scores):
+                    mean = round(sum(scores) / len(scores), 4) if scores else 0.0
+                    facets = {
+                        **ents,
+                        "sentiment": mean,
+                        "sentiment_min": min(scores, default=0.0),
+                        "sentiment_max": max(scores, default=0.0),
+                        "sentiment_label": sentiment_label(mean),
+                        "message_sentiment": scores
+                    }
+                    self.cache[hashes[i]] = facets
+                    f.write(json.dumps({"hash": hashes[i], "facets": facets}) + "\n")
+
+        return [self.cache[h] for h in hashes]
+
+    def cached_facets(self, text: str) -> Optional[Dict]:
+        """Facets previously computed for a text, if any"""
+        return self.cache.get(self.content_hash(text))
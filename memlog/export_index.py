@@ -0,0 +1,263 @@
+import codecs
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from memlog.conversation_format import conversation_id
+
+INDEX_FILE = "export_index.jsonl"
+BLOCK_SIZE = 1024 * 1024  # Bytes read per step while scanning raw exports
+JSONL_SUFFIXES = ('.jsonl', '.jsonl.gz')
+
+_SKIP = re.compile(r'[\s,]*')
+
+
+def is_jsonl(file_path: str) -> bool:
+    """Check whether a file is a (optionally gzip-compressed) JSONL chunk"""
+    return str(file_path).endswith(JSONL_SUFFIXES)
+
+
+def _open_binary(file_path: str):
+    return gzip.open(file_path, 'rb') if str(file_path).endswith('.gz') else open(file_path, 'rb')
+
+
+def iter_jsonl_records(file_path: str) -> Iterator[Tuple[int, int, dict]]:
+    """
+    Stream records from a JSONL chunk
+
+    Offsets of gzip-compressed chunks refer to the decompressed stream.
+
+    Yields:
+        Tuples of (byte offset, byte length, record)
+    """
+    offset = 0
+    with _open_binary(file_path) as f:
+        for line in f:
+            length = len(line)
+            if line.strip():
+                yield offset, length, json.loads(line)
+            offset += length
+
+
+def iter_records(file_path: str, block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, int, object]]:
+    """
+    Stream the top-level records of a JSON export with their byte positions
+
+    Handles a top-level list (one record per element) or dict (one record per
+    value). Each record is decoded by the C JSON decoder straight from a
+    rolling buffer, so memory stays bounded by the largest single record.
+
+    Args:
+        file_path: Path to a JSON export or JSONL chunk
+        block_size: Bytes to read per step
+
+    Yields:
+        Tuples of (byte offset, byte length, record)
+    """
+    if is_jsonl(file_path):
+        yield from iter_jsonl_records(file_path)
+        return
+    for _, offset, length, value in iter_items(file_path, block_size):
+        yield offset, length, value
+
+
+def iter_items(file_path: str, block_size: int = BLOCK_SIZE) -> Iterator[Tuple[Optional[str], int, int, object]]:
+    """
+    Like iter_records, but also yields the key of each record in a top-level dict
+
+    Yields:
+        Tuples of (key or None for list elements, byte offset, byte length, record)
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    with open(file_path, 'rb') as f:
+        buffer = ''
+        pos = 0          # Current position in buffer (characters)
+        pos_bytes = 0    # Byte offset of buffer[pos] in the file
+        eof = False
+
+        def fill(min_chars: int = 0) -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            # Drop consumed text so the buffer only holds the current record
+            buffer = buffer[pos:]
+            pos = 0
+            data = f.read(max(block_size, min_chars))
+            if not data:
+                eof = True
+                buffer += utf8.decode(b'', final=True)
+                return False
+            buffer += utf8.decode(data)
+            return True
+
+        def advance(new_pos: int):
+            nonlocal pos, pos_bytes
+            pos_bytes += len(buffer[pos:new_pos].encode('utf-8'))
+            pos = new_pos
+
+        def skip_separators():
+            while True:
+                advance(_SKIP.match(buffer, pos).end())
+                if pos < len(buffer) or not fill():
+                    return
+
+        def decode_value():
+            # Retry with a larger buffer until the record is complete
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        return value, end
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill(len(buffer) - pos)
+
+        skip_separators()
+        if pos >= len(buffer) or buffer[pos] not in '[{':
+            return
+        closing = ']' if buffer[pos] == '[' else '}'
+        is_dict = closing == '}'
+        advance(pos + 1)
+
+        while True:
+            skip_separators()
+            if pos >= len(buffer) or buffer[pos] == closing:
+                return
+            key = None
+            if is_dict:
+                key, end = decode_value()
+                advance(end)
+                skip_separators()
+                if buffer[pos] != ':':
+                    raise ValueError(f"Expected ':' at byte {pos_bytes} in {file_path}")
+                advance(pos + 1)
+                skip_separators()
+            start_bytes = pos_bytes
+            value, end = decode_value()
+            advance(end)
+            yield key, start_bytes, pos_bytes - start_bytes, value
+
+
+class ExportIndex:
+    """
+    Byte-offset index from conversation id to its record in an export or chunk file
+
+    Looking up a conversation seeks straight to its record and parses only
+    that record, instead of re-reading the whole export.
+    """
+
+    def __init__(self, index_file: str = INDEX_FILE):
+        self.index_file = Path(index_file)
+        self.entries: Dict[str, Tuple[str, int, int]] = {}
+        if self.index_file.exists():
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["id"]] = (entry["path"], entry["offset"], entry["length"])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, conv_id) -> bool:
+        return str(conv_id) in self.entries
+
+    def add_file(self, file_path: str) -> int:
+        """
+        Index every conversation in one export or chunk file
+
+        Args:
+            file_path: Path to a JSON export or JSONL chunk
+
+        Returns:
+            Number of conversations indexed
+        """
+        file_path = os.path.abspath(file_path)
+        self.entries = {cid: entry for cid, entry in self.entries.items() if entry[0] != file_path}
+        count = 0
+        for offset, length, record in iter_records(file_path):
+            if isinstance(record, dict):
+                self.entries[str(conversation_id(record))] = (file_path, offset, length)
+                count += 1
+        return count
+
+    def add_entries(self, entries: List[Tuple[str, str, int, int]]):
+        """Record (id, path, offset, length) entries produced while writing chunks"""
+        for conv_id, file_path, offset, length in entries:
+            self.entries[str(conv_id)] = (os.path.abspath(file_path), offset, length)
+
+    def save(self):
+        """Write the index to disk"""
+        tmp_file = self.index_file.with_suffix(self.index_file.suffix + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for conv_id, (file_path, offset, length) in self.entries.items():
+                f.write(json.dumps({"id": conv_id, "path": file_path, "offset": offset, "length": length}) + "\n")
+        os.replace(tmp_file, self.index_file)
+
+    def get_conversation(self, conv_id: str) -> Optional[dict]:
+        """
+        Load a single conversation in its original structure
+
+        Args:
+            conv_id: Conversation id
+
+        Returns:
+            The conversation dictionary, or None if it is not indexed
+        """
+        entry = self.entries.get(str(conv_id))
+        if entry is None:
+            return None
+        file_path, offset, length = entry
+        with _open_binary(file_path) as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+
+_default_index: Optional[ExportIndex] = None
+
+
+def build_export_index(file_paths: List[str], index_file: str = INDEX_FILE) -> ExportIndex:
+    """
+    Build (or refresh) the export index for a set of files
+
+    Args:
+        file_paths: JSON exports or JSONL chunks to index
+        index_file: Where to store the index
+
+    Returns:
+        The updated index
+    """
+    global _default_index
+    index = ExportIndex(index_file)
+    for file_path in file_paths:
+        try:
+            count = index.add_file(file_path)
+            print(f"Indexed {count} conversations in {file_path}")
+        except (OSError, ValueError) as e:
+            print(f"Error indexing {file_path}: {e}")
+    index.save()
+    _default_index = None
+    return index
+
+
+def get_conversation(conv_id: str, index_file: str = INDEX_FILE) -> Optional[dict]:
+    """Load one conversation from the raw export via the default index"""
+    global _default_index
+    if _default_index is None or _default_index.index_file != Path(index_file):
+        _default_index = ExportIndex(index_file)
+    return _default_index.get_conversation(conv_id)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        build_export_index(sys.argv[1:])
+    else:
+        print("Usage: python -m memlog.export_index <export.json|chunk.jsonl> [...]")
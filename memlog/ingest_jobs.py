@@ -0,0 +1,226 @@
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from memlog.conversation_cache import ConversationCache
+from memlog.conversation_format import conversation_id
+from memlog.enrichment import ConversationEnricher
+
+JOB_BATCH_SIZE = 100  # Conversations per batch; each batch is searchable as soon as it is stored
+RATE_WINDOW_SECONDS = 60.0  # Throughput is measured over the batches finished in this window
+MAX_JOB_ERRORS = 20  # Most recent error messages kept per job
+FINISHED_STATES = ("completed", "cancelled", "failed")
+
+
+class IngestJob:
+    """
+    One ingest run in a background thread, controllable while it runs
+
+    Conversations not yet in the vector store are read from the conversation
+    cache and stored batch by batch, so each batch becomes searchable as soon
+    as it lands. Pause and cancel take effect between batches.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        vector_store,
+        prepare: Callable[[], Optional[ConversationCache]],
+        batch_size: int = JOB_BATCH_SIZE,
+        enricher: Optional[ConversationEnricher] = None,
+        dedup: Optional[str] = None
+    ):
+        """
+        Args:
+            job_id: Sequence number of the job
+            vector_store: Store the conversations are written to
+            prepare: Returns the up-to-date conversation cache (None if there is nothing to load)
+            batch_size: Conversations stored per batch
+            enricher: Optional enrichment stage (see process_conversations)
+            dedup: Near-duplicate handling (see process_conversations)
+        """
+        self.job_id = job_id
+        self.vector_store = vector_store
+        self.prepare = prepare
+        self.batch_size = batch_size
+        self.enricher = enricher
+        self.dedup = dedup
+
+        self.state = "starting"
+        self.total = 0
+        self.done = 0
+        self.stored = 0
+        self.failed = 0
+        self.errors = deque(maxlen=MAX_JOB_ERRORS)
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._active_seconds = 0.0
+        self._batches = deque()  # (finish time, conversations) of recent batches
+        self._resume = threading.Event()
+        self._resume.set()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name=f"ingest-job-{job_id}", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def pause(self):
+        """Stop after the current batch until resumed"""
+        with self._lock:
+            if self.state in ("preparing", "running"):
+                self.state = "paused"
+                self._resume.clear()
+
+    def resume(self):
+        with self._lock:
+            if self.state == "paused":
+                self.state = "running"
+                self._resume.set()
+
+    def cancel(self):
+        """Stop after the current batch; stored batches stay stored"""
+        with self._lock:
+            if self.state not in FINISHED_STATES:
+                self.state = "cancelling"
+                self._cancel.set()
+                self._resume.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def _error(self, message: str):
+        with self._lock:
+            self.errors.append(f"{time.strftime('%H:%M:%S')} {message}")
+
+    def _pending_batches(self, cache: ConversationCache):
+        """Batches of cached conversations not yet in the vector store"""
+        processed = self.vector_store.processed_ids
+        pending = []
+        for batch in cache.iter_conversations(self.batch_size):
+            pending.extend(conv for conv in batch if conversation_id(conv) not in processed)
+            while len(pending) >= self.batch_size:
+                yield pending[:self.batch_size]
+                pending = pending[self.batch_size:]
+        if pending:
+            yield pending
+
+    def _run(self):
+        try:
+            self.state = "preparing"
+            cache = self.prepare()
+            if cache is None:
+                self._error("No conversation chunks found")
+                self.state = "completed"
+                return
+            processed = self.vector_store.processed_ids
+            self.total = sum(
+                1 for conv_id in cache.conversations.column("conversation_id").to_pylist()
+                if conv_id not in processed
+            )
+            with self._lock:
+                if self.state == "preparing":
+                    self.state = "running"
+
+            for batch in self._pending_batches(cache):
+                self._resume.wait()
+                if self._cancel.is_set():
+                    break
+                batch_start = time.time()
+                before = len(self.vector_store.processed_ids)
+                try:
+                    self.vector_store.process_conversations(
+                        batch, batch_size=self.batch_size, enricher=self.enricher, dedup=self.dedup
+                    )
+                except Exception as e:
+                    self._error(f"Batch failed: {e}")
+                stored = len(self.vector_store.processed_ids) - before
+                if stored < len(batch):
+                    # process_conversations skips batches whose embedding request failed
+                    self._error(f"{len(batch) - stored} of {len(batch)} conversations were not stored")
+                now = time.time()
+                with self._lock:
+                    self.done += len(batch)
+                    self.stored += stored
+                    self.failed += len(batch) - stored
+                    self._active_seconds += now - batch_start
+                    self._batches.append((now, len(batch)))
+                    while self._batches and self._batches[0][0] < now - RATE_WINDOW_SECONDS:
+                        self._batches.popleft()
+
+            self.state = "cancelled" if self._cancel.is_set() else "completed"
+        except Exception as e:
+            self._error(f"{e}\n{traceback.format_exc(limit=3)}")
+            self.state = "failed"
+        finally:
+            self.finished_at = time.time()
+            self.vector_store._save_ingest_state(dedup_used=self.dedup is not None)
+
+    def progress(self) -> Dict:
+        """
+        Snapshot of the job's progress
+
+        Returns:
+            Dictionary with state, total, done, stored, failed, rate (conversations
+            per second of recent work), eta_seconds, elapsed and errors
+        """
+        with self._lock:
+            recent = sum(count for _, count in self._batches)
+            window = min(RATE_WINDOW_SECONDS, self._active_seconds)
+            rate = recent / window if recent and window > 0 else None
+            remaining = max(self.total - self.done, 0)
+            return {
+                "job_id": self.job_id,
+                "state": self.state,
+                "total": self.total,
+                "done": self.done,
+                "stored": self.stored,
+                "failed": self.failed,
+                "rate": rate,
+                "eta_seconds": remaining / rate if rate and self.state == "running" else None,
+                "elapsed": (self.finished_at or time.time()) - self.created_at,
+                "errors": list(self.errors)
+            }
+
+
+class IngestJobManager:
+    """
+    Starts ingest jobs for a vector store, one at a time
+
+    Meant to live as long as the app process (e.g. in a Streamlit resource
+    cache), so a job keeps running and stays controllable across page reruns.
+    """
+
+    def __init__(self, vector_store, prepare: Callable[[], Optional[ConversationCache]]):
+        """
+        Args:
+            vector_store: Store the jobs write to
+            prepare: Returns the up-to-date conversation cache for a new job
+        """
+        self.vector_store = vector_store
+        self.prepare = prepare
+        self.jobs: List[IngestJob] = []
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[IngestJob]:
+        """The most recent job, running or not"""
+        return self.jobs[-1] if self.jobs else None
+
+    def start(self, **kwargs) -> IngestJob:
+        """
+        Start a job (keyword arguments are passed to IngestJob)
+
+        Raises:
+            RuntimeError: If a job is still running
+        """
+        with self._lock:
+            if self.current is not None and not self.current.finished:
+                raise RuntimeError(f"Ingest job {self.current.job_id} is still {self.current.state}")
+            job = IngestJob(len(self.jobs) + 1, self.vector_store, self.prepare, **kwargs)
+            self.jobs.append(job)
+            job.start()
+            return job
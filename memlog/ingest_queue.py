@@ -0,0 +1,588 @@
+"""
+Durable shard queue for ingesting the conversation cache with several workers.
+
+The coordinator splits the conversation cache into shards (row ranges) and
+records them in a SQLite queue. Worker processes claim shards under a lease,
+embed them and write the vectors to a staging directory; the coordinator
+upserts staged shards into Qdrant, since the local Qdrant database can only
+be opened by one process. A worker that dies loses its lease and the shard is
+claimed again; shards that keep failing are parked as 'failed' until retried.
+
+Workers on other machines need the queue, cache and staging directory on a
+shared path (keep the SQLite file on a local disk of the coordinator's host
+if the network filesystem has unreliable locking):
+
+    python load_conversations.py --workers 4
+    python -m memlog.ingest_queue worker --processes 4 --ollama-url http://gpu2:11434/api/embed
+    python -m memlog.ingest_queue status
+    python -m memlog.ingest_queue retry
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from memlog.batch_packing import DEFAULT_MAX_BATCH_ITEMS, DEFAULT_MAX_ITEM_TOKENS, DEFAULT_TOKEN_BUDGET, embed_packed
+from memlog.conversation_cache import CACHE_DIR, MANIFEST_FILE, ConversationCache
+from memlog.conversation_format import conversation_id, conversation_text
+from memlog.embedding_pool import EmbeddingEndpointPool
+from memlog.redaction import PIIRedactor
+
+QUEUE_FILE = "ingest_queue.db"
+STAGING_DIR = "ingest_staging"
+SHARD_SIZE = 500  # Conversations per shard
+LEASE_SECONDS = 600  # A claimed shard returns to the queue if not renewed within this time
+MAX_ATTEMPTS = 3  # Claims per shard before it is parked as failed
+POLL_SECONDS = 2.0
+DB_TIMEOUT = 30  # SQLite busy timeout in seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    start_row INTEGER NOT NULL,
+    stop_row INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    started_at REAL,
+    finished_at REAL,
+    UNIQUE (start_row, stop_row)
+);
+CREATE TABLE IF NOT EXISTS queue_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def cache_version(cache_dir: str = CACHE_DIR) -> str:
+    """Identifies one build of the conversation cache (shards are row ranges of it)"""
+    return str((Path(cache_dir) / MANIFEST_FILE).stat().st_mtime)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ShardQueue:
+    """
+    Shards of the conversation cache and their processing state
+
+    A shard moves pending -> leased (claimed by a worker) -> embedded (vectors
+    staged) -> done (upserted by the coordinator). Failures send it back to
+    pending until MAX_ATTEMPTS claims have been used, then to failed.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=DB_TIMEOUT, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def version(self) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM queue_info WHERE key = 'cache_version'").fetchone()
+        return row["value"] if row else None
+
+    def enqueue(self, ranges: List[tuple], version: str) -> int:
+        """
+        Add shards (start_row, stop_row) for a cache build
+
+        Shards from a previous cache build are dropped, since their row ranges
+        no longer mean the same conversations. Shards already queued are kept
+        with their state, so enqueueing again resumes an interrupted run; a
+        shard marked done is queued again, since it is only asked for while
+        some of its conversations are still missing from the store.
+
+        Returns:
+            Number of newly added or requeued shards
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.version() != version:
+                self.conn.execute("DELETE FROM shards")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO queue_info (key, value) VALUES ('cache_version', ?)", (version,)
+                )
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO shards (start_row, stop_row) VALUES (?, ?) "
+                "ON CONFLICT (start_row, stop_row) DO UPDATE SET status = 'pending', attempts = 0, "
+                "error = NULL, worker = NULL, lease_until = NULL, finished_at = NULL WHERE status = 'done'",
+                ranges
+            )
+            return self.conn.total_changes - before
+
+    def claim(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Dict]:
+        """
+        Lease the next pending shard, or one whose lease has expired
+
+        Returns:
+            The shard row as a dict, or None if nothing is claimable
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            # Shards abandoned by dead workers that already used up their attempts
+            self.conn.execute(
+                "UPDATE shards SET status = 'failed', error = 'lease expired', worker = NULL "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS)
+            )
+            row = self.conn.execute(
+                "SELECT * FROM shards WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE shards SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (worker, now + lease_seconds, now, row["id"])
+            )
+            return dict(self.conn.execute("SELECT * FROM shards WHERE id = ?", (row["id"],)).fetchone())
+
+    def renew(self, shard_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend a lease; False if the worker no longer holds it"""
+        cursor = self.conn.execute(
+            "UPDATE shards SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, shard_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def mark_embedded(self, shard_id: int, worker: str) -> bool:
+        """Record that a worker staged a shard's vectors; False if its lease was lost"""
+        cursor = self.conn.execute(
+            "UPDATE shards SET status = 'embedded', lease_until = NULL, error = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (shard_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, shard_id: int, error: str, worker: Optional[str] = None):
+        """Return a shard to the queue, or park it as failed after MAX_ATTEMPTS claims"""
+        query = (
+            "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL, worker = NULL WHERE id = ?"
+        )
+        params = [MAX_ATTEMPTS, error, shard_id]
+        if worker is not None:
+            query += " AND worker = ? AND status = 'leased'"
+            params.append(worker)
+        self.conn.execute(query, params)
+
+    def next_embedded(self) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM shards WHERE status = 'embedded' ORDER BY id LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def mark_done(self, shard_id: int):
+        self.conn.execute(
+            "UPDATE shards SET status = 'done', finished_at = ? WHERE id = ?", (time.time(), shard_id)
+        )
+
+    def retry_failed(self) -> int:
+        """Give failed shards a fresh set of attempts; returns how many were requeued"""
+        cursor = self.conn.execute(
+            "UPDATE shards SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        )
+        return cursor.rowcount
+
+    def is_finished(self) -> bool:
+        """No shard is waiting, being embedded or waiting to be upserted"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM shards WHERE status IN ('pending', 'leased', 'embedded')"
+        ).fetchone()
+        return row["n"] == 0
+
+    def has_claimable(self) -> bool:
+        """Some shard is pending, or leased and may come back after a failure or expiry"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM shards WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        return row["n"] > 0
+
+    def progress(self) -> Dict:
+        """
+        Shard counts per status, conversation totals, throughput and ETA
+
+        Throughput is measured over finished shards since the first claim.
+        """
+        progress = {status: 0 for status in ("pending", "leased", "embedded", "done", "failed")}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM shards GROUP BY status"):
+            progress[row["status"]] = row["n"]
+        totals = self.conn.execute(
+            "SELECT SUM(stop_row - start_row) AS total, "
+            "SUM(CASE WHEN status = 'done' THEN stop_row - start_row ELSE 0 END) AS done, "
+            "MIN(started_at) AS first_start, MAX(finished_at) AS last_finish, "
+            "COUNT(DISTINCT CASE WHEN status = 'leased' AND lease_until >= ? THEN worker END) AS workers "
+            "FROM shards",
+            (time.time(),)
+        ).fetchone()
+        total, done = totals["total"] or 0, totals["done"] or 0
+        elapsed = (totals["last_finish"] or 0) - (totals["first_start"] or 0)
+        rate = done / elapsed if done and elapsed > 0 else None
+        progress.update({
+            "shards": sum(progress[status] for status in ("pending", "leased", "embedded", "done", "failed")),
+            "conversations": total,
+            "conversations_done": done,
+            "active_workers": totals["workers"],
+            "rate": rate,
+            "eta_seconds": (total - done) / rate if rate else None,
+        })
+        return progress
+
+    def failures(self) -> List[Dict]:
+        return [
+            dict(row) for row in self.conn.execute(
+                "SELECT id, start_row, stop_row, attempts, error FROM shards WHERE status = 'failed' ORDER BY id"
+            )
+        ]
+
+
+def format_progress(progress: Dict) -> str:
+    """One status line: conversations done, shard states, throughput and ETA"""
+    percent = progress["conversations_done"] * 100 / max(progress["conversations"], 1)
+    line = (
+        f"{progress['conversations_done']}/{progress['conversations']} conversations ({percent:.1f}%) | "
+        f"shards: {progress['done']} done, {progress['embedded']} staged, {progress['leased']} in progress, "
+        f"{progress['pending']} pending, {progress['failed']} failed | workers: {progress['active_workers']}"
+    )
+    if progress["rate"]:
+        line += f" | {progress['rate']:.1f} conv/s"
+    if progress["eta_seconds"] is not None and progress["conversations_done"] < progress["conversations"]:
+        minutes, seconds = divmod(int(progress["eta_seconds"]), 60)
+        line += f" | ETA {minutes // 60}h{minutes % 60:02d}m{seconds:02d}s"
+    return line
+
+
+def _staging_file(staging_dir: str, shard_id: int) -> Path:
+    return Path(staging_dir) / f"shard_{shard_id}.npz"
+
+
+def _keep_lease(queue_path: str, shard_id: int, worker: str, stop: threading.Event):
+    """Renew a shard lease until stopped (own connection: sqlite3 objects stay in their thread)"""
+    queue = ShardQueue(queue_path)
+    try:
+        while not stop.wait(LEASE_SECONDS / 3):
+            if not queue.renew(shard_id, worker):
+                break
+    finally:
+        queue.close()
+
+
+def run_worker(
+    ollama_urls: List[str],
+    model_name: str = "mxbai-embed-large",
+    keep_alive: Optional[str] = None,
+    queue_path: str = QUEUE_FILE,
+    cache_dir: str = CACHE_DIR,
+    staging_dir: str = STAGING_DIR,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_item_tokens: int = DEFAULT_MAX_ITEM_TOKENS,
+    redact_terms: Optional[List[str]] = None
+) -> int:
+    """
+    Claim and embed shards until none are left
+
+    Args:
+        ollama_urls: Ollama embed URLs this worker spreads its requests across
+        model_name: Embedding model; must match the vector store's
+        keep_alive: How long Ollama keeps the model loaded
+        queue_path: SQLite queue file
+        cache_dir: Conversation cache the shards refer to
+        staging_dir: Directory embedded shards are written to
+        token_budget: Estimated tokens per embedding request
+        max_batch_items: Texts per embedding request
+        max_item_tokens: Estimated tokens per embedded text; longer texts are split
+        redact_terms: Redact PII plus these custom terms before embedding, as the
+            coordinator's store does (None to embed the raw text)
+
+    Returns:
+        Number of shards this worker embedded
+    """
+    worker = worker_name()
+    queue = ShardQueue(queue_path)
+    cache = ConversationCache(cache_dir)
+    pool = EmbeddingEndpointPool(ollama_urls)
+    redactor = PIIRedactor(redact_terms) if redact_terms is not None else None
+    Path(staging_dir).mkdir(exist_ok=True)
+    if queue.version() != cache_version(cache_dir):
+        queue.close()
+        raise RuntimeError("Ingest queue was built for a different conversation cache; re-run the coordinator")
+
+    embedded = 0
+    try:
+        while True:
+            shard = queue.claim(worker)
+            if shard is None:
+                if not queue.has_claimable():
+                    return embedded
+                time.sleep(POLL_SECONDS)
+                continue
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=_keep_lease, args=(queue_path, shard["id"], worker, stop), daemon=True
+            )
+            heartbeat.start()
+            start_time = time.time()
+            try:
+                conversations = [
+                    conv for batch in cache.iter_conversations(SHARD_SIZE, shard["start_row"], shard["stop_row"])
+                    for conv in batch
+                ]
+                texts = [conversation_text(conv) for conv in conversations]
+                if redactor is not None:
+                    texts = redactor.redact_many(texts)
+                embeddings = embed_packed(
+                    texts,
+                    lambda texts: pool.embed(texts, model_name, keep_alive),
+                    token_budget, max_batch_items,
+                    max_workers=max(pool.healthy_count(), 1),
+                    max_item_tokens=max_item_tokens
+                )
+                # Written under a temporary name so the coordinator never reads a partial file
+                target = _staging_file(staging_dir, shard["id"])
+                partial = target.with_name(f"{target.stem}.{os.getpid()}.partial.npz")
+                np.savez(
+                    partial,
+                    ids=np.array([conversation_id(conv) for conv in conversations]),
+                    embeddings=embeddings.astype(np.float32),
+                    model=np.array(model_name)
+                )
+                os.replace(partial, target)
+            except Exception as e:
+                print(f"[{worker}] shard {shard['id']} failed: {e}")
+                queue.fail(shard["id"], str(e), worker=worker)
+                continue
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            if queue.mark_embedded(shard["id"], worker):
+                embedded += 1
+                print(f"[{worker}] shard {shard['id']}: {len(conversations)} conversations "
+                      f"in {time.time() - start_time:.1f}s")
+            else:
+                print(f"[{worker}] shard {shard['id']}: lease lost, result discarded")
+    finally:
+        queue.close()
+
+
+def start_workers(processes: int, **worker_args) -> List[multiprocessing.Process]:
+    """Start worker processes running run_worker with the given arguments"""
+    workers = []
+    for _ in range(processes):
+        process = multiprocessing.Process(target=run_worker, kwargs=worker_args, daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def enqueue_cache(
+    vector_store,
+    cache: ConversationCache,
+    queue: ShardQueue,
+    cache_dir: str = CACHE_DIR,
+    shard_size: int = SHARD_SIZE
+) -> int:
+    """
+    Queue every cache range that still holds conversations missing from the store
+
+    Returns:
+        Number of newly queued shards
+    """
+    ids = cache.conversations.column("conversation_id").to_pylist()
+    ranges = [
+        (start, min(start + shard_size, len(ids)))
+        for start in range(0, len(ids), shard_size)
+        if any(conv_id not in vector_store.processed_ids for conv_id in ids[start:start + shard_size])
+    ]
+    return queue.enqueue(ranges, cache_version(cache_dir))
+
+
+def run_coordinator(
+    vector_store,
+    cache: ConversationCache,
+    queue: ShardQueue,
+    staging_dir: str = STAGING_DIR,
+    enricher=None,
+    dedup: Optional[str] = None,
+    workers: Optional[List[multiprocessing.Process]] = None
+) -> int:
+    """
+    Upsert staged shards into the vector store as workers finish them
+
+    Runs until no shard is pending, in progress or staged. If the local
+    workers all exit while shards remain (e.g. they crashed), the remaining
+    shards stay queued for the next run or for remote workers.
+
+    Returns:
+        Number of conversations upserted
+    """
+    upserted = 0
+    last_report = 0.0
+    while True:
+        shard = queue.next_embedded()
+        if shard is None:
+            if queue.is_finished():
+                break
+            if workers is not None and not any(process.is_alive() for process in workers) \
+                    and queue.next_embedded() is None:
+                print("All local workers have exited; unfinished shards stay queued")
+                break
+            if time.time() - last_report > 30:
+                print(format_progress(queue.progress()))
+                last_report = time.time()
+            time.sleep(POLL_SECONDS)
+            continue
+
+        staged = _staging_file(staging_dir, shard["id"])
+        try:
+            with np.load(staged) as data:
+                if str(data["model"]) != vector_store.model_name:
+                    raise RuntimeError(f"shard embedded with {data['model']}, store uses {vector_store.model_name}")
+                precomputed = dict(zip(data["ids"].tolist(), data["embeddings"]))
+            conversations = [
+                conv for batch in cache.iter_conversations(SHARD_SIZE, shard["start_row"], shard["stop_row"])
+                for conv in batch
+            ]
+            vector_store.process_conversations(
+                conversations, batch_size=SHARD_SIZE, enricher=enricher, dedup=dedup, precomputed=precomputed
+            )
+            # process_conversations skips a batch it cannot embed or store
+            # instead of raising, so the shard is only done once every
+            # conversation in it is recorded as processed
+            missing = sum(conversation_id(conv) not in vector_store.processed_ids for conv in conversations)
+            if missing:
+                raise RuntimeError(f"{missing} of {len(conversations)} conversations were not stored")
+        except Exception as e:
+            print(f"Error upserting shard {shard['id']}: {e}")
+            queue.fail(shard["id"], f"upsert: {e}")
+            staged.unlink(missing_ok=True)
+            continue
+        queue.mark_done(shard["id"])
+        staged.unlink(missing_ok=True)
+        upserted += shard["stop_row"] - shard["start_row"]
+        print(format_progress(queue.progress()))
+        last_report = time.time()
+    return upserted
+
+
+def run_distributed(
+    vector_store,
+    cache_dir: str = CACHE_DIR,
+    processes: int = 2,
+    enricher=None,
+    dedup: Optional[str] = None,
+    queue_path: str = QUEUE_FILE,
+    staging_dir: str = STAGING_DIR
+) -> int:
+    """
+    Ingest the conversation cache with local worker processes
+
+    Queues the shards that still need work, starts the workers and upserts
+    their output. Safe to re-run after an interruption: finished shards are
+    skipped and staged ones are upserted without embedding them again.
+
+    Returns:
+        Number of conversations upserted
+    """
+    cache = ConversationCache(cache_dir)
+    queue = ShardQueue(queue_path)
+    try:
+        added = enqueue_cache(vector_store, cache, queue, cache_dir)
+        print(f"Queued {added} new or unfinished shards of up to {SHARD_SIZE} conversations")
+        print(format_progress(queue.progress()))
+        workers = start_workers(
+            processes,
+            ollama_urls=vector_store.ollama_urls,
+            model_name=vector_store.model_name,
+            keep_alive=vector_store.keep_alive,
+            queue_path=queue_path,
+            cache_dir=cache_dir,
+            staging_dir=staging_dir,
+            token_budget=vector_store.token_budget,
+            max_batch_items=vector_store.max_batch_items,
+            max_item_tokens=vector_store.max_item_tokens,
+            redact_terms=list(vector_store.redactor.terms) if vector_store.redactor else None
+        )
+        try:
+            return run_coordinator(
+                vector_store, cache, queue, staging_dir, enricher=enricher, dedup=dedup, workers=workers
+            )
+        finally:
+            for process in workers:
+                process.join(timeout=5)
+            failed = queue.failures()
+            if failed:
+                print(f"{len(failed)} shards failed; requeue them with `python -m memlog.ingest_queue retry`")
+    finally:
+        queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed ingest queue: extra workers and status")
+    parser.add_argument("--queue", default=QUEUE_FILE, help="SQLite queue file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    worker = subparsers.add_parser("worker", help="Embed queued shards (the coordinator upserts them)")
+    worker.add_argument("--processes", type=int, default=1)
+    worker.add_argument("--ollama-url", action="append", dest="ollama_urls",
+                        help="Ollama embed URL; repeat to load-balance across servers")
+    worker.add_argument("--model", default="mxbai-embed-large")
+    worker.add_argument("--cache-dir", default=CACHE_DIR)
+    worker.add_argument("--staging-dir", default=STAGING_DIR)
+    worker.add_argument("--redact", action="store_true",
+                        help="Redact PII (and pii_terms.txt) before embedding; must match the coordinator")
+
+    status = subparsers.add_parser("status", help="Show progress and ETA")
+    status.add_argument("--watch", type=float, help="Refresh every N seconds until finished")
+    subparsers.add_parser("retry", help="Requeue failed shards")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        processes = start_workers(
+            args.processes,
+            ollama_urls=args.ollama_urls or ["http://localhost:11434/api/embed"],
+            model_name=args.model,
+            queue_path=args.queue,
+            cache_dir=args.cache_dir,
+            staging_dir=args.staging_dir,
+            redact_terms=list(PIIRedactor().terms) if args.redact else None
+        )
+        for process in processes:
+            process.join()
+        return
+
+    queue = ShardQueue(args.queue)
+    if args.command == "retry":
+        print(f"Requeued {queue.retry_failed()} failed shards")
+    elif args.command == "status":
+        while True:
+            print(format_progress(queue.progress()))
+            if not args.watch or queue.is_finished():
+                break
+            time.sleep(args.watch)
+        for shard in queue.failures():
+            print(f"  failed shard {shard['id']} (rows {shard['start_row']}-{shard['stop_row']}, "
+                  f"{shard['attempts']} attempts): {shard['error']}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import math
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TEXT_PREFIX_CHARS = 2000  # Characters of each conversation's text indexed next to its title
+TITLE_WEIGHT = 2.0  # A query word found in the title counts this much more than one found only in the text
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> set:
+    """Distinct lowercased words of a text"""
+    return set(_WORD.findall(text.lower()))
+
+
+class LexicalIndex:
+    """
+    In-memory word postings over conversation titles and the start of their text
+
+    Used by search when a query cannot be embedded in time: matching needs
+    no model and takes milliseconds. A hit scores the IDF-weighted share of
+    the query words it contains (title matches weighted up) in 0..1; the
+    scores are not comparable with cosine similarities.
+    """
+
+    def __init__(self, text_chars: int = TEXT_PREFIX_CHARS):
+        """
+        Args:
+            text_chars: Characters of each text indexed; the rest is ignored
+        """
+        self.text_chars = text_chars
+        self.point_ids: List[str] = []
+        self.create_times = array("d")
+        self.ready = threading.Event()  # Set once every stored point has been added
+        self._rows: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}  # Rows whose title or text contains the word
+        self._title_postings: Dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.point_ids)
+
+    def add(self, point_ids: List[str], titles: List[str], texts: List[str], create_times: List[Optional[float]]):
+        """Index points; ids already in the index are skipped"""
+        with self._lock:
+            for point_id, title, text, created in zip(point_ids, titles, texts, create_times):
+                point_id = str(point_id)
+                if point_id in self._rows:
+                    continue
+                row = len(self.point_ids)
+                self._rows[point_id] = row
+                self.point_ids.append(point_id)
+                self.create_times.append(np.nan if created is None else float(created))
+                title_words = words(title or "")
+                for word in title_words:
+                    self._title_postings.setdefault(word, array("I")).append(row)
+                for word in title_words | words((text or "")[:self.text_chars]):
+                    self._postings.setdefault(word, array("I")).append(row)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Best matching points for the words of a query
+
+        Args:
+            query: Search query
+            limit: Number of results
+            start_time: Only points created at or after this timestamp
+            end_time: Only points created at or before this timestamp
+
+        Returns:
+            (point id, score) pairs, best first, for points matching at least one word
+        """
+        query_words = words(query)
+        with self._lock:
+            count = len(self.point_ids)
+            if not query_words or not count or limit <= 0:
+                return []
+            scores = np.zeros(count, dtype=np.float32)
+            total = 0.0
+            for word in query_words:
+                rows = self._postings.get(word)
+                idf = math.log(1 + count / (len(rows) if rows else 1))
+                total += idf * TITLE_WEIGHT
+                if rows:
+                    scores[np.array(rows, dtype=np.int64)] += idf
+                title_rows = self._title_postings.get(word)
+                if title_rows:
+                    scores[np.array(title_rows, dtype=np.int64)] += idf * (TITLE_WEIGHT - 1)
+            if start_time is not None or end_time is not None:
+                created = np.array(self.create_times, dtype=np.float64)
+                # Points without a creation time never match a time range
+                if start_time is not None:
+                    scores[~(created >= start_time)] = 0
+                if end_time is not None:
+                    scores[~(created <= end_time)] = 0
+            scores /= total
+            matched = np.flatnonzero(scores)
+            if len(matched) > limit:
+                matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+            matched = matched[np.argsort(-scores[matched], kind="stable")]
+            return [(self.point_ids[row], float(scores[row])) for row in matched]
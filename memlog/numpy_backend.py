@@ -0,0 +1,862 @@
+import bisect
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.http import models
+
+TIME_FIELD = "create_time"  # Kept as a float64 column parallel to the vectors for vectorized range filters
+DUPLICATE_FIELD = "duplicate_of"  # Kept as a flag bit so the canonical filter needs no payload reads
+ALIAS_FILE = "aliases.json"
+CONFIG_FILE = "config.json"
+COMPACT_SUFFIX = ".compact"  # Collection being rewritten by compact()
+RETIRED_SUFFIX = ".old"  # Collection replaced by its compacted copy, deleted right after
+VECTOR_DTYPES = ("float32", "float16")
+INITIAL_CAPACITY = 1024  # Rows allocated for a new collection; capacity doubles when full
+BLOCK_ROWS = 8192  # Rows scored per matrix-vector product
+SPARSE_FRACTION = 0.25  # Below this share of matching rows in a block, only those rows are read and scored
+
+_ALIVE = 1
+_DUPLICATE = 2
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == [] or value == {}
+
+
+def _values_match(value, accepted: set) -> bool:
+    if isinstance(value, list):
+        return any(item in accepted for item in value if not isinstance(item, (list, dict)))
+    return not isinstance(value, dict) and value in accepted
+
+
+def _in_range(value, condition: models.Range) -> bool:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return not (
+        (condition.gt is not None and not value > condition.gt)
+        or (condition.gte is not None and not value >= condition.gte)
+        or (condition.lt is not None and not value < condition.lt)
+        or (condition.lte is not None and not value <= condition.lte)
+    )
+
+
+def _time_value(payload: Dict) -> float:
+    value = payload.get(TIME_FIELD)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _id_key(point_id) -> Tuple[int, object]:
+    """Sort key of a point id: integer ids before UUIDs, as Qdrant orders them"""
+    return (0, point_id) if isinstance(point_id, int) else (1, str(point_id))
+
+
+def _disk_usage(path: Path) -> int:
+    """Allocated bytes (array files are sparse until rows are written), or the size where unknown"""
+    stat = path.stat()
+    return stat.st_blocks * 512 if hasattr(stat, "st_blocks") else stat.st_size
+
+
+def _select_payload(payload: Dict, with_payload) -> Optional[Dict]:
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    if isinstance(with_payload, models.PayloadSelectorInclude):
+        with_payload = with_payload.include
+    elif isinstance(with_payload, models.PayloadSelectorExclude):
+        return {key: value for key, value in payload.items() if key not in with_payload.exclude}
+    return {key: payload[key] for key in with_payload if key in payload}
+
+
+class NumpyCollection:
+    """
+    One collection stored as memory-mapped arrays
+
+    Every named vector is a (capacity x size) float32 or float16 matrix in its
+    own file, with parallel arrays for the create_time payload field, per-row
+    flags (alive, duplicate_of set) and the offset of the row's payload in an
+    append-only JSON-lines log. Rows are only ever appended; deleted points
+    leave a tombstone and updated points are rewritten in place. The committed
+    row count lives in config.json, written last, so a crashed write leaves
+    no partial rows behind.
+    """
+
+    def __init__(self, directory: Path, read_only: bool = False):
+        self.directory = directory
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._config_mtime = None
+        self._load()
+
+    @staticmethod
+    def create(directory: Path, vectors: Dict[str, models.VectorParams], named: bool, dtype: str):
+        """Write the files of an empty collection"""
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        for params in vectors.values():
+            if params.distance not in (models.Distance.COSINE, models.Distance.DOT):
+                raise ValueError(f"The NumPy backend supports cosine and dot distance, not {params.distance}")
+        directory.mkdir(parents=True)
+        config = {
+            "vectors": {
+                name: {"size": params.size, "distance": params.distance.value, "on_disk": params.on_disk}
+                for name, params in vectors.items()
+            },
+            "named": named,
+            "dtype": dtype,
+            "count": 0,
+            "capacity": 0,
+            "payload_schema": {},
+            "indexing_threshold": None
+        }
+        (directory / "ids.jsonl").touch()
+        (directory / "payloads.jsonl").touch()
+        (directory / CONFIG_FILE).write_text(json.dumps(config, indent=2))
+
+    def _load(self):
+        config_file = self.directory / CONFIG_FILE
+        self._config_mtime = config_file.stat().st_mtime
+        self.config = json.loads(config_file.read_text())
+        self.count = self.config["count"]
+        self.capacity = self.config["capacity"]
+        self.dtype = np.dtype(self.config["dtype"])
+        self.vector_params = {
+            name: models.VectorParams(
+                size=params["size"], distance=models.Distance(params["distance"]), on_disk=params.get("on_disk")
+            )
+            for name, params in self.config["vectors"].items()
+        }
+
+        with open(self.directory / "ids.jsonl", "rb") as f:
+            lines = f.readlines()
+        if len(lines) > self.count and not self.read_only:
+            # Ids appended by a write that never committed
+            with open(self.directory / "ids.jsonl", "r+b") as f:
+                f.truncate(sum(map(len, lines[:self.count])))
+        self.ids = [json.loads(line) for line in lines[:self.count]]
+
+        self._open_arrays()
+        alive = self.flags[:self.count] & _ALIVE if self.count else np.zeros(0, dtype=np.uint8)
+        self.rows = {point_id: row for row, point_id in enumerate(self.ids) if alive[row]}
+        self._columns: Dict[str, List] = {}
+        self._id_order: Optional[Tuple[List, np.ndarray]] = None
+        self._payload_file = open(self.directory / "payloads.jsonl", "rb" if self.read_only else "a+b")
+
+    def _array_files(self) -> Dict[str, Tuple[Path, np.dtype, tuple]]:
+        files = {
+            f"vector:{name}": (self.directory / f"vectors{'.' + name if name else ''}.bin", self.dtype, (params.size,))
+            for name, params in self.vector_params.items()
+        }
+        files["time"] = (self.directory / "create_time.bin", np.dtype(np.float64), ())
+        files["flags"] = (self.directory / "flags.bin", np.dtype(np.uint8), ())
+        files["offsets"] = (self.directory / "payload_offsets.bin", np.dtype(np.int64), ())
+        return files
+
+    def _open_arrays(self):
+        self.arrays = {}
+        for key, (path, dtype, row_shape) in self._array_files().items():
+            if self.capacity == 0:
+                self.arrays[key] = np.zeros((0, *row_shape), dtype=dtype)
+                continue
+            self.arrays[key] = np.memmap(
+                path, dtype=dtype, mode="r" if self.read_only else "r+", shape=(self.capacity, *row_shape)
+            )
+        self.vectors = {name: self.arrays[f"vector:{name}"] for name in self.vector_params}
+        self.times = self.arrays["time"]
+        self.flags = self.arrays["flags"]
+        self.offsets = self.arrays["offsets"]
+
+    def _grow(self, rows_needed: int):
+        """Extend every array file to hold rows_needed rows (doubling the capacity)"""
+        capacity = max(INITIAL_CAPACITY, self.capacity)
+        while capacity < rows_needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self.flush()
+        # Drop the mappings before resizing the files (required on Windows)
+        self.arrays = self.vectors = self.times = self.flags = self.offsets = None
+        for path, dtype, row_shape in self._array_files().values():
+            with open(path, "ab") as f:
+                f.truncate(capacity * dtype.itemsize * int(np.prod(row_shape, dtype=np.int64)))
+        self.capacity = capacity
+        self._open_arrays()
+
+    def refresh(self):
+        """Pick up rows committed by another process (read-only handles)"""
+        config_file = self.directory / CONFIG_FILE
+        if self.read_only and config_file.stat().st_mtime != self._config_mtime:
+            with self._lock:
+                self._payload_file.close()
+                self._load()
+
+    def flush(self):
+        for array in (self.arrays or {}).values():
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def close(self):
+        self.flush()
+        self._payload_file.close()
+
+    def _save_config(self):
+        self.config.update({"count": self.count, "capacity": self.capacity})
+        config_file = self.directory / CONFIG_FILE
+        tmp_file = config_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(self.config, indent=2))
+        os.replace(tmp_file, config_file)
+
+    def storage_stats(self) -> Dict:
+        """
+        Rows, bytes on disk and bytes compact() would reclaim
+
+        Reclaimable space is the rows of deleted points plus payload log lines
+        superseded by later writes; spare capacity is preallocated growth room.
+        """
+        with self._lock:
+            row_bytes = sum(
+                self.dtype.itemsize * params.size for params in self.vector_params.values()
+            ) + self.times.dtype.itemsize + self.flags.dtype.itemsize + self.offsets.dtype.itemsize
+            alive = self.alive_mask()
+            live_payload_bytes = 0
+            for row in np.flatnonzero(alive):
+                self._payload_file.seek(int(self.offsets[row]))
+                live_payload_bytes += len(self._payload_file.readline())
+            payload_log_bytes = (self.directory / "payloads.jsonl").stat().st_size
+            return {
+                "rows": self.count,
+                "live_points": int(alive.sum()),
+                "bytes": sum(_disk_usage(path) for path in self.directory.iterdir() if path.is_file()),
+                "reclaimable_bytes": int((self.count - alive.sum()) * row_bytes + payload_log_bytes - live_payload_bytes),
+                "spare_capacity_bytes": (self.capacity - self.count) * row_bytes
+            }
+
+    # Writes
+
+    def write(self, point_ids: List, vectors: Dict[str, np.ndarray], payloads: List[Optional[Dict]]):
+        """Insert or overwrite points; new points are appended after the last row"""
+        if self.read_only:
+            raise RuntimeError("Collection is opened read-only")
+        if set(vectors) != set(self.vector_params):
+            raise ValueError(f"Expected vectors {sorted(self.vector_params)}, got {sorted(vectors)}")
+        with self._lock:
+            rows = np.empty(len(point_ids), dtype=np.int64)
+            new_ids = []
+            for i, point_id in enumerate(point_ids):
+                row = self.rows.get(point_id)
+                if row is None:
+                    row = self.count + len(new_ids)
+                    self.rows[point_id] = row
+                    new_ids.append(point_id)
+                rows[i] = row
+            self._grow(self.count + len(new_ids))
+
+            for name, matrix in vectors.items():
+                matrix = np.asarray(matrix, dtype=np.float32).reshape(len(point_ids), -1)
+                if self.vector_params[name].distance == models.Distance.COSINE:
+                    matrix = _normalize(matrix)
+                self.vectors[name][rows] = matrix.astype(self.dtype)
+            payloads = [payload or {} for payload in payloads]
+            self._write_payloads(rows, payloads)
+
+            with open(self.directory / "ids.jsonl", "ab") as f:
+                f.write(b"".join(json.dumps(point_id).encode() + b"\n" for point_id in new_ids))
+            self.ids.extend(new_ids)
+            self.count += len(new_ids)
+            self.flush()
+            self._save_config()
+
+    def _write_payloads(self, rows: np.ndarray, payloads: List[Dict]):
+        self._payload_file.seek(0, os.SEEK_END)
+        offset = self._payload_file.tell()
+        lines = []
+        for row, payload in zip(rows, payloads):
+            line = json.dumps(payload, ensure_ascii=False).encode() + b"\n"
+            self.offsets[row] = offset
+            offset += len(line)
+            lines.append(line)
+            self.times[row] = _time_value(payload)
+            self.flags[row] = _ALIVE | (_DUPLICATE if not _is_empty(payload.get(DUPLICATE_FIELD)) else 0)
+            for key, column in self._columns.items():
+                if row < len(column):
+                    column[row] = payload.get(key)
+                else:
+                    column.extend([None] * (row - len(column)) + [payload.get(key)])
+        self._payload_file.write(b"".join(lines))
+        self._payload_file.flush()
+
+    def set_payload(self, rows: List[int], payload: Dict):
+        """Merge payload keys into existing points"""
+        with self._lock:
+            merged = [{**self.payload(row), **payload} for row in rows]
+            self._write_payloads(np.asarray(rows, dtype=np.int64), merged)
+            self.flush()
+            self._save_config()
+
+    def delete(self, rows: List[int]):
+        """Tombstone points; their rows are not reused"""
+        with self._lock:
+            for row in rows:
+                self.flags[row] &= ~np.uint8(_ALIVE)
+                self.rows.pop(self.ids[row], None)
+            self.flush()
+            self._save_config()
+
+    # Reads
+
+    def payload(self, row: int) -> Dict:
+        with self._lock:
+            self._payload_file.seek(int(self.offsets[row]))
+            return json.loads(self._payload_file.readline())
+
+    def vector(self, row: int, name: str) -> List[float]:
+        return self.vectors[name][row].astype(np.float32).tolist()
+
+    def alive_mask(self) -> np.ndarray:
+        return (self.flags[:self.count] & _ALIVE).astype(bool)
+
+    def id_order(self) -> Tuple[List, np.ndarray]:
+        """
+        Rows sorted by point id, with their sort keys
+
+        Rebuilt only after new ids were appended; deleted rows stay in the
+        order and are dropped by the alive mask.
+        """
+        with self._lock:
+            if self._id_order is None or len(self._id_order[1]) != self.count:
+                keys = [_id_key(point_id) for point_id in self.ids]
+                rows = sorted(range(self.count), key=keys.__getitem__)
+                self._id_order = ([keys[row] for row in rows], np.array(rows, dtype=np.int64))
+            return self._id_order
+
+    def column(self, key: str) -> List:
+        """Payload values of one field for every row, decoded once and kept up to date"""
+        with self._lock:
+            if key not in self._columns:
+                self._columns[key] = [self.payload(row).get(key) for row in range(self.count)]
+            column = self._columns[key]
+            if len(column) < self.count:
+                column.extend([None] * (self.count - len(column)))
+            return column
+
+    def filter_mask(self, query_filter: Optional[models.Filter]) -> np.ndarray:
+        """Boolean mask over the rows of live points matching the filter"""
+        mask = self.alive_mask()
+        if query_filter is not None:
+            mask &= self._filter_mask(query_filter)
+        return mask
+
+    def _filter_mask(self, query_filter: models.Filter) -> np.ndarray:
+        mask = np.ones(self.count, dtype=bool)
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(condition)
+        if query_filter.should:
+            should = np.zeros(self.count, dtype=bool)
+            for condition in query_filter.should:
+                should |= self._condition_mask(condition)
+            mask &= should
+        for condition in query_filter.must_not or []:
+            mask &= ~self._condition_mask(condition)
+        return mask
+
+    def _condition_mask(self, condition) -> np.ndarray:
+        if isinstance(condition, models.Filter):
+            return self._filter_mask(condition)
+        if isinstance(condition, models.HasIdCondition):
+            mask = np.zeros(self.count, dtype=bool)
+            mask[[self.rows[i] for i in condition.has_id if i in self.rows]] = True
+            return mask
+        if isinstance(condition, models.IsEmptyCondition):
+            key = condition.is_empty.key
+            if key == DUPLICATE_FIELD:
+                return (self.flags[:self.count] & _DUPLICATE) == 0
+            return np.fromiter(map(_is_empty, self.column(key)), dtype=bool, count=self.count)
+        if isinstance(condition, models.IsNullCondition):
+            return np.fromiter((value is None for value in self.column(condition.is_null.key)), dtype=bool, count=self.count)
+        if isinstance(condition, models.FieldCondition):
+            if condition.range is not None:
+                if condition.key == TIME_FIELD:
+                    times = self.times[:self.count]
+                    mask = ~np.isnan(times)
+                    bounds = condition.range
+                    with np.errstate(invalid="ignore"):
+                        if bounds.gt is not None:
+                            mask &= times > bounds.gt
+                        if bounds.gte is not None:
+                            mask &= times >= bounds.gte
+                        if bounds.lt is not None:
+                            mask &= times < bounds.lt
+                        if bounds.lte is not None:
+                            mask &= times <= bounds.lte
+                    return mask
+                return np.fromiter(
+                    (_in_range(value, condition.range) for value in self.column(condition.key)),
+                    dtype=bool, count=self.count
+                )
+            match = condition.match
+            if isinstance(match, models.MatchValue):
+                accepted, negate = {match.value}, False
+            elif isinstance(match, models.MatchAny):
+                accepted, negate = set(match.any), False
+            elif isinstance(match, models.MatchExcept):
+                accepted, negate = set(match.except_), True
+            else:
+                raise ValueError(f"Unsupported match condition for the NumPy backend: {match!r}")
+            mask = np.fromiter(
+                (_values_match(value, accepted) for value in self.column(condition.key)),
+                dtype=bool, count=self.count
+            )
+            return ~mask if negate else mask
+        raise ValueError(f"Unsupported filter condition for the NumPy backend: {condition!r}")
+
+    def top_k(self, name: str, query: np.ndarray, mask: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k rows by dot product with the query
+
+        The matrix is scored in blocks of BLOCK_ROWS rows, keeping only each
+        block's best candidates, so memory use stays flat however large the
+        collection is. Blocks without matching rows are skipped, and of blocks
+        where a filter leaves few rows only those rows are read.
+
+        Returns:
+            Rows and scores, best first
+        """
+        matrix = self.vectors[name]
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        if limit <= 0:
+            return best_rows, best_scores
+
+        # The mask fixes the rows searched, even if a concurrent write appends more
+        for start in range(0, len(mask), BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, len(mask))
+            rows = start + np.flatnonzero(mask[start:stop])
+            if not len(rows):
+                continue
+            if len(rows) < SPARSE_FRACTION * (stop - start):
+                scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+            else:
+                scores = (np.asarray(matrix[start:stop], dtype=np.float32) @ query)[rows - start]
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[top], scores[top]
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > limit:
+                top = np.argpartition(-best_scores, limit - 1)[:limit]
+                best_rows, best_scores = best_rows[top], best_scores[top]
+
+        order = np.argsort(-best_scores, kind="stable")
+        return best_rows[order], best_scores[order]
+
+
+class NumpyVectorClient:
+    """
+    Exact-search vector store on memory-mapped NumPy arrays
+
+    Implements the part of the QdrantClient API that ConversationVectorStore
+    uses (collections, aliases, upsert/upload, retrieve, scroll, set_payload,
+    payload filters and search), returning the same qdrant_client models, so
+    it can stand in for the embedded local mode. Search is a blocked exact
+    matrix-vector product instead of Python-level scoring, and the vector
+    files are shared through the OS page cache, so any number of read-only
+    clients in other processes add no memory beyond their own query state.
+    """
+
+    def __init__(self, path: str, vector_dtype: str = "float32", read_only: bool = False):
+        """
+        Args:
+            path: Directory holding one subdirectory per collection
+            vector_dtype: Storage type of new collections; 'float16' halves disk and page
+                cache use, but scoring converts every block to float32 and is slower
+            read_only: Open collections read-only, picking up rows other processes commit
+        """
+        if vector_dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not read_only:
+            self._finish_compactions()
+        self.vector_dtype = vector_dtype
+        self.read_only = read_only
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    # Collections and aliases
+
+    def _aliases(self) -> Dict[str, str]:
+        alias_file = self.path / ALIAS_FILE
+        return json.loads(alias_file.read_text()) if alias_file.exists() else {}
+
+    def _save_aliases(self, aliases: Dict[str, str]):
+        alias_file = self.path / ALIAS_FILE
+        tmp_file = alias_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(aliases, indent=2))
+        os.replace(tmp_file, alias_file)
+
+    def _resolve(self, collection_name: str) -> str:
+        return self._aliases().get(collection_name, collection_name)
+
+    def _collection(self, collection_name: str) -> NumpyCollection:
+        name = self._resolve(collection_name)
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                directory = self.path / name
+                if not (directory / CONFIG_FILE).exists():
+                    raise ValueError(f"Collection {collection_name} not found")
+                collection = self._collections[name] = NumpyCollection(directory, read_only=self.read_only)
+        collection.refresh()
+        return collection
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return (self.path / self._resolve(collection_name) / CONFIG_FILE).exists()
+
+    def create_collection(self, collection_name: str, vectors_config, **kwargs) -> bool:
+        if self.collection_exists(collection_name):
+            raise ValueError(f"Collection {collection_name} already exists")
+        named = isinstance(vectors_config, dict)
+        NumpyCollection.create(
+            self.path / collection_name,
+            vectors_config if named else {"": vectors_config},
+            named,
+            self.vector_dtype
+        )
+        return True
+
+    def delete_collection(self, collection_name: str, **kwargs) -> bool:
+        with self._lock:
+            collection = self._collections.pop(collection_name, None)
+        if collection is not None:
+            collection.close()
+        directory = self.path / collection_name
+        if not directory.exists():
+            return False
+        shutil.rmtree(directory)
+        aliases = self._aliases()
+        remaining = {alias: name for alias, name in aliases.items() if name != collection_name}
+        if remaining != aliases:
+            self._save_aliases(remaining)
+        return True
+
+    def get_collections(self) -> models.CollectionsResponse:
+        return models.CollectionsResponse(collections=[
+            models.CollectionDescription(name=directory.name)
+            for directory in sorted(self.path.iterdir())
+            if (directory / CONFIG_FILE).exists() and not directory.name.endswith((COMPACT_SUFFIX, RETIRED_SUFFIX))
+        ])
+
+    def get_collection(self, collection_name: str) -> models.CollectionInfo:
+        collection = self._collection(collection_name)
+        points = int(collection.alive_mask().sum())
+        params = collection.vector_params
+        return models.CollectionInfo(
+            status=models.CollectionStatus.GREEN,
+            optimizer_status=models.OptimizersStatusOneOf.OK,
+            vectors_count=points * len(params),
+            indexed_vectors_count=0,  # Exact search, there is no index
+            points_count=points,
+            segments_count=1,
+            payload_schema={
+                field: models.PayloadIndexInfo(data_type=models.PayloadSchemaType(schema), points=points)
+                for field, schema in collection.config["payload_schema"].items()
+            },
+            config=models.CollectionConfig(
+                params=models.CollectionParams(vectors=params if collection.config["named"] else params[""]),
+                hnsw_config=models.HnswConfig(m=16, ef_construct=100, full_scan_threshold=10000),
+                optimizer_config=models.OptimizersConfig(
+                    deleted_threshold=0.2,
+                    vacuum_min_vector_number=1000,
+                    default_segment_number=0,
+                    indexing_threshold=collection.config["indexing_threshold"],
+                    flush_interval_sec=5
+                ),
+                wal_config=models.WalConfig(wal_capacity_mb=32, wal_segments_ahead=0)
+            )
+        )
+
+    def update_collection(self, collection_name: str, optimizers_config: Optional[models.OptimizersConfigDiff] = None, **kwargs) -> bool:
+        """Records the indexing threshold; nothing is indexed"""
+        collection = self._collection(collection_name)
+        if optimizers_config is not None and optimizers_config.indexing_threshold is not None:
+            with collection._lock:
+                collection.config["indexing_threshold"] = optimizers_config.indexing_threshold
+                collection._save_config()
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema=None, **kwargs) -> models.UpdateResult:
+        """Records the field type (filters are evaluated on columns, there is no index)"""
+        collection = self._collection(collection_name)
+        with collection._lock:
+            collection.config["payload_schema"][field_name] = str(getattr(field_schema, "value", field_schema))
+            collection._save_config()
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def get_aliases(self) -> models.CollectionsAliasesResponse:
+        return models.CollectionsAliasesResponse(aliases=[
+            models.AliasDescription(alias_name=alias, collection_name=name)
+            for alias, name in self._aliases().items()
+        ])
+
+    def update_collection_aliases(self, change_aliases_operations: List, **kwargs) -> bool:
+        """Apply alias changes in one atomic file replace"""
+        aliases = self._aliases()
+        for operation in change_aliases_operations:
+            if isinstance(operation, models.CreateAliasOperation):
+                aliases[operation.create_alias.alias_name] = operation.create_alias.collection_name
+            elif isinstance(operation, models.DeleteAliasOperation):
+                aliases.pop(operation.delete_alias.alias_name, None)
+            elif isinstance(operation, models.RenameAliasOperation):
+                rename = operation.rename_alias
+                aliases[rename.new_alias_name] = aliases.pop(rename.old_alias_name)
+            else:
+                raise ValueError(f"Unsupported alias operation: {operation!r}")
+        self._save_aliases(aliases)
+        return True
+
+    # Points
+
+    def _vector_arrays(self, collection: NumpyCollection, vectors, count: int) -> Dict[str, np.ndarray]:
+        if collection.config["named"]:
+            if not isinstance(vectors, dict):
+                raise ValueError(f"Collection needs named vectors {sorted(collection.vector_params)}")
+            return {name: np.asarray(matrix, dtype=np.float32).reshape(count, -1) for name, matrix in vectors.items()}
+        return {"": np.asarray(vectors, dtype=np.float32).reshape(count, -1)}
+
+    def upsert(self, collection_name: str, points, wait: bool = True, **kwargs) -> models.UpdateResult:
+        """Insert or replace points given as PointStruct objects or a Batch"""
+        collection = self._collection(collection_name)
+        if isinstance(points, models.Batch):
+            point_ids, vectors, payloads = list(points.ids), points.vectors, points.payloads or [None] * len(points.ids)
+        else:
+            point_ids = [point.id for point in points]
+            payloads = [point.payload for point in points]
+            if collection.config["named"]:
+                vectors = {name: [point.vector[name] for point in points] for name in collection.vector_params}
+            else:
+                vectors = [point.vector for point in points]
+        if point_ids:
+            collection.write(
+                [str(i) if not isinstance(i, int) else i for i in point_ids],
+                self._vector_arrays(collection, vectors, len(point_ids)),
+                payloads
+            )
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def upload_collection(
+        self,
+        collection_name: str,
+        vectors,
+        payload: Optional[Iterable[Dict]] = None,
+        ids: Optional[Iterable] = None,
+        batch_size: int = 64,
+        **kwargs
+    ):
+        """Write NumPy vectors directly, batch_size points per write"""
+        if ids is None:
+            raise ValueError("The NumPy backend needs explicit point ids")
+        point_ids = [str(i) if not isinstance(i, int) else i for i in ids]
+        payloads = list(payload) if payload is not None else [None] * len(point_ids)
+        collection = self._collection(collection_name)
+        arrays = self._vector_arrays(collection, vectors, len(point_ids))
+        for start in range(0, len(point_ids), batch_size):
+            collection.write(
+                point_ids[start:start + batch_size],
+                {name: matrix[start:start + batch_size] for name, matrix in arrays.items()},
+                payloads[start:start + batch_size]
+            )
+
+    def _record_vector(self, collection: NumpyCollection, row: int, with_vectors):
+        if not with_vectors:
+            return None
+        if not collection.config["named"]:
+            return collection.vector(row, "")
+        names = collection.vector_params if with_vectors is True else with_vectors
+        return {name: collection.vector(row, name) for name in names}
+
+    def _record(self, collection: NumpyCollection, row: int, with_payload, with_vectors) -> models.Record:
+        return models.Record(
+            id=collection.ids[row],
+            payload=_select_payload(collection.payload(row), with_payload),
+            vector=self._record_vector(collection, row, with_vectors)
+        )
+
+    def retrieve(self, collection_name: str, ids: List, with_payload=True, with_vectors=False, **kwargs) -> List[models.Record]:
+        collection = self._collection(collection_name)
+        rows = [collection.rows.get(str(i) if not isinstance(i, int) else i) for i in ids]
+        return [self._record(collection, row, with_payload, with_vectors) for row in rows if row is not None]
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        offset=None,
+        with_payload=True,
+        with_vectors=False,
+        **kwargs
+    ) -> Tuple[List[models.Record], Optional[str]]:
+        """
+        Page through points in id order, as Qdrant does
+
+        The offset is the first point id of the page. It need not exist any
+        more: a page whose first point was deleted in the meantime starts at
+        the next id after it.
+        """
+        collection = self._collection(collection_name)
+        keys, order = collection.id_order()
+        if offset is not None:
+            order = order[bisect.bisect_left(keys, _id_key(offset)):]
+        mask = collection.filter_mask(scroll_filter)
+        rows = order[mask[order]]
+        page, rest = rows[:limit], rows[limit:]
+        next_offset = collection.ids[rest[0]] if len(rest) else None
+        return [self._record(collection, row, with_payload, with_vectors) for row in page], next_offset
+
+    def count(self, collection_name: str, count_filter: Optional[models.Filter] = None, exact: bool = True) -> models.CountResult:
+        return models.CountResult(count=int(self._collection(collection_name).filter_mask(count_filter).sum()))
+
+    def _selected_rows(self, collection: NumpyCollection, points) -> List[int]:
+        if isinstance(points, models.FilterSelector):
+            return np.flatnonzero(collection.filter_mask(points.filter)).tolist()
+        if isinstance(points, models.Filter):
+            return np.flatnonzero(collection.filter_mask(points)).tolist()
+        if isinstance(points, models.PointIdsList):
+            points = points.points
+        rows = [collection.rows.get(str(i) if not isinstance(i, int) else i) for i in points]
+        return [row for row in rows if row is not None]
+
+    def set_payload(self, collection_name: str, payload: Dict, points, **kwargs) -> models.UpdateResult:
+        collection = self._collection(collection_name)
+        rows = self._selected_rows(collection, points)
+        if rows:
+            collection.set_payload(rows, payload)
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def delete(self, collection_name: str, points_selector, **kwargs) -> models.UpdateResult:
+        collection = self._collection(collection_name)
+        collection.delete(self._selected_rows(collection, points_selector))
+        return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector,
+        query_filter: Optional[models.Filter] = None,
+        search_params: Optional[models.SearchParams] = None,
+        limit: int = 10,
+        offset: Optional[int] = None,
+        with_payload=True,
+        with_vectors=False,
+        score_threshold: Optional[float] = None,
+        **kwargs
+    ) -> List[models.ScoredPoint]:
+        """
+        Exact nearest neighbours; search_params are accepted and ignored (search is always exact)
+
+        Returns:
+            Scored points, best first
+        """
+        collection = self._collection(collection_name)
+        if isinstance(query_vector, models.NamedVector):
+            name, vector = query_vector.name, query_vector.vector
+        elif isinstance(query_vector, tuple):
+            name, vector = query_vector
+        else:
+            name, vector = "", query_vector
+        if name not in collection.vector_params:
+            raise ValueError(f"Collection {collection_name} has no vector named '{name}'")
+        query = np.asarray(vector, dtype=np.float32)
+        if collection.vector_params[name].distance == models.Distance.COSINE:
+            query = query / max(np.linalg.norm(query), 1e-12)
+
+        rows, scores = collection.top_k(name, query, collection.filter_mask(query_filter), limit + (offset or 0))
+        results = []
+        for row, score in list(zip(rows, scores))[offset or 0:]:
+            if score_threshold is not None and score < score_threshold:
+                break
+            record = self._record(collection, row, with_payload, with_vectors)
+            results.append(models.ScoredPoint(
+                id=record.id, version=0, score=float(score), payload=record.payload, vector=record.vector
+            ))
+        return results
+
+    # Maintenance
+
+    def storage_stats(self, collection_name: str) -> Dict:
+        """Rows, bytes on disk and reclaimable bytes of a collection (see NumpyCollection.storage_stats)"""
+        return self._collection(collection_name).storage_stats()
+
+    def compact(self, collection_name: str) -> Dict:
+        """
+        Rewrite a collection without deleted rows and superseded payloads
+
+        The live points are copied into a new directory, which then replaces
+        the collection with two renames; an interrupted compaction is finished
+        or discarded the next time the client opens the store.
+
+        Returns:
+            Storage stats after compaction
+        """
+        name = self._resolve(collection_name)
+        collection = self._collection(name)
+        if collection.read_only:
+            raise RuntimeError("Collection is opened read-only")
+        target_dir = self.path / f"{name}{COMPACT_SUFFIX}"
+        retired_dir = self.path / f"{name}{RETIRED_SUFFIX}"
+        shutil.rmtree(target_dir, ignore_errors=True)
+        with collection._lock:
+            NumpyCollection.create(target_dir, collection.vector_params, collection.config["named"], collection.config["dtype"])
+            target = NumpyCollection(target_dir)
+            live = np.flatnonzero(collection.alive_mask())
+            for start in range(0, len(live), BLOCK_ROWS):
+                rows = live[start:start + BLOCK_ROWS]
+                target.write(
+                    [collection.ids[row] for row in rows],
+                    {vector_name: matrix[rows] for vector_name, matrix in collection.vectors.items()},
+                    [collection.payload(row) for row in rows]
+                )
+            target.config.update({
+                "payload_schema": collection.config["payload_schema"],
+                "indexing_threshold": collection.config["indexing_threshold"]
+            })
+            target._save_config()
+            target.close()
+            with self._lock:
+                self._collections.pop(name, None)
+            collection.close()
+            os.replace(self.path / name, retired_dir)
+            os.replace(target_dir, self.path / name)
+        shutil.rmtree(retired_dir, ignore_errors=True)
+        return self.storage_stats(name)
+
+    def _finish_compactions(self):
+        """Complete or discard compactions interrupted by a crash"""
+        for directory in list(self.path.iterdir()):
+            if directory.name.endswith(COMPACT_SUFFIX):
+                original = self.path / directory.name[:-len(COMPACT_SUFFIX)]
+                if original.exists():
+                    shutil.rmtree(directory)
+                else:
+                    os.replace(directory, original)
+        for directory in list(self.path.iterdir()):
+            if directory.name.endswith(RETIRED_SUFFIX):
+                shutil.rmtree(directory)
+
+    def close(self):
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections = {}
@@ -0,0 +1,77 @@
+"""
+Stand-in for the Ollama /api/embed endpoint, for load-balancing and ingest tests.
+
+Embeddings are deterministic bag-of-words hashes, so similar texts get
+similar vectors. Start several on different ports to simulate a pool:
+
+    python -m memlog.ollama_stub --port 11501 --delay 0.05
+    python -m memlog.ollama_stub --port 11502 --fail-rate 0.2
+"""
+import argparse
+import json
+import random
+import re
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def stub_embedding(text: str, dimension: int) -> list:
+    """Normalized sum of per-word random vectors (seeded by the word's CRC32)"""
+    vector = np.zeros(dimension)
+    for word in _WORD.findall(text.lower())[:512]:
+        vector += np.random.default_rng(zlib.crc32(word.encode())).standard_normal(dimension)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else np.full(dimension, 1 / np.sqrt(dimension))).tolist()
+
+
+def make_handler(dimension: int, delay: float, per_item_delay: float, fail_rate: float):
+    class EmbedHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'{"version": "stub"}')
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            texts = body.get("input", [])
+            texts = [texts] if isinstance(texts, str) else texts
+            time.sleep(delay + per_item_delay * len(texts))
+            if random.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            response = json.dumps({
+                "model": body.get("model"),
+                "embeddings": [stub_embedding(text, dimension) for text in texts]
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(response)
+
+    return EmbedHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama embedding server")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--per-item-delay", type=float, default=0.0, help="Seconds added per embedded text")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    args = parser.parse_args()
+    handler = make_handler(args.dimension, args.delay, args.per_item_delay, args.fail_rate)
+    print(f"Stub embedding server on http://127.0.0.1:{args.port}/api/embed")
+    ThreadingHTTPServer(("127.0.0.1", args.port), handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PII_TERMS_FILE = "pii_terms.txt"  # Custom terms to redact, one per line ('#' starts a comment)
+MIN_PARALLEL_CHARS = 2_000_000  # Below this much text a process pool costs more than it saves
+
+def _label_variants(*labels: str) -> Tuple[str, ...]:
+    return tuple(variant for label in labels for variant in (label, label.upper(), label.capitalize()))
+
+
+# Passes run in this order; each has a cheap gate (literals, any of which must
+# occur, or a regex with a fixed leading character class) so a full pattern
+# only scans texts that can contain its category. Patterns begin with a
+# character class rather than a lookbehind so the regex engine can skip ahead
+# to candidate positions; word-boundary checks come after the first character.
+PII_PASSES = [
+    ("key", ("PRIVATE KEY",), r"-----BEGIN [A-Z ]*PRIVATE KEY-----[\s\S]*?-----END [A-Z ]*PRIVATE KEY-----"),
+    ("key", ("eyJ",), r"eyJ[\w-]{10,}\.[\w-]{10,}\.[\w-]{10,}"),
+    ("key", ("sk-", "AKIA", "ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_", "xox", "AIza", "hf_"), (
+        r"(?:sk-(?:ant-|proj-)?[\w-]{20,}|AKIA[0-9A-Z]{16}|gh[pousr]_\w{36,}|github_pat_\w{40,}"
+        r"|xox[abprs]-[\w-]{10,}|AIza[\w-]{35}|hf_\w{30,})"
+    )),
+    ("key", ("Bearer ",), r"(?<=Bearer )[\w.~+/-]{20,}=*"),
+    # Long values with a digit after ':' or '='; only replaced when a
+    # secret-like label ('api_key = ...', 'password: ...') precedes them
+    ("key", _label_variants("key", "secret", "token", "passw", "credential", "auth"), r"[:=][ \t]*[\"']?(?P<secret>(?=[\w+/.~-]*\d)[\w+/.~-]{16,})"),
+    ("email", ("@",), r"[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b"),
+    # Dotted quads; octets and a preceding 'version'/'v' are checked on replacement
+    ("ip", r"\d\.\d{1,3}\.\d{1,3}\.\d", r"\d(?<![\w.]\d)(?P<ipv4>\d{0,2}(?:\.\d{1,3}){3})(?!\w|\.\d)"),
+    # IPv6 addresses must contain a digit, so 'a::b' or 'Foo::Bar' stay intact
+    ("ip", r"[0-9A-Fa-f]:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}:", (
+        r"[0-9A-Fa-f](?<![\w:][0-9A-Fa-f])(?:(?<=\d)|(?=[0-9A-Fa-f:]*\d))"
+        r"[0-9A-Fa-f]{0,3}:(?:[0-9A-Fa-f]{1,4}:){6}[0-9A-Fa-f]{1,4}(?![\w:])"
+    )),
+    ("ip", ("::",), (
+        r"[0-9A-Fa-f](?<![\w:][0-9A-Fa-f])(?:(?<=\d)|(?=[0-9A-Fa-f:]*\d))[0-9A-Fa-f]{0,3}:"
+        r"(?:[0-9A-Fa-f]{1,4}:){0,5}:(?:[0-9A-Fa-f]{1,4}(?::[0-9A-Fa-f]{1,4}){0,5})?(?![\w:])"
+    )),
+    # Digit groups continuing another digit group on either side (card
+    # numbers, long ids) are not phone numbers
+    ("phone", r"[\d+]\d\d(?:[ .-]\d\d\d|\d{7})", (
+        r"[+(\d](?<![\w+][+(\d])(?<!\d[ .-][+(\d])(?:(?<=\+)\d{1,3}[ .-]?)?(?:\(?\d{2,4}\)[ .-]?|\d{2,4}[ .-])"
+        r"\d{3,4}[ .-]\d{3,4}(?![\w-]|[ .]\d)"
+        r"|\+(?<![\w+]\+)\d{10,14}\b"
+        # Unseparated North American numbers; the area code never starts with
+        # 0 or 1, which keeps out Unix timestamps (until 2033)
+        r"|[2-9](?<![\w+.][2-9])\d{9}(?!\w)"
+    )),
+]
+PII_CATEGORIES = ("email", "phone", "key", "ip", "term")
+
+_SECRET_LABEL = re.compile(
+    r"(?i)(?:api[_-]?key|secret|token|passw(?:or)?d|credential|auth)\w*[\"']?\s*$"
+)
+_LABEL_WINDOW = 40  # Characters before ':' or '=' searched for a secret-like label
+_VERSION_LABEL = re.compile(r"(?i)(?:\bv|\bver(?:sion)?\.?\s*|\brelease\s*)$")
+_VERSION_WINDOW = 12  # Characters before a dotted quad searched for a version label
+
+
+def load_terms(path: str = PII_TERMS_FILE) -> List[str]:
+    """Read custom redaction terms, one per line; missing file means no terms"""
+    if not Path(path).exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def trie_pattern(terms: List[str]) -> str:
+    """
+    Regex alternation of terms shaped like a trie
+
+    Terms sharing a prefix share one branch ('acme corp|acme inc' becomes
+    'acme\\ (?:corp|inc)'), so the regex engine tests each position against
+    the first characters only once instead of once per term.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+@lru_cache(maxsize=8)
+def compile_passes(terms: Tuple[str, ...] = ()) -> List[Tuple[str, object, re.Pattern]]:
+    """Compiled (category, gate, pattern) passes, with the custom terms last"""
+    passes = [
+        (category, re.compile(gate) if isinstance(gate, str) else gate, re.compile(pattern))
+        for category, gate, pattern in PII_PASSES
+    ]
+    if terms:
+        passes.append(("term", None, re.compile(rf"(?i:(?<!\w)(?:{trie_pattern(list(terms))})(?!\w))")))
+    return passes
+
+
+def _gate_open(gate, text: str) -> bool:
+    if gate is None:
+        return True
+    if isinstance(gate, re.Pattern):
+        return gate.search(text) is not None
+    return any(literal in text for literal in gate)
+
+
+def redact_texts(texts: List[str], terms: Tuple[str, ...] = ()) -> Tuple[List[str], Counter]:
+    """
+    Replace PII in texts with [EMAIL], [PHONE], [KEY], [IP] or [TERM]
+
+    Module-level so it can run in worker processes.
+
+    Returns:
+        Redacted texts and the number of matches per category
+    """
+    counts = Counter()
+    redacted = []
+    for text in texts:
+        for category, gate, pattern in compile_passes(terms):
+            if _gate_open(gate, text):
+                text = pattern.sub(_replacement(category, counts), text)
+        redacted.append(text)
+    return redacted, counts
+
+
+def _replacement(category: str, counts: Counter):
+    placeholder = f"[{category.upper()}]"
+
+    def replace(match: re.Match) -> str:
+        if "secret" in match.re.groupindex:
+            start = match.start()
+            if not _SECRET_LABEL.search(match.string, max(0, start - _LABEL_WINDOW), start):
+                return match.group()
+            # Keep the label and separator, replace only the value
+            counts[category] += 1
+            return match.string[start:match.start("secret")] + placeholder
+        if "ipv4" in match.re.groupindex:
+            start = match.start()
+            octets = match.group()
+            if (any(int(octet) > 255 for octet in octets.split("."))
+                    or _VERSION_LABEL.search(match.string, max(0, start - _VERSION_WINDOW), start)):
+                return octets
+        counts[category] += 1
+        return placeholder
+
+    return replace
+
+
+class PIIRedactor:
+    """
+    Redacts emails, phone numbers, API keys and tokens, IP addresses and
+    custom terms from conversation text before it is embedded or stored
+
+    Each category runs as its own precompiled pass, skipped for texts that
+    fail the pass's cheap gate, so most texts are scanned by only a few
+    patterns. Match counts per category accumulate in `counts`.
+    """
+
+    def __init__(self, terms: Optional[List[str]] = None, n_process: int = 1, terms_file: Optional[str] = PII_TERMS_FILE):
+        """
+        Args:
+            terms: Custom terms (names, project codenames, ...) matched case-insensitively
+                as whole words; defaults to the contents of terms_file
+            n_process: Worker processes for large batches
+            terms_file: File the custom terms are read from when terms is not given
+                (None for no custom terms)
+        """
+        if terms is None:
+            terms = load_terms(terms_file) if terms_file else []
+        else:
+            terms_file = None
+        self.terms_file = terms_file  # Where the terms came from, so a reopened store can reload them
+        self.terms = tuple(sorted(set(terms)))
+        self.n_process = n_process
+        self.counts = Counter()
+        self._executor = None
+        compile_passes(self.terms)
+
+    def redact(self, text: str) -> str:
+        """Redact a single text"""
+        return self.redact_many([text])[0]
+
+    def redact_record(self, record):
+        """Redact every string in a JSON-like record (dicts, lists and scalars)"""
+        if isinstance(record, str):
+            return self.redact(record)
+        if isinstance(record, dict):
+            return {key: self.redact_record(value) for key, value in record.items()}
+        if isinstance(record, list):
+            return [self.redact_record(value) for value in record]
+        return record
+
+    def redact_many(self, texts: List[str]) -> List[str]:
+        """Redact a batch of texts, split across worker processes when it is large"""
+        if self.n_process <= 1 or len(texts) < self.n_process or sum(map(len, texts)) < MIN_PARALLEL_CHARS:
+            redacted, counts = redact_texts(texts, self.terms)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.n_process)
+            size = -(-len(texts) // self.n_process)
+            parts = [texts[i:i + size] for i in range(0, len(texts), size)]
+            redacted, counts = [], Counter()
+            for part_texts, part_counts in self._executor.map(redact_texts, parts, [self.terms] * len(parts)):
+                redacted.extend(part_texts)
+                counts.update(part_counts)
+        self.counts.update(counts)
+        return redacted
+
+    def summary(self) -> str:
+        """Matches per category so far, e.g. 'email: 12, key: 3'"""
+        return ", ".join(f"{category}: {self.counts[category]}" for category in PII_CATEGORIES if self.counts[category])
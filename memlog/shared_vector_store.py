@@ -1,8 +1,11 @@
 import streamlit as st
-from memlog.conversation_vector_store import ConversationVectorStore
+from memlog.conversation_vector_store import STORE_LOCK_FILE, ConversationVectorStore
+from memlog.conversation_cache import CACHE_DIR, MANIFEST_FILE, ConversationCache
 import os
 from pathlib import Path
 
+SEARCH_DEADLINE_SECONDS = 3.0  # Search answers from the word index if the query cannot be embedded in time
+
 @st.cache_resource(show_spinner=True)
 def get_shared_vector_store():
     """
@@ -12,7 +15,7 @@ def get_shared_vector_store():
     with st.spinner("Initializing vector store..."):
         try:
             # Check for stale lock file
-            lock_file = Path("./qdrant_db/.lock")
+            lock_file = Path("./qdrant_db") / STORE_LOCK_FILE
             if lock_file.exists():
                 try:
                     os.remove(lock_file)
@@ -24,8 +27,24 @@ def get_shared_vector_store():
                 qdrant_path="./qdrant_db",
                 collection_name="conversations",
                 dimension=1024,  # Correct dimension for mxbai-embed-large
-                ollama_url="http://localhost:11434/api/embed"
+                ollama_url="http://localhost:11434/api/embed",
+                search_deadline=SEARCH_DEADLINE_SECONDS  # Searches on every page degrade instead of hanging
             )
         except RuntimeError as e:
             st.error(f"Error initializing vector store: {str(e)}")
             return None
+
+@st.cache_resource(max_entries=1)
+def _load_conversation_cache(version: float):
+    return ConversationCache(CACHE_DIR)
+
+def get_shared_conversation_cache():
+    """
+    Memory-mapped conversation cache shared across all pages, used to page
+    through the messages of a conversation. Reopened when load_conversations.py
+    rebuilds it; returns None until it has been built.
+    """
+    manifest = Path(CACHE_DIR) / MANIFEST_FILE
+    if not manifest.exists():
+        return None
+    return _load_conversation_cache(manifest.stat().st_mtime)
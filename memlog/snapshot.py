@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+PAYLOADS_FILE = "payloads.jsonl"
+SNAPSHOT_DTYPE = "float16"
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def vectors_file(name: Optional[str] = None) -> str:
+    """File of the body vectors, or of the named vectors stored next to them"""
+    return VECTORS_FILE if name is None else f"vectors.{name}.npy"
+
+
+def write_snapshot(
+    snapshot_dir: str,
+    batches: Iterable[tuple],
+    count: int,
+    dimension: int,
+    info: Dict,
+    extra_vectors: Tuple[str, ...] = ()
+) -> Dict:
+    """
+    Write vectors and payloads to a snapshot directory
+
+    Vectors go to a float16 .npy file filled in place through a memory map,
+    payloads to JSONL in the same order. Named vectors stored next to the
+    body vectors (title vectors) get a .npy file each. The manifest is
+    written last, so a directory without one is an incomplete snapshot.
+
+    Args:
+        snapshot_dir: Output directory
+        batches: Iterator of (point ids, vectors, payloads), with a fourth
+            element mapping each of extra_vectors to its vectors if there are any
+        count: Number of points expected
+        dimension: Vector dimension, shared by the extra vectors
+        info: Extra manifest fields (model name, collection, ...)
+        extra_vectors: Names of the vectors stored besides the body vectors
+
+    Returns:
+        The manifest
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = snapshot_dir / MANIFEST_FILE
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+    names = (None,) + tuple(extra_vectors)
+    vectors_paths = {name: snapshot_dir / vectors_file(name) for name in names}
+    payloads_path = snapshot_dir / PAYLOADS_FILE
+    vectors = {
+        name: open_memmap(path, mode='w+', dtype=SNAPSHOT_DTYPE, shape=(count, dimension))
+        for name, path in vectors_paths.items()
+    }
+    written = 0
+    with open(payloads_path, 'w', encoding='utf-8') as f:
+        for ids, batch_vectors, payloads, *extras in batches:
+            if written + len(ids) > count:
+                raise RuntimeError("Collection grew while the snapshot was being written")
+            batch = {None: batch_vectors, **(extras[0] if extras else {})}
+            for name in names:
+                vectors[name][written:written + len(ids)] = batch[name]
+            for point_id, payload in zip(ids, payloads):
+                f.write(json.dumps({"id": str(point_id), "payload": payload}) + "\n")
+            written += len(ids)
+    for array in vectors.values():
+        array.flush()
+    del vectors, array
+
+    if written < count:
+        # Points were deleted during the export; shrink the arrays to match
+        for path in vectors_paths.values():
+            trimmed = np.load(path, mmap_mode='r')[:written].copy()
+            np.save(path, trimmed)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        **info,
+        "dimension": dimension,
+        "count": written,
+        "dtype": SNAPSHOT_DTYPE,
+        "created_at": time.time(),
+        "extra_vectors": list(extra_vectors),
+        "files": {
+            **{path.name: file_sha256(path) for path in vectors_paths.values()},
+            PAYLOADS_FILE: file_sha256(payloads_path),
+        }
+    }
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def read_manifest(snapshot_dir: str, verify: bool = True) -> Dict:
+    """
+    Load a snapshot manifest and optionally verify file checksums
+
+    Raises:
+        RuntimeError: If the snapshot is incomplete or a checksum does not match
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest_path = snapshot_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise RuntimeError(f"No snapshot manifest in {snapshot_dir} (incomplete snapshot?)")
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise RuntimeError(f"Unsupported snapshot version: {manifest.get('version')}")
+    if verify:
+        for name, expected in manifest["files"].items():
+            if file_sha256(snapshot_dir / name) != expected:
+                raise RuntimeError(f"Checksum mismatch for {name}")
+    return manifest
+
+
+def iter_snapshot(
+    snapshot_dir: str,
+    batch_size: int = 1000,
+    manifest: Optional[Dict] = None
+) -> Generator[Tuple[List[str], np.ndarray, List[Dict], Dict[str, np.ndarray]], None, None]:
+    """
+    Stream a snapshot back in batches
+
+    Yields:
+        Tuples of (point ids, float32 vectors, payloads, float32 extra vectors
+        by name); snapshots written without extra vectors yield an empty dict
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest = manifest or read_manifest(snapshot_dir, verify=False)
+    names = [None] + manifest.get("extra_vectors", [])
+    arrays = {name: np.load(snapshot_dir / vectors_file(name), mmap_mode='r') for name in names}
+    for name, vectors in arrays.items():
+        if vectors.shape != (manifest["count"], manifest["dimension"]):
+            raise RuntimeError(f"{vectors_file(name)} shape {vectors.shape} does not match the manifest")
+
+    def batch(row: int, size: int) -> tuple:
+        extras = {name: np.asarray(arrays[name][row:row + size], dtype=np.float32) for name in names[1:]}
+        return np.asarray(arrays[None][row:row + size], dtype=np.float32), extras
+
+    row = 0
+    ids, payloads = [], []
+    with open(snapshot_dir / PAYLOADS_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            ids.append(entry["id"])
+            payloads.append(entry["payload"])
+            if len(ids) == batch_size:
+                vectors, extras = batch(row, len(ids))
+                yield ids, vectors, payloads, extras
+                row += len(ids)
+                ids, payloads = [], []
+    if ids:
+        vectors, extras = batch(row, len(ids))
+        yield ids, vectors, payloads, extras
+        row += len(ids)
+    if row != manifest["count"]:
+        raise RuntimeError(f"Snapshot has {row} payloads but {manifest['count']} vectors")
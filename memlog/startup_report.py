@@ -0,0 +1,86 @@
+"""
+Report what importing the app and loader modules costs at startup.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so results reflect a cold start rather than modules already in sys.modules.
+
+Usage: python -m memlog.startup_report [module ...] [--top N]
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = [
+    "memlog.conversation_vector_store",
+    "memlog.shared_vector_store",
+    "load_conversations",
+]
+DEFAULT_TOP = 15
+
+
+def measure_imports(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import a module in a fresh interpreter and collect import timings
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Total import seconds and (package, cumulative seconds) for each
+        top-level package it pulled in, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"Importing {module} failed: {last_line}")
+
+    packages: Dict[str, float] = {}
+    pending: List[Tuple[str, float]] = []
+    total = 0.0
+    # Lines are printed children-first, so direct imports of a module appear
+    # just before the module's own (depth 0) line
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        seconds = int(cumulative) / 1_000_000
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            pending.append((name, seconds))
+        elif depth == 0:
+            if name == module:
+                total = seconds
+                for child, child_seconds in pending:
+                    top_level = child.split(".")[0]
+                    packages[top_level] = packages.get(top_level, 0.0) + child_seconds
+            pending = []
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def print_report(modules: List[str], top: int = DEFAULT_TOP):
+    """Print import costs for each module"""
+    for module in modules:
+        print(f"\n=== {module} ===")
+        try:
+            total, packages = measure_imports(module)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            continue
+        print(f"Total import time: {total:.3f} s")
+        for package, seconds in packages[:top]:
+            print(f"  {package:<40} {seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    top = DEFAULT_TOP
+    if "--top" in args:
+        index = args.index("--top")
+        top = int(args[index + 1])
+        del args[index:index + 2]
+    print_report(args or DEFAULT_MODULES, top)
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+PARTITION_SCHEMES = ("year", "quarter", "month")
+
+
+def partition_key(timestamp: float, scheme: str) -> str:
+    """
+    Partition a creation time falls into, as a sortable key
+
+    Returns:
+        '2024' (year), '2024q1' (quarter) or '2024m03' (month), in UTC
+    """
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    if scheme == "year":
+        return f"{moment.year}"
+    if scheme == "quarter":
+        return f"{moment.year}q{(moment.month - 1) // 3 + 1}"
+    if scheme == "month":
+        return f"{moment.year}m{moment.month:02d}"
+    raise ValueError(f"Unknown partition scheme: {scheme}")
+
+
+def partition_bounds(key: str) -> Tuple[float, float]:
+    """Start (inclusive) and end (exclusive) epoch seconds of a partition key"""
+    if "q" in key:
+        year, quarter = key.split("q")
+        start_month, years_after, end_month = 3 * (int(quarter) - 1) + 1, 0, 3 * int(quarter) + 1
+    elif "m" in key:
+        year, month = key.split("m")
+        start_month, years_after, end_month = int(month), 0, int(month) + 1
+    else:
+        year, start_month, years_after, end_month = key, 1, 1, 1
+    if end_month > 12:
+        years_after, end_month = 1, end_month - 12
+    start = datetime(int(year), start_month, 1, tzinfo=timezone.utc)
+    end = datetime(int(year) + years_after, end_month, 1, tzinfo=timezone.utc)
+    return start.timestamp(), end.timestamp()
+
+
+def overlapping_partitions(
+    keys: Iterable[str],
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None
+) -> List[str]:
+    """Partition keys whose period overlaps [start_time, end_time]"""
+    selected = []
+    for key in sorted(keys):
+        begin, end = partition_bounds(key)
+        if start_time is not None and end <= start_time:
+            continue
+        if end_time is not None and begin > end_time:
+            continue
+        selected.append(key)
+    return selected
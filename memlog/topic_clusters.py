@@ -0,0 +1,237 @@
+import json
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+CLUSTERS_FILE = "topic_clusters.npz"
+LABELS_FILE = "topic_clusters.json"
+DEFAULT_CLUSTERS = 50
+DEFAULT_EPOCHS = 3
+INIT_SAMPLE_PER_CLUSTER = 20  # Vectors sampled per cluster for k-means++ seeding
+LABEL_TERMS = 3  # Top c-TF-IDF terms used as a cluster label
+
+_TOKEN = re.compile(r"[a-z][a-z0-9+#\-]{2,}")
+_STOPWORDS = {
+    "the", "and", "for", "with", "from", "how", "what", "why", "into", "your", "you", "are", "can",
+    "new", "using", "use", "help", "about", "this", "that", "vs", "not", "get", "make", "best",
+    "untitled", "conversation", "chat", "request", "question", "questions",
+}
+
+# Callable returning a fresh iterator of (ids, normalized vectors, payloads) batches
+VectorSource = Callable[[], Iterator[Tuple[List, np.ndarray, List[Dict]]]]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def title_terms(title: str) -> List[str]:
+    """Lowercased title tokens used for cluster labelling"""
+    return [term for term in _TOKEN.findall((title or "").lower()) if term not in _STOPWORDS]
+
+
+def class_tfidf(cluster_ids: np.ndarray, titles: List[str], n_clusters: int, top_n: int = 10) -> List[List[str]]:
+    """
+    Top c-TF-IDF terms per cluster, treating all member titles as one document
+
+    Args:
+        cluster_ids: Cluster of each title
+        titles: Member titles
+        n_clusters: Number of clusters
+        top_n: Terms returned per cluster
+
+    Returns:
+        List of top terms for each cluster
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, cols = [], []
+    for cluster, title in zip(cluster_ids, titles):
+        for term in title_terms(title):
+            rows.append(cluster)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+    if not vocabulary:
+        return [[] for _ in range(n_clusters)]
+
+    counts = np.zeros((n_clusters, len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows), np.asarray(cols)), 1)
+
+    # c-TF-IDF: term frequency within the cluster, weighted by how rare the
+    # term is across clusters relative to the average cluster size in words
+    words_per_cluster = counts.sum(axis=1, keepdims=True)
+    tf = counts / np.maximum(words_per_cluster, 1)
+    average_words = words_per_cluster.mean()
+    idf = np.log(1 + average_words / np.maximum(counts.sum(axis=0), 1))
+    scores = tf * idf
+
+    terms = np.array(list(vocabulary.keys()))
+    top = np.argsort(-scores, axis=1)[:, :top_n]
+    return [
+        [str(terms[j]) for j in top[c] if counts[c, j] > 0]
+        for c in range(n_clusters)
+    ]
+
+
+class TopicClusterer:
+    """
+    Spherical mini-batch k-means over stored conversation vectors
+
+    Centroids are persisted so new conversations can be assigned to a topic
+    (and nudge its centroid) at ingest time without reclustering everything.
+    """
+
+    def __init__(self, clusters_file: str = CLUSTERS_FILE, labels_file: str = LABELS_FILE):
+        self.clusters_file = Path(clusters_file)
+        self.labels_file = Path(labels_file)
+        self.centroids: Optional[np.ndarray] = None
+        self.counts: Optional[np.ndarray] = None  # Learning counts for the update rate
+        self.sizes: Optional[np.ndarray] = None  # Current member count per cluster
+        self.terms: List[List[str]] = []
+        self.fitted_at: Optional[float] = None
+        if self.clusters_file.exists():
+            data = np.load(self.clusters_file)
+            self.centroids = data["centroids"]
+            self.counts = data["counts"]
+            self.sizes = data["sizes"]
+            if self.labels_file.exists():
+                info = json.loads(self.labels_file.read_text())
+                self.terms = info.get("terms", [])
+                self.fitted_at = info.get("fitted_at")
+
+    @property
+    def fitted(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def n_clusters(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def label(self, cluster_id: int) -> str:
+        terms = self.terms[cluster_id] if cluster_id < len(self.terms) else []
+        return ", ".join(terms[:LABEL_TERMS]) or f"Topic {cluster_id}"
+
+    def save(self):
+        """Persist centroids, sizes and labels"""
+        np.savez(self.clusters_file, centroids=self.centroids, counts=self.counts, sizes=self.sizes)
+        self.labels_file.write_text(json.dumps({"fitted_at": self.fitted_at, "terms": self.terms}))
+
+    def _seed(self, sample: np.ndarray, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+        """k-means++ seeding on a sample, using cosine distance"""
+        centroids = [sample[rng.integers(len(sample))]]
+        distances = 1 - sample @ centroids[0]
+        for _ in range(1, n_clusters):
+            weights = np.maximum(distances, 0)
+            total = weights.sum()
+            index = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+            centroids.append(sample[index])
+            distances = np.minimum(distances, 1 - sample @ sample[index])
+        return np.stack(centroids)
+
+    def _update(self, vectors: np.ndarray, labels: np.ndarray):
+        """Mini-batch update: move each centroid towards its batch members"""
+        n_clusters = len(self.centroids)
+        batch_counts = np.bincount(labels, minlength=n_clusters).astype(np.float64)
+        sums = np.zeros_like(self.centroids, dtype=np.float64)
+        np.add.at(sums, labels, vectors)
+        self.counts += batch_counts
+        active = batch_counts > 0
+        rate = (batch_counts[active] / self.counts[active])[:, None]
+        means = sums[active] / batch_counts[active][:, None]
+        self.centroids[active] = (1 - rate) * self.centroids[active] + rate * means
+        self.centroids = normalize_rows(self.centroids)
+
+    def fit(
+        self,
+        vector_source: VectorSource,
+        assign: Optional[Callable[[List, np.ndarray], None]] = None,
+        n_clusters: int = DEFAULT_CLUSTERS,
+        epochs: int = DEFAULT_EPOCHS,
+        seed: int = 0
+    ):
+        """
+        Cluster all stored vectors, streaming them in batches
+
+        Args:
+            vector_source: Callable returning a fresh iterator of (ids, vectors, payloads) batches
+            assign: Called with (ids, cluster ids) for every batch in the final pass
+            n_clusters: Number of topics
+            epochs: Passes over the data for mini-batch updates
+            seed: Random seed
+        """
+        rng = np.random.default_rng(seed)
+
+        # Seed centroids from the first batches
+        sample = []
+        sample_size = n_clusters * INIT_SAMPLE_PER_CLUSTER
+        for _, vectors, _ in vector_source():
+            sample.append(normalize_rows(vectors))
+            if sum(len(s) for s in sample) >= sample_size:
+                break
+        if not sample:
+            raise RuntimeError("No vectors to cluster")
+        sample = np.concatenate(sample)
+        n_clusters = min(n_clusters, len(sample))
+        self.centroids = self._seed(sample, n_clusters, rng)
+        self.counts = np.zeros(n_clusters, dtype=np.float64)
+
+        for _ in range(epochs):
+            for _, vectors, _ in vector_source():
+                vectors = normalize_rows(vectors)
+                self._update(vectors, np.argmax(vectors @ self.centroids.T, axis=1))
+            # Re-seed clusters that attracted nothing
+            dead = self.counts == 0
+            if dead.any():
+                self.centroids[dead] = sample[rng.integers(len(sample), size=int(dead.sum()))]
+
+        # Final pass: assign members, count sizes and label clusters from titles
+        self.sizes = np.zeros(n_clusters, dtype=np.int64)
+        all_labels, all_titles = [], []
+        for ids, vectors, payloads in vector_source():
+            labels = np.argmax(normalize_rows(vectors) @ self.centroids.T, axis=1)
+            self.sizes += np.bincount(labels, minlength=n_clusters)
+            all_labels.append(labels)
+            all_titles.extend(payload.get("title", "") for payload in payloads)
+            if assign is not None:
+                assign(ids, labels)
+
+        self.terms = class_tfidf(np.concatenate(all_labels), all_titles, n_clusters)
+        self.fitted_at = time.time()
+        self.save()
+
+    def assign(self, vectors: np.ndarray, update: bool = True) -> np.ndarray:
+        """
+        Assign vectors to their nearest topic
+
+        Args:
+            vectors: Embeddings of new conversations
+            update: Also move the centroids towards the new members
+
+        Returns:
+            Cluster id for each vector
+        """
+        vectors = normalize_rows(vectors)
+        labels = np.argmax(vectors @ self.centroids.T, axis=1)
+        if update:
+            self._update(vectors, labels)
+            self.sizes += np.bincount(labels, minlength=len(self.centroids))
+        return labels
+
+    def overview(self) -> List[Dict]:
+        """Topics ordered by size, with labels and top terms"""
+        if not self.fitted:
+            return []
+        order = np.argsort(-self.sizes)
+        return [
+            {
+                "cluster_id": int(c),
+                "label": self.label(int(c)),
+                "size": int(self.sizes[c]),
+                "terms": self.terms[c] if c < len(self.terms) else []
+            }
+            for c in order
+        ]
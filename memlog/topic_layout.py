@@ -0,0 +1,213 @@
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from memlog.topic_clusters import VectorSource, normalize_rows
+
+LAYOUT_FILE = "topic_layout.npz"
+LAYOUT_METHODS = ("pca", "random", "umap")
+GRID_BINS = 24  # Cells per axis when aggregating without topic clusters
+
+
+class TopicLayout:
+    """
+    Cached 2D projection of every stored conversation vector
+
+    The projection is linear (mean + 2 x d basis), so conversations added
+    after the layout was built are placed by a single matrix product instead
+    of recomputing the whole map. With UMAP the basis is a least-squares fit
+    to the UMAP coordinates, used only to place new points.
+    """
+
+    def __init__(self, layout_file: str = LAYOUT_FILE):
+        self.layout_file = Path(layout_file)
+        self.ids = np.array([], dtype=str)
+        self.xy = np.zeros((0, 2), dtype=np.float32)
+        self.cluster_ids = np.zeros(0, dtype=np.int32)
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.method: Optional[str] = None
+        self.built_at: Optional[float] = None
+        self._row_by_id: Optional[Dict[str, int]] = None
+        if self.layout_file.exists():
+            data = np.load(self.layout_file)
+            self.ids = data["ids"]
+            self.xy = data["xy"]
+            self.cluster_ids = data["cluster_ids"]
+            self.mean = data["mean"]
+            self.components = data["components"]
+            self.method = str(data["method"])
+            self.built_at = float(data["built_at"])
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def save(self):
+        np.savez(
+            self.layout_file,
+            ids=self.ids, xy=self.xy, cluster_ids=self.cluster_ids,
+            mean=self.mean, components=self.components,
+            method=self.method, built_at=self.built_at
+        )
+
+    def _rows(self) -> Dict[str, int]:
+        if self._row_by_id is None:
+            self._row_by_id = {pid: row for row, pid in enumerate(self.ids)}
+        return self._row_by_id
+
+    def fit(self, vector_source: VectorSource, method: str = "pca", seed: int = 0):
+        """
+        Project all stored vectors to 2D, streaming them in batches
+
+        Args:
+            vector_source: Callable returning a fresh iterator of (ids, vectors, payloads) batches
+            method: 'pca' (two passes), 'random' (one pass) or 'umap' (needs umap-learn,
+                holds all vectors in memory)
+            seed: Random seed
+        """
+        if method not in LAYOUT_METHODS:
+            raise ValueError(f"Unknown layout method: {method}")
+
+        if method == "pca":
+            # First pass: mean and scatter matrix, accumulated per batch
+            total, scatter, count = None, None, 0
+            for _, vectors, _ in vector_source():
+                vectors = normalize_rows(vectors).astype(np.float64)
+                if total is None:
+                    total = np.zeros(vectors.shape[1])
+                    scatter = np.zeros((vectors.shape[1], vectors.shape[1]))
+                total += vectors.sum(axis=0)
+                scatter += vectors.T @ vectors
+                count += len(vectors)
+            if not count:
+                raise RuntimeError("No vectors to lay out")
+            mean = total / count
+            covariance = scatter / count - np.outer(mean, mean)
+            _, eigenvectors = np.linalg.eigh(covariance)
+            self.mean = mean.astype(np.float32)
+            self.components = eigenvectors[:, ::-1][:, :2].T.astype(np.float32)
+
+        elif method == "random":
+            self.mean = self.components = None
+
+        ids, xy, clusters, kept = [], [], [], []
+        for batch_ids, vectors, payloads in vector_source():
+            vectors = normalize_rows(vectors)
+            if method == "umap":
+                kept.append(vectors)
+            else:
+                if self.components is None:
+                    rng = np.random.default_rng(seed)
+                    self.mean = np.zeros(vectors.shape[1], dtype=np.float32)
+                    self.components = normalize_rows(rng.standard_normal((2, vectors.shape[1])))
+                xy.append((vectors - self.mean) @ self.components.T)
+            ids.extend(str(pid) for pid in batch_ids)
+            clusters.extend(payload.get("cluster_id", -1) for payload in payloads)
+        if not ids:
+            raise RuntimeError("No vectors to lay out")
+
+        if method == "umap":
+            import umap  # Optional dependency (umap-learn)
+            vectors = np.concatenate(kept)
+            coords = umap.UMAP(n_components=2, metric="cosine", random_state=seed).fit_transform(vectors)
+            coords = coords - coords.mean(axis=0)
+            self.mean = vectors.mean(axis=0)
+            # Linear map used to place conversations added after this build
+            basis, *_ = np.linalg.lstsq(vectors - self.mean, coords, rcond=None)
+            self.components = basis.T.astype(np.float32)
+            self.mean = self.mean.astype(np.float32)
+            xy = [coords]
+
+        self.ids = np.array(ids)
+        self.xy = np.concatenate(xy).astype(np.float32)
+        self.cluster_ids = np.array(clusters, dtype=np.int32)
+        self.method = method
+        self.built_at = time.time()
+        self._row_by_id = None
+        self.save()
+
+    def add_points(self, ids: List, vectors: np.ndarray, cluster_ids: Optional[List[int]] = None):
+        """Place new (or re-embedded) conversations on the existing layout"""
+        coords = (normalize_rows(vectors) - self.mean) @ self.components.T
+        clusters = cluster_ids if cluster_ids is not None else [-1] * len(ids)
+        rows = self._rows()
+        new_ids, new_xy, new_clusters = [], [], []
+        for pid, point, cluster in zip(ids, coords, clusters):
+            row = rows.get(str(pid))
+            if row is None:
+                new_ids.append(str(pid))
+                new_xy.append(point)
+                new_clusters.append(cluster)
+            else:
+                self.xy[row] = point
+                self.cluster_ids[row] = cluster
+        if new_ids:
+            for pid in new_ids:
+                rows[pid] = len(rows)
+            self.ids = np.concatenate([self.ids, np.array(new_ids)])
+            self.xy = np.concatenate([self.xy, np.asarray(new_xy, dtype=np.float32)])
+            self.cluster_ids = np.concatenate([self.cluster_ids, np.array(new_clusters, dtype=np.int32)])
+
+    def set_clusters(self, ids: List, cluster_ids: np.ndarray):
+        """Update topic assignments after reclustering"""
+        rows = self._rows()
+        for pid, cluster in zip(ids, cluster_ids):
+            row = rows.get(str(pid))
+            if row is not None:
+                self.cluster_ids[row] = cluster
+
+    def bounds(self) -> np.ndarray:
+        """[[min_x, min_y], [max_x, max_y]] of the whole map"""
+        if not len(self.xy):
+            return np.zeros((2, 2), dtype=np.float32)
+        return np.stack([self.xy.min(axis=0), self.xy.max(axis=0)])
+
+    def viewport(self, x_range: tuple, y_range: tuple) -> np.ndarray:
+        """Row indices of the points inside a rectangle"""
+        mask = (
+            (self.xy[:, 0] >= x_range[0]) & (self.xy[:, 0] <= x_range[1]) &
+            (self.xy[:, 1] >= y_range[0]) & (self.xy[:, 1] <= y_range[1])
+        )
+        return np.flatnonzero(mask)
+
+    def aggregate(self, rows: np.ndarray) -> List[Dict]:
+        """
+        Group points into bubbles for zoomed-out views
+
+        Points are grouped by topic cluster when clusters exist, otherwise by
+        grid cell. Each bubble is placed at the mean position of its members.
+
+        Returns:
+            List of dictionaries with key, x, y, count and the member cluster id (or -1)
+        """
+        if not len(rows):
+            return []
+        xy = self.xy[rows]
+        clusters = self.cluster_ids[rows]
+        if (clusters >= 0).any():
+            keys = np.where(clusters >= 0, clusters, clusters.max() + 1)
+        else:
+            low, high = xy.min(axis=0), xy.max(axis=0)
+            cells = np.floor((xy - low) / np.maximum(high - low, 1e-9) * (GRID_BINS - 1)).astype(np.int64)
+            keys = cells[:, 0] * GRID_BINS + cells[:, 1]
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        x = np.bincount(inverse, weights=xy[:, 0]) / counts
+        y = np.bincount(inverse, weights=xy[:, 1]) / counts
+        first = np.zeros(len(unique), dtype=np.int64)
+        first[inverse[::-1]] = np.arange(len(inverse))[::-1]
+        return [
+            {
+                "key": int(unique[i]),
+                "x": float(x[i]),
+                "y": float(y[i]),
+                "count": int(counts[i]),
+                "cluster_id": int(clusters[first[i]])
+            }
+            for i in range(len(unique))
+        ]
@@ -0,0 +1,133 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from memlog.conversation_format import (
+    conversation_model, conversation_text, detect_format, estimate_tokens, iter_messages, to_timestamp
+)
+
+ROLLUPS_FILE = "usage_rollups.json"
+UNKNOWN = "unknown"
+
+
+def _empty_bucket() -> Dict:
+    return {
+        "conversations": 0,
+        "messages": 0,
+        "user_messages": 0,
+        "tokens": 0,
+        "sources": {},
+        "models": {},
+    }
+
+
+class UsageRollups:
+    """
+    Daily usage counters maintained at ingest time
+
+    Each day bucket holds conversation, message and token totals plus
+    conversation counts per source and model, so dashboard queries cost
+    O(days) regardless of archive size.
+    """
+
+    def __init__(self, rollups_file: str = ROLLUPS_FILE):
+        self.rollups_file = Path(rollups_file)
+        self.days: Dict[str, Dict] = {}
+        self.updated_at: Optional[float] = None
+        if self.rollups_file.exists():
+            data = json.loads(self.rollups_file.read_text())
+            self.days = data.get("days", {})
+            self.updated_at = data.get("updated_at")
+
+    @staticmethod
+    def day_of(conversation: dict) -> str:
+        """UTC day (YYYY-MM-DD) a conversation was created, or 'unknown'"""
+        timestamp = to_timestamp(conversation.get("create_time"))
+        if timestamp is None:
+            return UNKNOWN
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    def add(self, conversations: Iterable[dict], texts: Optional[List[str]] = None):
+        """
+        Count new conversations into their day buckets
+
+        Args:
+            conversations: Conversation dictionaries (each counted once, so only pass new ones)
+            texts: Searchable text of each conversation, if already extracted
+        """
+        for i, conv in enumerate(conversations):
+            messages = list(iter_messages(conv))
+            text = texts[i] if texts is not None else conversation_text(conv)
+            bucket = self.days.setdefault(self.day_of(conv), _empty_bucket())
+            bucket["conversations"] += 1
+            bucket["messages"] += len(messages)
+            bucket["user_messages"] += sum(1 for message in messages if message["role"] in ("user", "human"))
+            bucket["tokens"] += estimate_tokens(text)
+            source = conv.get("source") or conv.get("format") or detect_format(conv)
+            model = conversation_model(conv) or UNKNOWN
+            bucket["sources"][source] = bucket["sources"].get(source, 0) + 1
+            bucket["models"][model] = bucket["models"].get(model, 0) + 1
+
+    def rebuild(self, conversation_batches: Iterable[List[dict]]):
+        """Recompute every bucket from scratch, e.g. from the conversation cache"""
+        self.days = {}
+        for batch in conversation_batches:
+            self.add(batch)
+        self.save()
+
+    def save(self):
+        self.updated_at = datetime.now().timestamp()
+        tmp_file = self.rollups_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps({"updated_at": self.updated_at, "days": self.days}))
+        os.replace(tmp_file, self.rollups_file)
+
+    def daily(self, start_day: Optional[str] = None, end_day: Optional[str] = None) -> List[Dict]:
+        """
+        Day buckets in date order (the 'unknown' bucket is left out)
+
+        Args:
+            start_day: First day to include (YYYY-MM-DD)
+            end_day: Last day to include (YYYY-MM-DD)
+
+        Returns:
+            List of dictionaries with day, conversations, messages, user_messages and tokens
+        """
+        return [
+            {
+                "day": day,
+                "conversations": bucket["conversations"],
+                "messages": bucket["messages"],
+                "user_messages": bucket["user_messages"],
+                "tokens": bucket["tokens"],
+            }
+            for day, bucket in sorted(self.days.items())
+            if day != UNKNOWN
+            and (start_day is None or day >= start_day)
+            and (end_day is None or day <= end_day)
+        ]
+
+    def breakdown(self, dimension: str, start_day: Optional[str] = None, end_day: Optional[str] = None) -> Dict[str, int]:
+        """
+        Conversation counts per source or model over a date range
+
+        Args:
+            dimension: 'sources' or 'models'
+            start_day: First day to include (YYYY-MM-DD)
+            end_day: Last day to include (YYYY-MM-DD)
+        """
+        totals: Dict[str, int] = {}
+        for day, bucket in self.days.items():
+            if start_day is not None and (day == UNKNOWN or day < start_day):
+                continue
+            if end_day is not None and (day == UNKNOWN or day > end_day):
+                continue
+            for key, count in bucket[dimension].items():
+                totals[key] = totals.get(key, 0) + count
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def totals(self) -> Dict[str, int]:
+        """Archive-wide conversation, message and token totals"""
+        keys = ("conversations", "messages", "user_messages", "tokens")
+        return {key: sum(bucket[key] for bucket in self.days.values()) for key in keys}
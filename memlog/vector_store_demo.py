@@ -2,11 +2,17 @@ import json
 from pathlib import Path
 from typing import Generator, Dict, Union
 from datetime import datetime, timedelta
-from conversation_vector_store import ConversationVectorStore
+from memlog.conversation_cache import CACHE_DIR, ensure_conversation_cache
+from memlog.conversation_vector_store import ConversationVectorStore
+from memlog.export_index import JSONL_SUFFIXES
 
 def load_conversation_chunks(chunks_dir: str, batch_size: int = 100) -> Generator[list, None, None]:
     """
-    Load conversations from chunked JSON files using a generator to reduce memory usage
+    Load conversations from chunked exports through the columnar conversation cache
+    
+    The chunks of a directory get their own cache next to the shared one,
+    rebuilt only when the chunk files change, so the demo reads the same
+    normalized conversations as load_conversations.py.
     
     Args:
         chunks_dir: Directory containing conversation chunks
@@ -21,30 +27,19 @@ def load_conversation_chunks(chunks_dir: str, batch_size: int = 100) -> Generato
         print(f"Directory not found: {chunks_dir}")
         return
     
-    current_batch = []
-    
-    for chunk_file in chunks_path.glob("chunk_*.json"):
-        try:
-            with open(chunk_file, 'r', encoding='utf-8') as f:
-                chunk_data = json.load(f)
-                
-                # Handle both list and dict formats
-                conversations = chunk_data if isinstance(chunk_data, list) else [chunk_data]
-                
-                for conv in conversations:
-                    current_batch.append(conv)
-                    
-                    if len(current_batch) >= batch_size:
-                        yield current_batch
-                        current_batch = []
-                        
-        except Exception as e:
-            print(f"Error loading {chunk_file}: {e}")
-            continue
+    chunk_files = sorted(
+        str(path) for path in chunks_path.glob("chunk_*")
+        if path.suffix == ".json" or path.name.endswith(JSONL_SUFFIXES)
+    )
+    if not chunk_files:
+        print(f"No conversation chunks found in {chunks_dir}")
+        return
     
-    # Yield any remaining conversations
-    if current_batch:
-        yield current_batch
+    cache = ensure_conversation_cache(
+        {chunks_path.name: chunk_files},
+        str(Path(CACHE_DIR) / f"demo_{chunks_path.name}")
+    )
+    yield from cache.iter_conversations(batch_size)
 
 def process_source_conversations(vector_store: ConversationVectorStore, source_dir: str, source_name: str):
     """
@@ -1,7 +1,8 @@
 import streamlit as st
+import numpy as np
 import networkx as nx
 from streamlit_agraph import agraph, Node, Edge, Config
-from memlog.shared_vector_store import get_shared_vector_store
+from memlog.shared_vector_store import SEARCH_DEADLINE_SECONDS, get_shared_vector_store
 
 # Page configuration
 st.set_page_config(
@@ -42,8 +43,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def create_knowledge_graph(conversations, min_similarity=0.3, vector_store=None):
-    """Create knowledge graph from conversations using vector similarity."""
+def create_knowledge_graph(conversations, min_similarity=0.3, vector_store=None, title_weight=0.0):
+    """Create knowledge graph from conversations using their stored vectors (no embedding calls)."""
     nodes = []
     edges = []
     
@@ -66,16 +67,15 @@ def create_knowledge_graph(conversations, min_similarity=0.3, vector_store=None)
     if len(nodes) >= 2 and vector_store:
         with st.spinner("Generating conversation connections..."):
             processed_pairs = set()
+            related = vector_store.related_conversations(
+                [node.id for node in nodes],
+                limit=5,
+                score_threshold=min_similarity,
+                title_weight=title_weight
+            )
             
             for node1 in nodes:
-                # Get similar conversations for the current node
-                results = vector_store.search(
-                    node1.title,
-                    limit=5,
-                    score_threshold=min_similarity
-                )
-                
-                for result in results:
+                for result in related.get(node1.id, []):
                     # Skip self-connections
                     if str(result['id']) == node1.id:
                         continue
@@ -92,6 +92,125 @@ def create_knowledge_graph(conversations, min_similarity=0.3, vector_store=None)
     
     return nodes, edges
 
+MAX_DETAIL_NODES = 300  # Above this, the visible area is aggregated into bubbles
+MAP_SIZE = 1000  # Canvas coordinate range for the archive map
+MAX_ZOOM = 8
+CLUSTER_COLORS = [
+    "#4CAF50", "#2196F3", "#FF9800", "#E91E63", "#9C27B0", "#00BCD4",
+    "#CDDC39", "#FF5722", "#3F51B5", "#8BC34A", "#FFC107", "#607D8B"
+]
+
+def cluster_color(cluster_id):
+    return "#757575" if cluster_id < 0 else CLUSTER_COLORS[cluster_id % len(CLUSTER_COLORS)]
+
+def render_archive_map(vector_store):
+    """Whole-archive map from the precomputed 2D layout, with level of detail"""
+    layout = vector_store.topic_layout
+    if not layout.fitted or not len(layout):
+        st.info(
+            "The archive map has not been built yet. "
+            "Run `python load_conversations.py --layout pca` to compute it."
+        )
+        return
+
+    bounds = layout.bounds()
+    span = np.maximum(bounds[1] - bounds[0], 1e-9)
+    if 'map_center' not in st.session_state:
+        st.session_state.map_center = tuple((bounds[0] + bounds[1]) / 2)
+        st.session_state.map_zoom = 1
+        st.session_state.map_last_selected = None
+
+    with st.sidebar:
+        st.markdown("### Map View")
+        st.session_state.map_zoom = st.slider("Zoom", 1, MAX_ZOOM, st.session_state.map_zoom)
+        if st.button("Reset view", use_container_width=True):
+            st.session_state.map_center = tuple((bounds[0] + bounds[1]) / 2)
+            st.session_state.map_zoom = 1
+            st.rerun()
+
+    # Visible rectangle for the current center and zoom
+    center = np.array(st.session_state.map_center)
+    half = span / 2 / (2 ** (st.session_state.map_zoom - 1))
+    low, high = center - half, center + half
+    rows = layout.viewport((low[0], high[0]), (low[1], high[1]))
+
+    def to_canvas(x, y):
+        return (
+            float((x - low[0]) / (2 * half[0]) * MAP_SIZE),
+            float((high[1] - y) / (2 * half[1]) * MAP_SIZE)
+        )
+
+    nodes = []
+    bubble_centers = {}
+    if len(rows) > MAX_DETAIL_NODES:
+        st.caption(f"{len(rows):,} conversations in view, grouped by topic. Click a bubble to zoom in.")
+        for bubble in layout.aggregate(rows):
+            node_id = f"bubble:{bubble['key']}"
+            bubble_centers[node_id] = (bubble['x'], bubble['y'])
+            label = (
+                vector_store.topic_clusters.label(bubble['cluster_id'])
+                if bubble['cluster_id'] >= 0 and vector_store.topic_clusters.fitted
+                else "Conversations"
+            )
+            x, y = to_canvas(bubble['x'], bubble['y'])
+            nodes.append(Node(
+                id=node_id,
+                label=f"{label} ({bubble['count']:,})",
+                title=label,
+                size=int(15 + 10 * np.log1p(bubble['count'])),
+                color=cluster_color(bubble['cluster_id']),
+                x=x, y=y
+            ))
+    else:
+        st.caption(f"{len(rows):,} conversations in view. Click one to see details.")
+        points = vector_store.get_points(layout.ids[rows].tolist())
+        position = {str(layout.ids[row]): row for row in rows}
+        for point in points:
+            row = position.get(point['point_id'])
+            if row is None:
+                continue
+            title = point.get('title', 'Untitled')
+            x, y = to_canvas(*layout.xy[row])
+            nodes.append(Node(
+                id=point['point_id'],
+                label=title[:30] + "..." if len(title) > 30 else title,
+                title=title,
+                size=15,
+                color=cluster_color(int(layout.cluster_ids[row])),
+                x=x, y=y
+            ))
+
+    if not nodes:
+        st.info("No conversations in this part of the map. Try zooming out.")
+        return
+
+    config = Config(
+        width=1000,
+        height=700,
+        directed=False,
+        physics=False,
+        nodes={'font': {'size': 14, 'color': '#ffffff'}},
+        interaction={'hover': True, 'dragNodes': False, 'dragView': True, 'zoomView': True}
+    )
+    selected_node = agraph(nodes=nodes, edges=[], config=config)
+
+    if selected_node and selected_node != st.session_state.map_last_selected:
+        st.session_state.map_last_selected = selected_node
+        if selected_node in bubble_centers:
+            st.session_state.map_center = bubble_centers[selected_node]
+            st.session_state.map_zoom = min(MAX_ZOOM, st.session_state.map_zoom + 2)
+            st.rerun()
+        point = next(iter(vector_store.get_points([selected_node], ["id", "title", "create_time", "text"])), None)
+        if point:
+            st.sidebar.markdown(
+                f"""<div class="conversation-card">
+                    <h3>{point.get('title', 'Untitled')}</h3>
+                    <p>Created: {point.get('create_time')}</p>
+                    <div class="message-content">{point.get('text', '')[:500]}...</div>
+                </div>""",
+                unsafe_allow_html=True
+            )
+
 # Main app
 st.title('🕸️ Topic Map')
 st.markdown("""
@@ -102,7 +221,39 @@ The connections between conversations are determined by semantic similarity.
 # Initialize vector store
 vector_store = get_shared_vector_store()
 
+# Topic overview comes from precomputed clusters, not per-page searches
+topics = vector_store.get_topic_overview() if vector_store else []
+if topics:
+    with st.expander(f"📚 Topic Overview ({len(topics)} topics)"):
+        st.dataframe(
+            [
+                {
+                    "Topic": topic["label"],
+                    "Conversations": topic["size"],
+                    "Top Terms": ", ".join(topic["terms"])
+                }
+                for topic in topics
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
 # Sidebar controls
+with st.sidebar:
+    map_mode = st.radio(
+        "View",
+        ["Archive Map", "Search Graph"],
+        help="Archive Map shows every conversation from the precomputed layout; "
+             "Search Graph connects a small set of search results"
+    )
+
+if map_mode == "Archive Map":
+    if vector_store is None:
+        st.error("❌ Vector store initialization failed. Please check if Ollama is running.")
+    else:
+        render_archive_map(vector_store)
+    st.stop()
+
 with st.sidebar:
     st.markdown("### Graph Settings")
     
@@ -129,6 +280,20 @@ with st.sidebar:
         "High": 0.4
     }[similarity]
     
+    # Title vectors allow connecting conversations by their titles
+    title_weight = 0.0
+    if vector_store is not None and vector_store.title_vectors:
+        title_weight = {
+            "Content": 0.0,
+            "Title + content": 0.5,
+            "Title": 1.0
+        }[st.select_slider(
+            "Connect by",
+            options=["Content", "Title + content", "Title"],
+            value="Title",
+            help="Compare conversations by their titles, their content or both"
+        )]
+    
     # Topic filter
     topic_filter = st.text_input(
         "Filter by Topic",
@@ -144,9 +309,13 @@ try:
         with st.spinner("Loading conversations..."):
             # Get conversations from vector store
             if topic_filter:
-                results = vector_store.search(topic_filter, limit=items_per_page)
+                results = vector_store.search(topic_filter, limit=items_per_page, deadline=SEARCH_DEADLINE_SECONDS)
             else:
-                results = vector_store.search("", limit=items_per_page, score_threshold=0.0)
+                results = vector_store.search(
+                    "", limit=items_per_page, score_threshold=0.0, deadline=SEARCH_DEADLINE_SECONDS
+                )
+            if results.degraded:
+                st.info("⏱️ Partial results: " + "; ".join(results.degraded_stages.values()))
             
             conversations = [
                 {
@@ -159,7 +328,7 @@ try:
             ]
         
         if conversations:
-            nodes, edges = create_knowledge_graph(conversations, similarity_threshold, vector_store)
+            nodes, edges = create_knowledge_graph(conversations, similarity_threshold, vector_store, title_weight)
             
             if nodes and edges:
                 # Graph configuration
@@ -220,11 +389,12 @@ try:
                         
                         # Show similar conversations
                         st.sidebar.markdown("### Related Conversations")
-                        similar = vector_store.search(
-                            selected_conv['text'],
+                        similar = vector_store.related_conversations(
+                            [selected_node],
                             limit=3,
-                            score_threshold=similarity_threshold
-                        )
+                            score_threshold=similarity_threshold,
+                            title_weight=title_weight
+                        ).get(selected_node, [])
                         for r in similar:
                             if str(r['id']) != selected_node:
                                 st.sidebar.markdown(
@@ -0,0 +1,91 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from memlog.usage_analytics import UsageRollups
+
+# Page configuration
+st.set_page_config(
+    page_title="MindSpring - Usage Statistics",
+    page_icon="🧠",
+    layout="wide"
+)
+
+# Custom CSS
+st.markdown("""
+<style>
+    .main > div { padding-top: 0; }
+    .stApp {
+        background-color: #1a1a1a;
+        color: #e0e0e0;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+@st.cache_data(ttl=60)
+def load_rollups():
+    """Daily rollups as a frame plus the raw buckets; reads one small JSON file"""
+    rollups = UsageRollups()
+    daily = pd.DataFrame(rollups.daily())
+    if not daily.empty:
+        daily['day'] = pd.to_datetime(daily['day'])
+        daily = daily.set_index('day')
+    return rollups, daily
+
+st.title('📊 Usage Statistics')
+
+rollups, daily = load_rollups()
+
+if daily.empty:
+    st.info("No usage statistics yet. They are collected while conversations are loaded "
+            "(run `python load_conversations.py --rebuild-rollups` to compute them for an existing archive).")
+    st.stop()
+
+# Sidebar controls
+with st.sidebar:
+    st.markdown("### Period")
+    first_day, last_day = daily.index.min().date(), daily.index.max().date()
+    date_range = st.date_input(
+        "Date range",
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day
+    )
+    granularity = st.radio("Group by", ["Day", "Week", "Month"], index=2, horizontal=True)
+    if rollups.updated_at:
+        st.caption(f"Updated {datetime.fromtimestamp(rollups.updated_at).strftime('%Y-%m-%d %H:%M')}")
+
+start_day, end_day = (date_range if len(date_range) == 2 else (date_range[0], last_day))
+period = daily.loc[str(start_day):str(end_day)]
+start_key, end_key = start_day.strftime("%Y-%m-%d"), end_day.strftime("%Y-%m-%d")
+
+# Headline numbers
+cols = st.columns(4)
+cols[0].metric("Conversations", f"{int(period['conversations'].sum()):,}")
+cols[1].metric("Messages", f"{int(period['messages'].sum()):,}")
+cols[2].metric("Estimated tokens", f"{int(period['tokens'].sum()):,}")
+active_days = int((period['conversations'] > 0).sum())
+cols[3].metric("Conversations per active day", f"{period['conversations'].sum() / max(active_days, 1):.1f}")
+
+# Activity over time
+rule = {"Day": "D", "Week": "W", "Month": "MS"}[granularity]
+resampled = period.resample(rule).sum()
+st.markdown("### Activity")
+st.bar_chart(resampled[['conversations']])
+st.line_chart(resampled[['messages', 'user_messages']])
+st.markdown("### Estimated tokens")
+st.area_chart(resampled[['tokens']])
+
+# Source and model splits
+left, right = st.columns(2)
+with left:
+    st.markdown("### By source")
+    sources = rollups.breakdown("sources", start_key, end_key)
+    st.bar_chart(pd.Series(sources, name="conversations"))
+with right:
+    st.markdown("### By model")
+    models = rollups.breakdown("models", start_key, end_key)
+    st.dataframe(
+        pd.DataFrame({"model": list(models), "conversations": list(models.values())}),
+        use_container_width=True,
+        hide_index=True
+    )
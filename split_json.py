@@ -1,8 +1,12 @@
+import gzip
 import json
 import os
 import math
 from typing import Optional
 
+from memlog.export_index import ExportIndex, INDEX_FILE, iter_records
+from memlog.conversation_format import conversation_id
+
 # Align chunk size with vector store batch size for efficiency
 ITEMS_PER_CHUNK = 100  # Matches ConversationVectorStore batch size
 LARGE_FILE_THRESHOLD = 5 * 1024 * 1024  # 5MB threshold for splitting files
@@ -61,6 +65,64 @@ def split_large_json(file_path: str) -> Optional[str]:
 
     return chunk_dir
 
+def split_large_jsonl(file_path: str, compress: bool = False, index_file: str = INDEX_FILE) -> Optional[str]:
+    """
+    Stream a large JSON export into compact JSONL chunks and index them
+
+    Unlike split_large_json this never loads the whole export, writes one
+    conversation per line without indentation, and records each
+    conversation's byte offset so it can be read back on its own.
+
+    Args:
+        file_path: Path to the JSON file to split
+        compress: Gzip the chunk files
+        index_file: Export index to record chunk offsets in
+
+    Returns:
+        Path to the chunks directory or None if splitting failed
+    """
+    print(f"Streaming {file_path}...")
+    chunk_dir = f"{file_path.split('.')[0]}_chunks"
+    os.makedirs(chunk_dir, exist_ok=True)
+    suffix = ".jsonl.gz" if compress else ".jsonl"
+
+    entries = []
+    chunk = None
+    chunk_file = None
+    offset = 0
+    total_items = 0
+    try:
+        for _, _, item in iter_records(file_path):
+            if total_items % ITEMS_PER_CHUNK == 0:
+                if chunk:
+                    chunk.close()
+                    print(f"Saved {chunk_file}")
+                chunk_file = os.path.join(chunk_dir, f"chunk_{total_items // ITEMS_PER_CHUNK + 1}{suffix}")
+                chunk = gzip.open(chunk_file, 'wb') if compress else open(chunk_file, 'wb')
+                offset = 0
+
+            line = (json.dumps(item, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+            chunk.write(line)
+            if isinstance(item, dict):
+                entries.append((conversation_id(item), chunk_file, offset, len(line)))
+            offset += len(line)
+            total_items += 1
+    except FileNotFoundError:
+        print(f"Error: File {file_path} not found.")
+        return None
+    except ValueError:
+        print(f"Error: Invalid JSON in {file_path}")
+        return None
+    finally:
+        if chunk:
+            chunk.close()
+
+    index = ExportIndex(index_file)
+    index.add_entries(entries)
+    index.save()
+    print(f"Split {total_items} items into {math.ceil(total_items / ITEMS_PER_CHUNK)} chunks in {chunk_dir}")
+    return chunk_dir
+
 def should_split_file(file_path: str) -> bool:
     """
     Check if a file should be split based on size threshold
@@ -79,8 +141,12 @@ def should_split_file(file_path: str) -> bool:
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1:
-        FILE_TO_SPLIT = sys.argv[1]
-        split_large_json(FILE_TO_SPLIT)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if args:
+        FILE_TO_SPLIT = args[0]
+        if "--jsonl" in sys.argv:
+            split_large_jsonl(FILE_TO_SPLIT, compress="--compress" in sys.argv)
+        else:
+            split_large_json(FILE_TO_SPLIT)
     else:
-        print("Usage: python split_json.py <filename>")
+        print("Usage: python split_json.py <filename> [--jsonl [--compress]]")
@@ -0,0 +1,72 @@
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from qdrant_client.http import models
+
+from memlog.conversation_vector_store import ConversationVectorStore
+from memlog.ollama_stub import make_handler, stub_embedding
+
+DIMENSION = 32
+
+
+@pytest.fixture
+def ollama_url():
+    """Stub Ollama server answering embedding requests right away"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(DIMENSION, 0.0, 0.0, 0.0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api/embed"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def open_store(tmp_path, monkeypatch, ollama_url):
+    """Open ConversationVectorStore instances in tmp_path; the ledger and logs go there too"""
+    monkeypatch.chdir(tmp_path)
+    opened = []
+
+    def open_store(**kwargs):
+        if opened:
+            close_store(opened.pop())
+        store = ConversationVectorStore(
+            qdrant_path=str(tmp_path / "db"), dimension=DIMENSION, ollama_url=ollama_url, **kwargs
+        )
+        opened.append(store)
+        return store
+
+    yield open_store
+    for store in opened:
+        close_store(store)
+
+
+def close_store(store):
+    store.client.close()
+    store._release_lock()
+    ConversationVectorStore._instance = None
+
+
+def conversation(index: int, topic: str) -> dict:
+    return {
+        "id": f"c{index}",
+        "title": f"{topic} question",
+        "create_time": 1600000000 + index * 86400,
+        "messages": [
+            {"role": "user", "content": f"tell me about {topic}"},
+            {"role": "assistant", "content": f"here is how {topic} works"}
+        ]
+    }
+
+
+def write_legacy_points(client, collection_name: str, conversations: list):
+    """Store conversations the way the original loader did: MD5 hex ids, unnamed vectors"""
+    client.upsert(collection_name=collection_name, points=[
+        models.PointStruct(
+            id=hashlib.md5(str(conv["id"]).encode()).hexdigest(),
+            vector=stub_embedding(conv["title"], DIMENSION),
+            payload={"id": conv["id"], "title": conv["title"], "text": conv["title"], "create_time": conv["create_time"]}
+        )
+        for conv in conversations
+    ])
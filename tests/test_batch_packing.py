@@ -0,0 +1,53 @@
+import numpy as np
+
+from memlog.batch_packing import DEFAULT_MAX_ITEM_TOKENS, embed_packed, plan_requests
+from memlog.conversation_format import estimate_tokens
+
+
+def words(count: int, word: str = "word") -> str:
+    return " ".join([word] * count)
+
+
+def test_texts_longer_than_the_model_context_are_split():
+    # 3000 tokens fits the request budget easily, but not the model's context
+    text = words(2400)
+    pieces, owners, batches = plan_requests([text, "short"], token_budget=16_384, max_item_tokens=512)
+    assert len(pieces) == 7
+    assert all(estimate_tokens(piece) <= 512 for piece in pieces)
+    assert "".join(pieces[:-1]) == text and pieces[-1] == "short"
+    assert owners == [0] * 6 + [1]
+    assert batches == [[6, 5, 0, 1, 2, 3, 4]]
+
+
+def test_request_budget_packs_pieces_into_several_requests():
+    pieces, owners, batches = plan_requests([words(800)] * 3, token_budget=1024, max_item_tokens=512)
+    assert all(estimate_tokens(piece) <= 512 for piece in pieces)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(pieces)))
+    assert all(sum(estimate_tokens(pieces[i]) for i in batch) <= 1024 for batch in batches)
+    assert len(batches) > 1
+
+
+def test_smaller_request_budget_also_limits_pieces():
+    pieces, _, _ = plan_requests([words(800)], token_budget=256, max_item_tokens=DEFAULT_MAX_ITEM_TOKENS)
+    assert len(pieces) > 1 and all(estimate_tokens(piece) <= 256 for piece in pieces)
+
+
+def test_split_text_is_embedded_as_the_normalized_mean_of_its_pieces():
+    requests = []
+
+    def embed(texts):
+        requests.append(texts)
+        return np.array([[1.0, 0.0] if text.startswith("alpha") else [0.0, 1.0] for text in texts])
+
+    texts = [words(512, "alpha") + " " + words(512, "beta"), "alpha"]
+    vectors = embed_packed(texts, embed, max_item_tokens=512)
+    assert all(estimate_tokens(text) <= 512 for request in requests for text in request)
+    assert np.allclose(vectors[1], [1.0, 0.0])
+
+    pieces, owners, _ = plan_requests(texts, max_item_tokens=512)
+    weights = {"alpha": 0, "beta": 0}
+    for piece, owner in zip(pieces, owners):
+        if owner == 0:
+            weights["alpha" if piece.startswith("alpha") else "beta"] += estimate_tokens(piece)
+    expected = np.array([weights["alpha"], weights["beta"]], dtype=np.float32)
+    assert np.allclose(vectors[0], expected / np.linalg.norm(expected))
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pytest
+import requests
+
+from conftest import DIMENSION, conversation
+from memlog.conversation_cache import ensure_conversation_cache
+from memlog.ingest_queue import ShardQueue, _staging_file, enqueue_cache, run_coordinator
+from memlog.ollama_stub import stub_embedding
+
+TOPICS = ["python", "cooking", "travel", "gardening"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([conversation(i, topic) for i, topic in enumerate(TOPICS)]))
+    return ensure_conversation_cache({"claude": [str(export)]}, str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ShardQueue(str(tmp_path / "queue.db"))
+    yield queue
+    queue.close()
+
+
+def stage(queue, store, cache, staging_dir, ids=None):
+    """Claim the next shard and stage vectors for it like a worker would"""
+    shard = queue.claim("test-worker")
+    all_ids = cache.conversations.column("conversation_id").to_pylist()[shard["start_row"]:shard["stop_row"]]
+    titles = dict(zip(all_ids, cache.conversations.column("title").to_pylist()[shard["start_row"]:shard["stop_row"]]))
+    ids = all_ids if ids is None else ids
+    staging_dir.mkdir(exist_ok=True)
+    np.savez(
+        _staging_file(str(staging_dir), shard["id"]),
+        ids=np.array(ids),
+        embeddings=np.array([stub_embedding(titles[conv_id], DIMENSION) for conv_id in ids], dtype=np.float32),
+        model=np.array(store.model_name)
+    )
+    assert queue.mark_embedded(shard["id"], "test-worker")
+    return shard
+
+
+def statuses(queue):
+    return [row["status"] for row in queue.conn.execute("SELECT status FROM shards ORDER BY id")]
+
+
+def test_enqueue_keeps_state_and_requeues_done_shards(queue):
+    assert queue.enqueue([(0, 2), (2, 4)], "v1") == 2
+    shard = queue.claim("test-worker")
+    assert queue.enqueue([(0, 2), (2, 4)], "v1") == 0
+    assert statuses(queue) == ["leased", "pending"]
+
+    queue.mark_done(shard["id"])
+    assert queue.enqueue([(2, 4)], "v1") == 0
+    assert statuses(queue) == ["done", "pending"]
+    # Asked for again: some of its conversations are still missing
+    assert queue.enqueue([(0, 2)], "v1") == 1
+    assert statuses(queue) == ["pending", "pending"]
+    assert queue.claim("test-worker")["attempts"] == 1
+
+
+def test_shard_with_a_skipped_batch_is_not_done(open_store, cache, queue, tmp_path, monkeypatch):
+    store = open_store()
+    staging_dir = tmp_path / "staging"
+    assert enqueue_cache(store, cache, queue, str(tmp_path / "cache"), shard_size=2) == 2
+
+    def unreachable(texts):
+        raise requests.exceptions.ConnectionError("Ollama is down")
+
+    # A vector missing from the staged shard has to be embedded; that fails and
+    # process_conversations skips the batch, the whole shard here
+    monkeypatch.setattr(store, "_embed_texts", unreachable)
+    stage(queue, store, cache, staging_dir, ids=["c0"])
+    stage(queue, store, cache, staging_dir)
+    assert run_coordinator(store, cache, queue, str(staging_dir), workers=[]) == 2
+    assert statuses(queue) == ["pending", "done"]
+    error = queue.conn.execute("SELECT error FROM shards WHERE id = 1").fetchone()["error"]
+    assert error == "upsert: 2 of 2 conversations were not stored"
+    assert store.processed_ids == {"c2", "c3"}
+
+    stage(queue, store, cache, staging_dir)
+    assert run_coordinator(store, cache, queue, str(staging_dir), workers=[]) == 2
+    assert statuses(queue) == ["done", "done"]
+    assert store.processed_ids == {"c0", "c1", "c2", "c3"}
+
+
+def test_enqueue_cache_requeues_done_shard_missing_from_store(open_store, cache, queue, tmp_path):
+    store = open_store()
+    staging_dir = tmp_path / "staging"
+    enqueue_cache(store, cache, queue, str(tmp_path / "cache"), shard_size=2)
+    for _ in range(2):
+        stage(queue, store, cache, staging_dir)
+    run_coordinator(store, cache, queue, str(staging_dir), workers=[])
+    assert statuses(queue) == ["done", "done"]
+
+    # A shard recorded as done by an earlier run whose conversations never reached the store
+    store.processed_ids.difference_update({"c2"})
+    assert enqueue_cache(store, cache, queue, str(tmp_path / "cache"), shard_size=2) == 1
+    assert statuses(queue) == ["done", "pending"]
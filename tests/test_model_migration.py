@@ -0,0 +1,58 @@
+import threading
+
+from conftest import conversation, write_legacy_points
+
+TOPICS = ["python", "cooking", "travel", "gardening", "chess", "astronomy"]
+
+
+class LockCheckingClient:
+    """Passes calls through to the Qdrant client, noting those made without client_lock"""
+
+    def __init__(self, client, lock):
+        self.client = client
+        self.lock = lock
+        self.unlocked = []
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            if not self.lock._is_owned():
+                self.unlocked.append((threading.current_thread(), name))
+            return attribute(*args, **kwargs)
+        return call
+
+
+def test_migration_holds_the_client_lock_for_every_call(open_store):
+    store = open_store()
+    conversations = [conversation(i, topic) for i, topic in enumerate(TOPICS)]
+    write_legacy_points(store.client, store.collection_name, conversations)
+    store.processed_ids.update(conv["id"] for conv in conversations)
+
+    store.client = LockCheckingClient(store.client, store.client_lock)
+    stop = threading.Event()
+    searches = []
+
+    def search_meanwhile():
+        while not stop.is_set():
+            searches.append(len(store.search("python question", limit=3, score_threshold=0.0)))
+
+    searcher = threading.Thread(target=search_meanwhile)
+    searcher.start()
+    checking = store.client
+    try:
+        status = store.migrate_model(
+            "other-embed", store.dimension, batch_size=2, max_texts_per_second=None, max_recall_drop=1.0
+        )
+    finally:
+        stop.set()
+        searcher.join()
+        store.client = checking.client
+
+    assert status["state"] == "completed" and status["copied"] == len(TOPICS)
+    assert store.client.get_aliases().aliases[0].collection_name == status["shadow"]
+    assert store.client.count(store.collection_name).count == len(TOPICS)
+    assert searches
+    assert [name for thread, name in checking.unlocked if thread is threading.main_thread()] == []
@@ -0,0 +1,83 @@
+import threading
+import uuid
+
+import numpy as np
+import pytest
+from qdrant_client.http import models
+
+from memlog.numpy_backend import NumpyVectorClient
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = NumpyVectorClient(str(tmp_path / "numpy"))
+    client.create_collection("points", vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE))
+    return client
+
+
+def add_points(client, count, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [str(uuid.UUID(int=int(value))) for value in rng.integers(0, 2 ** 63, count)]
+    client.upsert("points", points=[
+        models.PointStruct(id=point_id, vector=rng.standard_normal(8).tolist(), payload={"n": n})
+        for n, point_id in enumerate(ids)
+    ])
+    return ids
+
+
+def scroll_all(client, limit, between_pages=None):
+    seen, offset = [], None
+    while True:
+        points, offset = client.scroll("points", limit=limit, offset=offset)
+        seen.extend(point.id for point in points)
+        if offset is None:
+            return seen
+        if between_pages:
+            between_pages(offset)
+
+
+def test_scroll_pages_in_id_order(client):
+    ids = add_points(client, 50)
+    assert scroll_all(client, limit=7) == sorted(ids)
+
+
+def test_scroll_resumes_after_deleted_offset(client):
+    ids = add_points(client, 50)
+    deleted = []
+
+    def delete_next_page_start(offset):
+        client.delete("points", points_selector=models.PointIdsList(points=[offset]))
+        deleted.append(offset)
+
+    seen = scroll_all(client, limit=7, between_pages=delete_next_page_start)
+    assert deleted
+    assert seen == sorted(set(ids) - set(deleted))
+
+
+def test_scroll_offset_of_unknown_id_starts_after_it(client):
+    ids = sorted(add_points(client, 20))
+    missing = ids[10][:-1] + ("0" if ids[10][-1] != "0" else "1")
+    points, _ = client.scroll("points", limit=100, offset=missing)
+    assert [point.id for point in points] == [point_id for point_id in ids if point_id >= missing]
+
+
+def test_scroll_under_concurrent_deletes(client):
+    ids = add_points(client, 2000)
+    doomed = set(ids[::3])
+    done = threading.Event()
+
+    def delete_points():
+        for point_id in doomed:
+            client.delete("points", points_selector=models.PointIdsList(points=[point_id]))
+        done.set()
+
+    deleter = threading.Thread(target=delete_points)
+    deleter.start()
+    seen = scroll_all(client, limit=50)
+    deleter.join()
+
+    # Every surviving point is seen exactly once, and the walk never restarts
+    assert done.is_set()
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen)
+    assert set(ids) - doomed <= set(seen)
@@ -0,0 +1,20 @@
+import hashlib
+
+from conftest import conversation, write_legacy_points
+
+
+def test_conversations_stored_by_the_original_loader_are_found(open_store):
+    store = open_store()
+    conversations = [conversation(i, topic) for i, topic in enumerate(["python", "python", "cooking"])]
+    write_legacy_points(store.client, store.collection_name, conversations)
+
+    related = store.related_conversations(["c0", "c2"], limit=2)
+    assert set(related) == {"c0", "c2"}
+    assert related["c0"][0]["id"] == "c1"
+
+
+def test_new_points_use_the_original_id_format(open_store):
+    store = open_store()
+    store.process_conversations([conversation(0, "python")])
+    points, _ = store.client.scroll(store.collection_name, with_payload=["id"])
+    assert [point.id for point in points] == [hashlib.md5(b"c0").hexdigest()]
@@ -0,0 +1,56 @@
+import json
+import uuid
+
+import pytest
+from qdrant_client.http import models
+
+from conftest import DIMENSION, conversation, write_legacy_points
+
+
+@pytest.fixture
+def legacy_store(open_store, tmp_path):
+    """A store whose points and ledger were written by the original loader"""
+    conversations = [conversation(i, topic) for i, topic in enumerate(["python", "cooking", "travel"])]
+    (tmp_path / "processed_conversations.json").write_text(json.dumps([conv["id"] for conv in conversations]))
+    store = open_store()
+    write_legacy_points(store.client, store.collection_name, conversations)
+    return store
+
+
+def test_legacy_store_is_consistent(legacy_store):
+    report = legacy_store.reconcile()
+    assert report["points"] == 3
+    assert report["orphans"] == 0
+    assert report["requeued"] == 0
+    assert report["recorded"] == 0
+    assert legacy_store.client.count(legacy_store.collection_name).count == 3
+
+
+@pytest.mark.parametrize("backend", ["qdrant", "numpy"])
+def test_reconcile_repairs_drift(open_store, tmp_path, backend):
+    store = open_store(backend=backend)
+    store.process_conversations([conversation(i, "python") for i in range(4)])
+    # A conversation lost from the store, one missing from the ledger, and an orphaned point
+    store.client.delete(store.collection_name, points_selector=models.PointIdsList(points=[store._point_id("c0")]))
+    store.processed_ids.discard("c1")
+    store.client.upsert(store.collection_name, points=[models.PointStruct(
+        id=str(uuid.uuid4()), vector=[1.0] * DIMENSION, payload={"id": "c9", "title": "stray", "create_time": 0}
+    )])
+
+    dry_run = store.reconcile(repair=False)
+    assert (dry_run["requeued"], dry_run["recorded"], dry_run["orphans"]) == (1, 1, 1)
+    assert store.client.count(store.collection_name).count == 4
+
+    store.reconcile()
+    assert store.processed_ids == {"c1", "c2", "c3"}
+    assert set(json.loads((tmp_path / "processed_conversations.json").read_text())) == {"c1", "c2", "c3"}
+    assert store.client.count(store.collection_name).count == 3
+    assert store.reconcile(repair=False)["orphans"] == 0
+
+
+def test_hyphenated_point_ids_are_accepted(legacy_store):
+    point_id = legacy_store._point_id("c0")
+    assert legacy_store._is_point_of(point_id, "c0")
+    assert legacy_store._is_point_of(str(uuid.UUID(point_id)), "c0")
+    assert not legacy_store._is_point_of(point_id, "c1")
+    assert not legacy_store._is_point_of(7, "c0")
@@ -0,0 +1,125 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from memlog.conversation_vector_store import ConversationVectorStore
+from memlog.ollama_stub import make_handler, stub_embedding
+
+DIMENSION = 32
+EMBED_DELAY = 2.0  # Seconds the stub takes per request, far beyond the deadline
+DEADLINE = 0.5
+
+CONVERSATIONS = [
+    {
+        "id": f"c{i}",
+        "title": f"{topic} question {i}",
+        "create_time": 1600000000 + i * 86400,
+        "messages": [
+            {"role": "user", "content": f"tell me about {topic} {detail}"},
+            {"role": "assistant", "content": f"here is how {topic} {detail} works"}
+        ]
+    }
+    for i, (topic, detail) in enumerate(
+        [("python", "tracebacks"), ("cooking", "pasta sauce"), ("travel", "paris hotels")] * 4
+    )
+]
+
+
+@pytest.fixture
+def slow_ollama():
+    """Stub Ollama server answering every embedding request after EMBED_DELAY"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(DIMENSION, EMBED_DELAY, 0.0, 0.0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api/embed"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, slow_ollama):
+    monkeypatch.chdir(tmp_path)
+    store = ConversationVectorStore(
+        qdrant_path=str(tmp_path / "db"),
+        dimension=DIMENSION,
+        ollama_url=slow_ollama,
+        backend="numpy",
+        search_deadline=DEADLINE
+    )
+    # Vectors are made here, so ingest does not wait for the slow server
+    store.process_conversations(CONVERSATIONS, precomputed={
+        conv["id"]: np.asarray(stub_embedding(conv["title"], DIMENSION), dtype=np.float32)
+        for conv in CONVERSATIONS
+    })
+    assert store.lexical_index.ready.wait(10)
+    yield store
+    store._release_lock()
+    ConversationVectorStore._instance = None
+
+
+def timed(search, *args, **kwargs):
+    start = time.time()
+    results = search(*args, **kwargs)
+    return results, time.time() - start
+
+
+def test_slow_embedding_falls_back_to_word_index(store):
+    results, duration = timed(store.search, "python tracebacks", limit=3, score_threshold=0.0)
+    assert duration < DEADLINE + 0.5
+    assert set(results.degraded_stages) == {"embed", "lexical"}
+    assert "longer than" in results.degraded_stages["embed"]
+    assert results and all(result["title"].startswith("python") for result in results)
+
+
+def test_filter_search_falls_back_within_the_time_range(store):
+    start, end = CONVERSATIONS[3]["create_time"], CONVERSATIONS[8]["create_time"]
+    results, duration = timed(store.filter_search, "python tracebacks", start, end, limit=5)
+    assert duration < DEADLINE + 0.5
+    assert "lexical" in results.degraded_stages
+    assert [result["id"] for result in results] == ["c3", "c6"]
+
+
+def test_diversified_search_falls_back_to_word_index(store):
+    results, duration = timed(store.diversified_search, "paris hotels", limit=3)
+    assert duration < DEADLINE + 0.5
+    assert "lexical" in results.degraded_stages
+    assert results and all(result["title"].startswith("travel") for result in results)
+
+
+def test_busy_store_reports_who_holds_it(store):
+    # A cached embedding skips the embed stage, so only the vector search is late
+    store._cache_query_vector((store.model_name, "cooking pasta"), np.ones(DIMENSION, dtype=np.float32))
+    held = threading.Event()
+
+    def hold(purpose=None):
+        if purpose is None:
+            with store.client_lock:
+                held.set()
+                time.sleep(DEADLINE * 3)
+        else:
+            with store._locked_client(purpose=purpose):
+                held.set()
+                time.sleep(DEADLINE * 3)
+
+    for purpose, cause in [(None, "writes"), ("building the word index", "building the word index")]:
+        held.clear()
+        holder = threading.Thread(target=hold, args=(purpose,))
+        holder.start()
+        held.wait()
+        results, duration = timed(store.search, "cooking pasta", limit=3, score_threshold=0.0)
+        holder.join()
+        assert duration < DEADLINE + 0.5
+        assert results == []
+        assert results.degraded_stages == {"retrieve": f"vector store was busy with {cause} for {DEADLINE:.1f} s"}
+
+
+def test_generous_deadline_is_not_degraded(store):
+    # The warm-up request holds the stub first
+    store.wait_until_ready(EMBED_DELAY * 3)
+    results = store.search("python tracebacks", limit=3, score_threshold=0.0, deadline=EMBED_DELAY * 3)
+    assert not results.degraded
+    assert len(results) == 3 and all(result["title"].startswith("python") for result in results)
+
@@ -0,0 +1,150 @@
+"""
+Administrative commands for the conversation vector store.
+
+Usage:
+    python vector_store_admin.py export <snapshot_dir>
+    python vector_store_admin.py import <snapshot_dir> [--no-verify]
+    python vector_store_admin.py migrate <model_name> <dimension> [--rate N] [--drop-old] [--mini-dimension N] [--title-vectors]
+    python vector_store_admin.py benchmark-search [--sample-size N] [-k K]
+    python vector_store_admin.py partition {year,quarter,month,none}
+    python vector_store_admin.py maintain [--dry-run] [--no-vacuum]
+
+Switch a collection to the NumPy backend by exporting a snapshot and
+importing it with --backend numpy.
+"""
+import argparse
+import time
+
+from memlog.conversation_vector_store import ConversationVectorStore
+
+
+def export_command(vector_store: ConversationVectorStore, args):
+    start = time.time()
+    manifest = vector_store.export_snapshot(args.snapshot_dir, batch_size=args.batch_size)
+    print(f"Exported {manifest['count']} points ({manifest['model_name']}, {manifest['dimension']}d) "
+          f"to {args.snapshot_dir} in {time.time() - start:.1f} s")
+
+
+def import_command(vector_store: ConversationVectorStore, args):
+    start = time.time()
+    restored = vector_store.import_snapshot(args.snapshot_dir, batch_size=args.batch_size, verify=args.verify)
+    print(f"Restored {restored} points from {args.snapshot_dir} in {time.time() - start:.1f} s")
+
+
+def migrate_command(vector_store: ConversationVectorStore, args):
+    if not vector_store.wait_until_ready(timeout=60):
+        print(f"Ollama is not available: {vector_store.ollama_error}")
+        return
+    status = vector_store.migrate_model(
+        args.model_name,
+        args.dimension,
+        sample_size=args.sample_size,
+        max_texts_per_second=args.rate or None,
+        drop_old=args.drop_old,
+        mini_dimension=args.mini_dimension,
+        title_vectors=args.title_vectors or None
+    )
+    print(f"Migration {status['state']}: recall {status.get('old_recall', 0):.2f} -> "
+          f"{status.get('new_recall', 0):.2f} on {status.get('queries', 0)} queries, "
+          f"{status.get('copied', 0)} conversations re-embedded")
+
+
+def benchmark_command(vector_store: ConversationVectorStore, args):
+    if not vector_store.wait_until_ready(timeout=60):
+        print(f"Ollama is not available: {vector_store.ollama_error}")
+        return
+    print(f"{'Method':<28} {'Recall@' + str(args.k):>10} {'Mean ms':>10}")
+    for row in vector_store.benchmark_two_stage(sample_size=args.sample_size, k=args.k):
+        print(f"{row['method']:<28} {row['recall']:>10.3f} {row['mean_ms']:>10.1f}")
+
+
+def partition_command(vector_store: ConversationVectorStore, args):
+    scheme = None if args.scheme == "none" else args.scheme
+    sizes = vector_store.build_partitions(scheme, batch_size=args.batch_size)
+    if scheme is None:
+        print("Removed time partitions")
+        return
+    print(f"Built {len(sizes)} {scheme} partitions:")
+    for key, count in sizes.items():
+        print(f"  {key:<10} {count:>8}")
+
+
+def print_storage(title: str, stats: dict):
+    print(title)
+    print(f"  {'Collection':<36} {'Points':>9} {'MB':>9} {'Reclaimable MB':>15} {'Fragmented':>11}")
+    for name, row in stats.items():
+        fragmented = row["reclaimable_bytes"] / row["bytes"] if row["bytes"] else 0.0
+        print(f"  {name:<36} {row['points']:>9} {row['bytes'] / 2**20:>9.1f} "
+              f"{row['reclaimable_bytes'] / 2**20:>15.1f} {fragmented:>10.1%}")
+
+
+def maintain_command(vector_store: ConversationVectorStore, args):
+    print_storage("Before:", vector_store.storage_stats())
+    report = vector_store.reconcile(repair=not args.dry_run, batch_size=args.batch_size)
+    action = "Would" if args.dry_run else "Did"
+    print(f"\nLedger: {report['ledger']} conversations, collection: {report['points']} points")
+    print(f"{action} requeue {report['requeued']} conversations missing from the collection")
+    print(f"{action} record {report['recorded']} stored conversations missing from the ledger")
+    print(f"{action} delete {report['orphans']} orphaned points")
+    if report["partition_orphans"] or report["partition_missing"]:
+        print(f"{action} rebuild partitions ({report['partition_orphans']} stale, "
+              f"{report['partition_missing']} missing points)")
+    if args.dry_run or not args.vacuum:
+        return
+    start = time.time()
+    stats = vector_store.vacuum()
+    print()
+    print_storage(f"After vacuum ({time.time() - start:.1f} s):", stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store administration")
+    parser.add_argument("--qdrant-path", default="./qdrant_db", help="Qdrant storage directory")
+    parser.add_argument("--collection", default="conversations", help="Collection name")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Points per read or write request")
+    parser.add_argument("--backend", choices=["qdrant", "numpy"],
+                        help="Vector backend (defaults to the one the collection was created with)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write vectors and payloads to a snapshot")
+    export_parser.add_argument("snapshot_dir")
+    export_parser.set_defaults(handler=export_command)
+
+    import_parser = commands.add_parser("import", help="Replace the collection with a snapshot")
+    import_parser.add_argument("snapshot_dir")
+    import_parser.add_argument("--no-verify", dest="verify", action="store_false", help="Skip checksum verification")
+    import_parser.set_defaults(handler=import_command)
+
+    migrate_parser = commands.add_parser("migrate", help="Re-embed with another model and switch the alias")
+    migrate_parser.add_argument("model_name")
+    migrate_parser.add_argument("dimension", type=int)
+    migrate_parser.add_argument("--sample-size", type=int, default=50, help="Known-answer queries for the recall check")
+    migrate_parser.add_argument("--rate", type=float, default=20.0, help="Max texts embedded per second (0 for no limit)")
+    migrate_parser.add_argument("--drop-old", action="store_true", help="Delete the previous collection after the swap")
+    migrate_parser.add_argument("--mini-dimension", type=int, help="Add a truncated vector of this size for two-stage search")
+    migrate_parser.add_argument("--title-vectors", action="store_true", help="Add a title vector to every point")
+    migrate_parser.set_defaults(handler=migrate_command)
+
+    benchmark_parser = commands.add_parser("benchmark-search", help="Recall and latency of two-stage search")
+    benchmark_parser.add_argument("--sample-size", type=int, default=50, help="Title queries sampled from the collection")
+    benchmark_parser.add_argument("-k", type=int, default=10, help="Results per query")
+    benchmark_parser.set_defaults(handler=benchmark_command)
+
+    partition_parser = commands.add_parser("partition", help="Copy conversations into time-partitioned collections")
+    partition_parser.add_argument("scheme", choices=["year", "quarter", "month", "none"])
+    partition_parser.set_defaults(handler=partition_command)
+
+    maintain_parser = commands.add_parser("maintain", help="Reconcile the ledger with the collection, remove orphans, vacuum")
+    maintain_parser.add_argument("--dry-run", action="store_true", help="Only report what would be repaired")
+    maintain_parser.add_argument("--no-vacuum", dest="vacuum", action="store_false", help="Skip reclaiming disk space")
+    maintain_parser.set_defaults(handler=maintain_command)
+
+    args = parser.parse_args()
+    vector_store = ConversationVectorStore(
+        qdrant_path=args.qdrant_path, collection_name=args.collection, backend=args.backend
+    )
+    args.handler(vector_store, args)
+
+
+if __name__ == "__main__":
+    main()